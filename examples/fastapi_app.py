@@ -216,11 +216,14 @@ if __name__ == "__main__":
     logger.info(f"Debug mode: {debug}")
     logger.info(f"Workers: {workers}")
     
+    # Serve the socket handed over by PyPM2 (pypm2 start ... --listen 8000)
+    # so restarts and reloads never refuse connections
+    bind = {"fd": 3} if os.getenv("LISTEN_FDS") else {"host": host, "port": port}
+    
     try:
         uvicorn.run(
             "fastapi_app:app",
-            host=host,
-            port=port,
+            **bind,
             log_level="info" if not debug else "debug",
             access_log=True,
             reload=debug,
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Restart policy for PyPM2
+Exponential backoff with jitter and crash-loop detection
+"""
+
+import random
+import time
+from typing import Any, Dict, Iterable
+
+# Options understood by RestartPolicy, with their defaults
+POLICY_DEFAULTS = {
+    'restart_delay': 1000,              # ms, fixed delay when backoff is disabled
+    'exp_backoff_restart_delay': 0,     # ms, initial backoff delay (0 disables backoff)
+    'max_backoff_delay': 15000,         # ms, upper bound for the backoff delay
+    'backoff_jitter': 0.1,              # +/- fraction applied to each backoff delay
+    'min_uptime': 1000,                 # ms, uptime after which a run counts as stable
+    'crashloop_threshold': 0,           # crashes within the window that open the circuit (0 disables)
+    'crashloop_window': 60,             # seconds
+    'crashloop_cooldown': 300,          # seconds before a trial restart (0 waits for the operator)
+}
+
+class RestartPolicy:
+    """Decides how long to wait before a crash restart and when to give up"""
+
+    def __init__(self, **options):
+        for key, default in POLICY_DEFAULTS.items():
+            value = options.get(key)
+            setattr(self, key, default if value is None else value)
+
+    def options(self) -> Dict[str, Any]:
+        """Policy settings as process options"""
+        return {key: getattr(self, key) for key in POLICY_DEFAULTS}
+
+    def delay_for(self, attempt: int) -> float:
+        """Delay in seconds before restart attempt number `attempt` (1-based)"""
+        if self.exp_backoff_restart_delay:
+            delay = self.exp_backoff_restart_delay * (2 ** max(0, attempt - 1))
+            delay = min(delay, self.max_backoff_delay)
+            # Spread restarts of apps that crashed together
+            if self.backoff_jitter:
+                delay *= 1 + random.uniform(-self.backoff_jitter, self.backoff_jitter)
+        else:
+            delay = self.restart_delay
+
+        return max(0.0, delay / 1000.0)
+
+    def is_stable(self, uptime: float) -> bool:
+        """Whether a run of `uptime` seconds resets the crash counter"""
+        return uptime * 1000 >= self.min_uptime
+
+    def is_crash_loop(self, crash_times: Iterable[float]) -> bool:
+        """Whether the crash timestamps (epoch seconds) trip the circuit breaker"""
+        if not self.crashloop_threshold:
+            return False
+        horizon = time.time() - self.crashloop_window
+        recent = sum(1 for t in crash_times if t >= horizon)
+        return recent >= self.crashloop_threshold
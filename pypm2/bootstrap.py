@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Child bootstrap for PyPM2
+Run by the app's interpreter in front of the user script when the supervisor
+passes listening sockets. Must only depend on the standard library.
+
+    python bootstrap.py script.py [args...]
+
+The inherited descriptors listed in PYPM2_LISTEN_FDS are moved to 3, 4, ...
+and announced with the systemd LISTEN_FDS / LISTEN_PID / LISTEN_FDNAMES
+variables before the script runs as __main__.
+"""
+
+import fcntl
+import os
+import runpy
+import sys
+
+LISTEN_FDS_START = 3
+
+def setup_listen_fds():
+    """Move inherited sockets to the systemd fd range and export LISTEN_*"""
+    raw = os.environ.pop('PYPM2_LISTEN_FDS', '')
+    fds = [int(fd) for fd in raw.split(',') if fd]
+    if not fds:
+        return
+
+    # Park every fd above the target range first so no dup2 clobbers another
+    high = [fcntl.fcntl(fd, fcntl.F_DUPFD, LISTEN_FDS_START + len(fds)) for fd in fds]
+    for fd in fds:
+        os.close(fd)
+    for i, fd in enumerate(high):
+        os.dup2(fd, LISTEN_FDS_START + i)
+        os.close(fd)
+
+    os.environ['LISTEN_FDS'] = str(len(fds))
+    os.environ['LISTEN_PID'] = str(os.getpid())
+    names = os.environ.pop('PYPM2_LISTEN_NAMES', '')
+    if names:
+        os.environ['LISTEN_FDNAMES'] = names
+
+def run_script(script, args):
+    """Execute script as __main__ like `python script args` would"""
+    script = os.path.abspath(script)
+    sys.argv = [script] + list(args)
+    sys.path[0] = os.path.dirname(script)
+    runpy.run_path(script, run_name='__main__')
+
+def main():
+    if len(sys.argv) < 2:
+        sys.stderr.write("usage: bootstrap.py script [args...]\n")
+        sys.exit(2)
+    setup_listen_fds()
+    run_script(sys.argv[1], sys.argv[2:])
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ A Python equivalent to PM2 for Node.js
 """
 
 import argparse
+import os
+import re
 import sys
 import json
 import time
@@ -14,6 +16,10 @@ from tabulate import tabulate
 
 from .manager import ProcessManager
 from .process import ProcessStatus
+from .daemon import Daemon, DaemonClient, DaemonError, connect
+from .logreader import LogFollower, log_files, log_paths, merge_logs, parse_time, read_logs
+from .search import search_logs
+from .ecosystem import EcosystemError, load_ecosystem
 
 def format_status(status: str) -> str:
     """Format status with colors"""
@@ -21,6 +27,7 @@ def format_status(status: str) -> str:
         'online': '\033[92m',   # Green
         'stopped': '\033[91m',  # Red
         'errored': '\033[91m',  # Red
+        'crashloop': '\033[95m', # Magenta
         'stopping': '\033[93m', # Yellow
         'launching': '\033[93m' # Yellow
     }
@@ -62,8 +69,8 @@ def cmd_start(args, manager: ProcessManager):
     """Start command"""
     options = {}
     
-    if args.cwd:
-        options['cwd'] = args.cwd
+    # Resolve paths here: the daemon runs in its own working directory
+    options['cwd'] = os.path.abspath(args.cwd) if args.cwd else os.getcwd()
     if args.interpreter:
         options['interpreter'] = args.interpreter
     if args.name:
@@ -88,23 +95,91 @@ def cmd_start(args, manager: ProcessManager):
     if args.restart_delay is not None:
         options['restart_delay'] = args.restart_delay
     
+    if args.exp_backoff_restart_delay is not None:
+        options['exp_backoff_restart_delay'] = args.exp_backoff_restart_delay
+    
+    if args.min_uptime is not None:
+        options['min_uptime'] = args.min_uptime
+    
+    if args.crashloop_threshold is not None:
+        options['crashloop_threshold'] = args.crashloop_threshold
+    
+    if args.crashloop_window is not None:
+        options['crashloop_window'] = args.crashloop_window
+    
+    if args.crashloop_cooldown is not None:
+        options['crashloop_cooldown'] = args.crashloop_cooldown
+    
+    if args.instances is not None:
+        options['instances'] = args.instances
+    
+    if args.listen:
+        options['listen'] = args.listen
+    
+    if args.ready_timeout is not None:
+        options['ready_timeout'] = args.ready_timeout
+    
+    if args.zygote:
+        options['zygote'] = True
+        options['preload'] = args.preload or []
+        options['gc_freeze'] = not args.no_gc_freeze
+    
+    if args.log_pipe or args.time:
+        options['log_mode'] = 'pipe'
+        options['log_time'] = args.time
+    
+    if args.log_max_size:
+        options['log_max_size'] = args.log_max_size
+    
+    if args.log_rotate_interval:
+        options['log_rotate_interval'] = args.log_rotate_interval
+    
+    if args.log_retain is not None:
+        options['log_retain'] = args.log_retain
+    
+    if args.no_log_compress:
+        options['log_compress'] = False
+    
     if args.no_autorestart:
         options['autorestart'] = False
     
     if args.max_memory_restart:
         options['max_memory_restart'] = args.max_memory_restart
     
+    if args.watch is not None:
+        options['watch'] = [os.path.abspath(path) for path in args.watch] or True
+        options['watch_include'] = args.watch_include or []
+        options['watch_exclude'] = args.watch_exclude or []
+        options['watch_validate'] = args.watch_validate
+        options['watch_check'] = args.watch_check
+    
     if manager.start(name, args.script, **options):
-        print(f"✓ Process '{name}' started successfully")
+        if args.instances is not None:
+            print(f"✓ Process group '{name}' started in cluster mode")
+        else:
+            print(f"✓ Process '{name}' started successfully")
     else:
         print(f"✗ Failed to start process '{name}'")
         sys.exit(1)
 
+def report_bulk(action: str, results: dict):
+    """Print the outcome of a bulk operation"""
+    succeeded = [name for name, r in results.items() if r['success']]
+    slowest = max((r['duration'] for r in results.values()), default=0.0)
+    
+    print(f"✓ {action} {len(succeeded)} processes (slowest {slowest:.2f}s)")
+    for name, result in results.items():
+        if not result['success']:
+            reason = f": {result['error']}" if result['error'] else ""
+            print(f"✗ {name} failed after {result['duration']:.2f}s{reason}")
+    
+    if len(succeeded) != len(results):
+        sys.exit(1)
+
 def cmd_stop(args, manager: ProcessManager):
     """Stop command"""
     if args.name == 'all':
-        stopped = manager.stop_all(args.force)
-        print(f"✓ Stopped {stopped} processes")
+        report_bulk("Stopped", manager.stop_all(args.force, parallel=args.parallel))
     else:
         if manager.stop(args.name, args.force):
             print(f"✓ Process '{args.name}' stopped")
@@ -115,8 +190,7 @@ def cmd_stop(args, manager: ProcessManager):
 def cmd_restart(args, manager: ProcessManager):
     """Restart command"""
     if args.name == 'all':
-        restarted = manager.restart_all()
-        print(f"✓ Restarted {restarted} processes")
+        report_bulk("Restarted", manager.restart_all(parallel=args.parallel))
     else:
         if manager.restart(args.name):
             print(f"✓ Process '{args.name}' restarted")
@@ -124,11 +198,21 @@ def cmd_restart(args, manager: ProcessManager):
             print(f"✗ Failed to restart process '{args.name}' or process not found")
             sys.exit(1)
 
+def cmd_reload(args, manager: ProcessManager):
+    """Reload command - Rolling zero-downtime restart"""
+    if args.name == 'all':
+        report_bulk("Reloaded", manager.reload_all(args.batch, args.ready_timeout))
+    else:
+        if manager.reload(args.name, args.batch, args.ready_timeout):
+            print(f"✓ Process '{args.name}' reloaded")
+        else:
+            print(f"✗ Failed to reload process '{args.name}' or process not found")
+            sys.exit(1)
+
 def cmd_delete(args, manager: ProcessManager):
     """Delete command"""
     if args.name == 'all':
-        deleted = manager.delete_all()
-        print(f"✓ Deleted {deleted} processes")
+        report_bulk("Deleted", manager.delete_all(parallel=args.parallel))
     else:
         if manager.delete(args.name):
             print(f"✓ Process '{args.name}' deleted")
@@ -148,12 +232,13 @@ def cmd_list(args, manager: ProcessManager):
         print(json.dumps(processes, indent=2))
         return
     
-    headers = ["Name", "PID", "Status", "Restart", "Uptime", "CPU", "Memory", "Script"]
+    headers = ["Name", "Mode", "PID", "Status", "Restart", "Uptime", "CPU", "Memory", "Script"]
     rows = []
     
     for proc in processes:
         rows.append([
             proc['name'],
+            'cluster' if proc.get('group') else 'fork',
             proc['pid'] or 'N/A',
             format_status(proc['status']),
             proc['restart_count'],
@@ -165,20 +250,74 @@ def cmd_list(args, manager: ProcessManager):
     
     print(tabulate(rows, headers=headers, tablefmt='grid'))
 
+def print_log_line(line: str, label: Optional[str] = None):
+    """Print a log line, stderr lines in red"""
+    prefix = label if label is not None else line.partition(' | ')[0]
+    error = prefix == 'err' or prefix.endswith(' err')
+    text = f"{label} | {line.rstrip()}" if label else line.rstrip()
+    print(f"\033[31m{text}\033[0m" if error else text, flush=True)
+
+def select_names(requested: List[str], manager: ProcessManager) -> List[str]:
+    """Process names matching requested names, group names or 'all'; exits if none"""
+    processes = manager.list()
+    if 'all' in requested:
+        names = [p['name'] for p in processes]
+    else:
+        names = [p['name'] for p in processes
+                 if p['name'] in requested or p.get('group') in requested]
+    if not names:
+        print(f"✗ Process '{' '.join(requested)}' not found")
+        sys.exit(1)
+    return names
+
 def cmd_logs(args, manager: ProcessManager):
     """Logs command"""
-    if args.name not in [p['name'] for p in manager.list()]:
-        print(f"✗ Process '{args.name}' not found")
-        sys.exit(1)
-    
-    logs = manager.logs(args.name, args.lines, args.follow)
-    
-    for line in logs:
-        print(line.rstrip())
+    names = select_names(args.name, manager)
+    
+    stream = args.stream or ('both' if args.merge else 'out')
+    since = parse_time(args.since) if args.since else None
+    until = parse_time(args.until) if args.until else None
+    # A time window shows all its lines unless --lines is given
+    lines = args.lines if args.lines is not None else (0 if since or until else 20)
+    
+    # Log files are read directly; the daemon is not involved
+    if args.merge:
+        for line in merge_logs(log_files(manager.config.logs_dir, names, stream),
+                               lines, since, until):
+            print_log_line(line)
+    else:
+        for name in names:
+            if len(names) > 1:
+                print(f"\033[1m==> {name} <==\033[0m")
+            out_path, err_path = log_paths(manager.config.logs_dir, name)
+            for line in read_logs(out_path, err_path, lines, stream, since, until):
+                print_log_line(line)
     
     if args.follow:
-        # In a real implementation, this would continuously tail the file
-        print("(Follow mode not fully implemented in this demo)")
+        show_label = len(names) > 1 or stream == 'both'
+        follower = LogFollower(log_files(manager.config.logs_dir, names, stream),
+                               merge=args.merge)
+        try:
+            for label, line in follower:
+                print_log_line(line, label if show_label else None)
+        finally:
+            follower.close()
+
+def cmd_grep(args, manager: ProcessManager):
+    """Grep command"""
+    names = select_names(args.name or ['all'], manager)
+    pattern = re.escape(args.pattern) if args.fixed_strings else args.pattern
+    since = parse_time(args.since) if args.since else None
+    until = parse_time(args.until) if args.until else None
+    
+    # Like logs, files are searched directly without the daemon
+    matches = search_logs(log_files(manager.config.logs_dir, names, args.stream), pattern,
+                          args.ignore_case, since, until, args.limit)
+    for match in matches:
+        location = f"{Path(match['file']).name}:{match['offset']}"
+        print(f"\033[1m{match['name']}\033[0m {location}: {match['line']}")
+    if not matches:
+        sys.exit(1)
 
 def cmd_flush(args, manager: ProcessManager):
     """Flush logs command"""
@@ -195,6 +334,19 @@ def cmd_flush(args, manager: ProcessManager):
             print("✗ Failed to flush some logs")
             sys.exit(1)
 
+def cmd_rotate(args, manager: ProcessManager):
+    """Rotate logs command"""
+    rotated = manager.rotate_logs(args.name)
+    if args.name and args.name != 'all' and not rotated:
+        print(f"✗ Process '{args.name}' not found")
+        sys.exit(1)
+    
+    for name, segments in rotated.items():
+        if segments:
+            print(f"✓ {name}: rotated {len(segments)} log file(s)")
+        else:
+            print(f"  {name}: nothing to rotate")
+
 def cmd_monit(args, manager: ProcessManager):
     """Monitor command"""
     print("PyPM2 Process Monitor")
@@ -232,87 +384,128 @@ def cmd_monit(args, manager: ProcessManager):
     except KeyboardInterrupt:
         print("\nMonitoring stopped")
 
+def cmd_apply(args, manager: ProcessManager):
+    """Apply command - Reconcile processes with an ecosystem file"""
+    # Parsed here: the daemon runs in its own working directory
+    try:
+        apps = load_ecosystem(args.file)
+    except EcosystemError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    source = str(Path(args.file).resolve())
+    results = manager.apply(apps, source, parallel=args.parallel, dry_run=args.dry_run)
+    
+    symbols = {'start': '+', 'restart': '~', 'delete': '-', 'unchanged': '='}
+    failed = 0
+    for name, result in sorted(results.items()):
+        line = f"{symbols[result['action']]} {name}: {result['action']}"
+        if 'success' in result and not result['success']:
+            failed += 1
+            reason = f": {result['error']}" if result['error'] else ""
+            line = f"✗ {name}: {result['action']} failed after {result['duration']:.2f}s{reason}"
+        print(line)
+    
+    counts = {action: sum(1 for r in results.values() if r['action'] == action)
+              for action in ('start', 'restart', 'delete', 'unchanged')}
+    summary = ', '.join(f"{count} {action}" for action, count in counts.items() if count)
+    print(f"{'Would apply' if args.dry_run else '✓ Applied'} {source}: {summary or 'no apps'}")
+    if failed:
+        sys.exit(1)
+
 def cmd_resurrect(args, manager: ProcessManager):
     """Resurrect all saved processes"""
     try:
-        # Load saved processes from config
-        saved_processes = manager.config.load_processes()
+        results = manager.resurrect()
         
-        if not saved_processes:
+        if not results:
             print("No saved processes found to resurrect")
             return
         
-        print(f"Resurrecting {len(saved_processes)} processes...")
+        print(f"Resurrecting {len(results)} processes...")
         
         resurrected = 0
-        for name, proc_data in saved_processes.items():
-            try:
-                script = proc_data.get('script')
-                
-                if not script:
-                    continue
-                
-                # Check if process is already running
-                existing_process = manager.get_process(name)
-                if existing_process and existing_process.status.value == 'online':
-                    print(f"⚠ Process '{name}' is already running, skipping")
-                    continue
-                
-                # Extract start parameters
-                interpreter = proc_data.get('interpreter', 'python3')
-                args_list = proc_data.get('args', [])
-                env = proc_data.get('env', {})
-                cwd = proc_data.get('cwd')
-                autorestart = proc_data.get('autorestart', True)
-                max_memory = proc_data.get('max_memory')
-                
-                # Start the process
-                if manager.start(
-                    name=name,
-                    script=script,
-                    interpreter=interpreter,
-                    args=args_list,
-                    env=env,
-                    cwd=cwd,
-                    autorestart=autorestart,
-                    max_memory=max_memory
-                ):
-                    print(f"✓ Process '{name}' resurrected")
-                    resurrected += 1
-                else:
-                    print(f"✗ Failed to resurrect process '{name}'")
-                    
-            except Exception as e:
-                print(f"✗ Failed to resurrect process '{name}': {e}")
+        for name, state in results.items():
+            if state == 'running':
+                print(f"⚠ Process '{name}' is already running, skipping")
+            elif state == 'resurrected':
+                print(f"✓ Process '{name}' resurrected")
+                resurrected += 1
+            else:
+                print(f"✗ Failed to resurrect process '{name}'")
         
-        print(f"\nResurrected {resurrected}/{len(saved_processes)} processes")
+        print(f"\nResurrected {resurrected}/{len(results)} processes")
         
     except Exception as e:
         print(f"✗ Error during resurrection: {e}")
 
 def cmd_watch(args, manager: ProcessManager):
-    """Watch command - Monitor file changes and restart process"""
-    from .watcher import create_watcher
-    
-    process = manager.get_process(args.name)
-    if not process:
+    """Watch command - Restart a process when its files change"""
+    paths = [os.path.abspath(path) for path in args.watch_path] if args.watch_path else None
+    if not manager.watch(args.name, paths, enabled=not args.off,
+                         include=args.include, exclude=args.exclude,
+                         validate=args.validate, check=args.check):
         print(f"✗ Process '{args.name}' not found")
         sys.exit(1)
     
-    # Get script path from process
-    script_path = process.script
-    
-    # Create watcher with specified or default paths
-    watch_paths = args.watch_path if hasattr(args, 'watch_path') and args.watch_path else None
-    
-    def restart_callback(name):
-        """Callback to restart process on file changes"""
-        return manager.restart(name)
-    
-    watcher = create_watcher(args.name, restart_callback, script_path, watch_paths)
+    if args.off:
+        print(f"✓ Stopped watching '{args.name}'")
+        return
+    print(f"👁️  Watching '{args.name}' for file changes")
+    
+    # Without a daemon the watch service lives in this process
+    if isinstance(manager, ProcessManager):
+        print("💡 Press Ctrl+C to stop watching")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            manager.watch(args.name, enabled=False)
+            print(f"\n🛑 Stopped watching '{args.name}'")
+
+def cmd_daemon(args):
+    """Daemon command - Control the supervisor daemon"""
+    if args.action == 'run':
+        try:
+            Daemon().run()
+        except DaemonError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        return
     
-    # Start watching
-    watcher.start()
+    client = DaemonClient()
+    if args.action == 'status':
+        if client.ping():
+            pid = client.call('ping')['pid']
+            print(f"✓ Daemon running (PID {pid})")
+        else:
+            print("✗ Daemon not running")
+            sys.exit(1)
+    elif args.action == 'start':
+        connect()
+        print("✓ Daemon running")
+    elif args.action == 'stop':
+        if not client.ping():
+            print("Daemon not running")
+            return
+        try:
+            client.call('shutdown', force=args.force)
+        except DaemonError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        print("✓ Daemon stopped (processes left running)")
+
+def cmd_kill(args):
+    """Kill command - Stop all processes and the daemon"""
+    client = DaemonClient()
+    if not client.ping():
+        print("Daemon not running")
+        return
+    try:
+        client.call('kill')
+    except DaemonError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    print("✓ All processes stopped and daemon killed")
 
 def main():
     """Main CLI function"""
@@ -321,6 +514,9 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
+    parser.add_argument('--no-daemon', action='store_true',
+                        help='Manage processes in this process instead of the daemon')
+    
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Start command
@@ -333,21 +529,78 @@ def main():
     start_parser.add_argument('--env', nargs='*', help='Environment variables (KEY=VALUE)')
     start_parser.add_argument('--max-restarts', type=int, help='Maximum restarts')
     start_parser.add_argument('--restart-delay', type=int, help='Restart delay in ms')
+    start_parser.add_argument('--exp-backoff-restart-delay', type=int,
+                              help='Initial exponential backoff delay in ms')
+    start_parser.add_argument('--min-uptime', type=int,
+                              help='Uptime in ms after which a run counts as stable')
+    start_parser.add_argument('--crashloop-threshold', type=int,
+                              help='Crashes within the window that park the process')
+    start_parser.add_argument('--crashloop-window', type=int, help='Crash loop window in seconds')
+    start_parser.add_argument('--crashloop-cooldown', type=int,
+                              help='Seconds before retrying a parked process (0 = manual)')
+    start_parser.add_argument('-i', '--instances',
+                              help='Run N instances as a group ("max" = one per CPU)')
+    start_parser.add_argument('--listen', nargs='*',
+                              help='Addresses bound by the supervisor and shared by all instances '
+                                   '(PORT, HOST:PORT or unix:PATH)')
+    start_parser.add_argument('--ready-timeout', type=int,
+                              help='Time in ms a reloaded instance must stay up to be ready')
+    start_parser.add_argument('--zygote', action='store_true',
+                              help='Fork instances from a pre-warmed interpreter')
+    start_parser.add_argument('--preload', nargs='*',
+                              help='Modules the zygote imports once before forking')
+    start_parser.add_argument('--no-gc-freeze', action='store_true',
+                              help='Do not gc.freeze() preloaded objects in the zygote')
+    start_parser.add_argument('--log-pipe', action='store_true',
+                              help='Let the supervisor write stdout/stderr to the log files')
+    start_parser.add_argument('--time', action='store_true',
+                              help='Prefix log lines with a timestamp (implies --log-pipe)')
+    start_parser.add_argument('--log-max-size', help='Rotate logs above this size (e.g. 10M)')
+    start_parser.add_argument('--log-rotate-interval', choices=['hourly', 'daily', 'weekly'],
+                              help='Rotate logs periodically')
+    start_parser.add_argument('--log-retain', type=int,
+                              help='Rotated log segments to keep (0 = all)')
+    start_parser.add_argument('--no-log-compress', action='store_true',
+                              help='Keep rotated log segments uncompressed')
     start_parser.add_argument('--no-autorestart', action='store_true', help='Disable auto restart')
     start_parser.add_argument('--max-memory-restart', help='Restart when memory exceeds limit')
+    start_parser.add_argument('--watch', nargs='*', metavar='PATH',
+                              help="Restart on file changes (default: the script's directory)")
+    start_parser.add_argument('--watch-include', nargs='*', metavar='GLOB',
+                              help='Only these files restart the process (default: *.py, *.json, ...)')
+    start_parser.add_argument('--watch-exclude', nargs='*', metavar='GLOB',
+                              help='Files or directories to ignore (.gitignore syntax)')
+    start_parser.add_argument('--watch-validate', action='store_true',
+                              help='Byte-compile changed files before a watch restart')
+    start_parser.add_argument('--watch-check', metavar='COMMAND',
+                              help='Command that must succeed before a watch restart')
     
     # Stop command
     stop_parser = subparsers.add_parser('stop', help='Stop a process')
-    stop_parser.add_argument('name', help='Process name or "all"')
+    stop_parser.add_argument('name', help='Process name, group name or "all"')
+    stop_parser.add_argument('--parallel', type=int,
+                             help='Maximum concurrent operations for "all"')
     stop_parser.add_argument('--force', action='store_true', help='Force kill')
     
     # Restart command
     restart_parser = subparsers.add_parser('restart', help='Restart a process')
-    restart_parser.add_argument('name', help='Process name or "all"')
+    restart_parser.add_argument('name', help='Process name, group name or "all"')
+    restart_parser.add_argument('--parallel', type=int,
+                                help='Maximum concurrent operations for "all"')
+    
+    # Reload command
+    reload_parser = subparsers.add_parser('reload', help='Rolling zero-downtime reload')
+    reload_parser.add_argument('name', help='Process name, group name or "all"')
+    reload_parser.add_argument('--batch', type=int, default=1,
+                               help='Instances replaced at a time')
+    reload_parser.add_argument('--ready-timeout', type=int,
+                               help='Time in ms a replacement must stay up before the old one stops')
     
     # Delete command
     delete_parser = subparsers.add_parser('delete', help='Delete a process')
-    delete_parser.add_argument('name', help='Process name or "all"')
+    delete_parser.add_argument('name', help='Process name, group name or "all"')
+    delete_parser.add_argument('--parallel', type=int,
+                               help='Maximum concurrent operations for "all"')
     
     # List command
     list_parser = subparsers.add_parser('list', help='List processes')
@@ -355,24 +608,76 @@ def main():
     
     # Logs command
     logs_parser = subparsers.add_parser('logs', help='Show process logs')
-    logs_parser.add_argument('name', help='Process name')
-    logs_parser.add_argument('--lines', type=int, default=20, help='Number of lines to show')
+    logs_parser.add_argument('name', nargs='+', help='Process names, group names or "all"')
+    logs_parser.add_argument('--lines', type=int, help='Number of lines to show (default 20)')
     logs_parser.add_argument('--follow', action='store_true', help='Follow log output')
+    logs_parser.add_argument('--stream', choices=['out', 'err', 'both'],
+                             help='Stdout log, error log or both interleaved by timestamp '
+                                  '(default: out, both with --merge)')
+    logs_parser.add_argument('--merge', action='store_true',
+                             help='Show all selected processes as one timeline')
+    logs_parser.add_argument('--since',
+                             help='Show lines logged after this time (14:02, 2024-01-31 14:02, 10m, 2h)')
+    logs_parser.add_argument('--until', help='Show lines logged before this time')
+    
+    # Grep command
+    grep_parser = subparsers.add_parser('grep', help='Search current and rotated logs')
+    grep_parser.add_argument('pattern', help='Regular expression to search for')
+    grep_parser.add_argument('name', nargs='*', help='Process names, group names or "all" (default)')
+    grep_parser.add_argument('-i', '--ignore-case', action='store_true', help='Ignore case')
+    grep_parser.add_argument('-F', '--fixed-strings', action='store_true',
+                             help='Treat the pattern as a literal string')
+    grep_parser.add_argument('--stream', choices=['out', 'err', 'both'], default='both',
+                             help='Search the stdout log, the error log or both (default)')
+    grep_parser.add_argument('--since', help='Only lines logged after this time')
+    grep_parser.add_argument('--until', help='Only lines logged before this time')
+    grep_parser.add_argument('--limit', type=int, help='Stop after this many matches')
     
     # Flush command
     flush_parser = subparsers.add_parser('flush', help='Flush logs')
     flush_parser.add_argument('name', nargs='?', help='Process name (optional)')
     
+    # Rotate command
+    rotate_parser = subparsers.add_parser('rotate', help='Rotate logs now')
+    rotate_parser.add_argument('name', nargs='?', help='Process name, group name or "all"')
+    
     # Monitor command
     monit_parser = subparsers.add_parser('monit', help='Monitor processes')
     
+    # Apply command
+    apply_parser = subparsers.add_parser('apply', help='Start, restart and delete processes to match an ecosystem file')
+    apply_parser.add_argument('file', help='Ecosystem file (.json, .toml or .yaml)')
+    apply_parser.add_argument('--parallel', type=int, help='Maximum concurrent operations')
+    apply_parser.add_argument('--dry-run', action='store_true', help='Only show what would change')
+    
     # Resurrect command
     resurrect_parser = subparsers.add_parser('resurrect', help='Resurrect all saved processes')
     
     # Watch command
     watch_parser = subparsers.add_parser('watch', help='Watch files and restart process on changes')
-    watch_parser.add_argument('name', help='Process name')
+    watch_parser.add_argument('name', help='Process or group name')
     watch_parser.add_argument('--watch-path', nargs='*', help='Paths to watch for changes')
+    watch_parser.add_argument('--include', nargs='*', metavar='GLOB',
+                              help='Only these files restart the process (default: *.py, *.json, ...)')
+    watch_parser.add_argument('--exclude', nargs='*', metavar='GLOB',
+                              help='Files or directories to ignore (.gitignore syntax)')
+    watch_parser.add_argument('--validate', action='store_true', default=None,
+                              help='Byte-compile changed files before restarting')
+    watch_parser.add_argument('--no-validate', dest='validate', action='store_false',
+                              help='Restart without byte-compiling first')
+    watch_parser.add_argument('--check', metavar='COMMAND',
+                              help="Command that must succeed before restarting ('' removes it)")
+    watch_parser.add_argument('--off', action='store_true', help='Stop watching')
+    
+    # Daemon command
+    daemon_parser = subparsers.add_parser('daemon', help='Control the supervisor daemon')
+    daemon_parser.add_argument('action', choices=['start', 'stop', 'status', 'run'],
+                               help='Daemon action')
+    daemon_parser.add_argument('--force', action='store_true',
+                               help='Stop even if pipe-mode processes would lose their logs')
+    
+    # Kill command
+    subparsers.add_parser('kill', help='Stop all processes and the daemon')
     
     args = parser.parse_args()
     
@@ -380,9 +685,19 @@ def main():
         parser.print_help()
         return
     
+    if args.command == 'daemon':
+        cmd_daemon(args)
+        return
+    if args.command == 'kill':
+        cmd_kill(args)
+        return
+    
     # Initialize process manager
     try:
-        manager = ProcessManager()
+        if args.no_daemon:
+            manager = ProcessManager(pipe_logs=False)
+        else:
+            manager = connect()
     except Exception as e:
         print(f"✗ Failed to initialize PyPM2: {e}")
         sys.exit(1)
@@ -395,18 +710,26 @@ def main():
             cmd_stop(args, manager)
         elif args.command == 'restart':
             cmd_restart(args, manager)
+        elif args.command == 'reload':
+            cmd_reload(args, manager)
         elif args.command == 'delete':
             cmd_delete(args, manager)
         elif args.command == 'list':
             cmd_list(args, manager)
         elif args.command == 'logs':
             cmd_logs(args, manager)
+        elif args.command == 'grep':
+            cmd_grep(args, manager)
         elif args.command == 'flush':
             cmd_flush(args, manager)
+        elif args.command == 'rotate':
+            cmd_rotate(args, manager)
         elif args.command == 'monit':
             cmd_monit(args, manager)
         elif args.command == 'resurrect':
             cmd_resurrect(args, manager)
+        elif args.command == 'apply':
+            cmd_apply(args, manager)
         elif args.command == 'watch':
             cmd_watch(args, manager)
     except KeyboardInterrupt:
@@ -1,20 +1,27 @@
 import os
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 from pathlib import Path
+from .statestore import StateStore
 
 class Config:
     """Configuration manager for PyPM2"""
     
     def __init__(self, config_dir: Optional[str] = None):
+        if config_dir is None:
+            config_dir = os.environ.get("PYPM2_HOME")
         if config_dir is None:
             self.config_dir = Path.home() / ".pypm2"
         else:
             self.config_dir = Path(config_dir)
         
-        self.config_dir.mkdir(exist_ok=True)
+        self.config_dir.mkdir(parents=True, exist_ok=True)
         self.config_file = self.config_dir / "config.json"
         self.processes_file = self.config_dir / "processes.json"
+        self.state_file = self.config_dir / "state.db"
+        self.socket_file = self.config_dir / "pypm2.sock"
+        self.daemon_pid_file = self.config_dir / "daemon.pid"
+        self.daemon_log_file = self.config_dir / "daemon.log"
         self.logs_dir = self.config_dir / "logs"
         self.pids_dir = self.config_dir / "pids"
         
@@ -23,6 +30,7 @@ class Config:
         self.pids_dir.mkdir(exist_ok=True)
         
         self._config = self._load_config()
+        self._state = None
         
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
@@ -56,17 +64,24 @@ class Config:
         self._config[key] = value
         self.save_config()
     
+    @property
+    def state(self) -> StateStore:
+        """Saved process records, opened on first use (importing processes.json once)"""
+        if self._state is None:
+            self._state = StateStore(self.state_file, legacy_file=self.processes_file)
+        return self._state
+    
     def load_processes(self) -> Dict[str, Dict]:
         """Load saved processes configuration"""
-        if self.processes_file.exists():
-            try:
-                with open(self.processes_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                pass
-        return {}
+        return self.state.load()
     
-    def save_processes(self, processes: Dict[str, Dict]):
-        """Save processes configuration"""
-        with open(self.processes_file, 'w') as f:
-            json.dump(processes, f, indent=2)
+    def save_processes(self, processes: Dict[str, Dict], deleted: Optional[Iterable[str]] = None):
+        """Save processes configuration
+        
+        Without deleted, processes replaces every saved process; with it, only
+        the given processes are written and the deleted ones removed.
+        """
+        if deleted is None:
+            self.state.replace(processes)
+        else:
+            self.state.put_many(processes, deleted)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Supervisor daemon for PyPM2
+Owns the ProcessManager and serves CLI requests over a local Unix socket
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import threading
+import subprocess
+import socketserver
+from typing import Any, Dict, Optional
+
+from .config import Config
+
+# Manager methods that may be called remotely
+DAEMON_METHODS = {
+    'start', 'stop', 'restart', 'reload', 'delete',
+    'stop_all', 'restart_all', 'reload_all', 'delete_all',
+    'list', 'describe', 'logs', 'merge_logs', 'grep', 'flush_logs', 'rotate_logs',
+    'watch', 'resurrect', 'plan', 'apply',
+}
+
+# Calls that stop or start processes take as long as their stop timeouts and
+# restart delays add up to, which grows with the number of processes
+UNBOUNDED_METHODS = {
+    'start', 'stop', 'restart', 'reload', 'delete',
+    'stop_all', 'restart_all', 'reload_all', 'delete_all',
+    'resurrect', 'apply', 'grep', 'kill',
+}
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be reached or reports a failure"""
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles newline-delimited JSON requests on one client connection"""
+
+    def handle(self):
+        for raw in self.rfile:
+            try:
+                request = json.loads(raw.decode('utf-8'))
+            except (ValueError, UnicodeDecodeError) as e:
+                response = {'ok': False, 'error': f"Invalid request: {e}"}
+            else:
+                response = self.server.supervisor.dispatch(request)
+
+            self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+            self.wfile.flush()
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class Daemon:
+    """Long-lived supervisor holding the managed processes"""
+
+    def __init__(self, config_dir: Optional[str] = None):
+        from .manager import ProcessManager
+
+        self.manager = ProcessManager(config_dir)
+        self.config = self.manager.config
+        self.socket_path = self.config.socket_file
+        self.server = None
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one request and build the response"""
+        method = request.get('method')
+        args = request.get('args', [])
+        kwargs = request.get('kwargs', {})
+
+        try:
+            if method == 'ping':
+                return {'ok': True, 'result': {'pid': os.getpid()}}
+            if method == 'kill':
+                self.manager.stop_all()
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return {'ok': True, 'result': True}
+            if method == 'shutdown':
+                piped = self._piped_processes()
+                if piped and not kwargs.get('force'):
+                    return {'ok': False, 'error': (
+                        f"{', '.join(piped)} log through the daemon and would die with it; "
+                        "stop them first or use --force")}
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return {'ok': True, 'result': True}
+            if method not in DAEMON_METHODS:
+                return {'ok': False, 'error': f"Unknown method: {method}"}
+
+            result = getattr(self.manager, method)(*args, **kwargs)
+            return {'ok': True, 'result': result}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    def bind(self):
+        """Bind the control socket, refusing to replace a live daemon"""
+        if self.socket_path.exists():
+            if _socket_alive(self.socket_path):
+                raise DaemonError(f"Daemon already running on {self.socket_path}")
+            self.socket_path.unlink()
+
+        self.server = _UnixServer(str(self.socket_path), _RequestHandler)
+        self.server.supervisor = self
+        os.chmod(self.socket_path, 0o600)
+
+        with open(self.config.daemon_pid_file, 'w') as f:
+            f.write(str(os.getpid()))
+
+    def serve_forever(self):
+        """Serve requests until shutdown() is called"""
+        if self.server is None:
+            self.bind()
+        try:
+            self.server.serve_forever()
+        finally:
+            self._cleanup()
+
+    def run(self):
+        """Foreground entry point with signal handling"""
+        def handle_signal(signum, frame):
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, handle_signal)
+        signal.signal(signal.SIGINT, handle_signal)
+
+        self.bind()
+        print(f"PyPM2 daemon listening on {self.socket_path} (PID {os.getpid()})", flush=True)
+        self.serve_forever()
+
+    def shutdown(self):
+        """Stop serving; managed processes keep running"""
+        if self.server:
+            self.server.shutdown()
+
+    def _piped_processes(self):
+        """Online processes whose output pipes the daemon drains"""
+        return [process['name'] for process in self.manager.list()
+                if process['log_mode'] == 'pipe' and process['status'] == 'online']
+
+    def _cleanup(self):
+        """Release the socket and persist state"""
+        self.manager.stop_monitoring()
+        self.manager._save_processes()
+
+        if self.server:
+            self.server.server_close()
+        for path in (self.socket_path, self.config.daemon_pid_file):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+class DaemonClient:
+    """Thin client exposing the ProcessManager API over the daemon socket"""
+
+    def __init__(self, config_dir: Optional[str] = None, timeout: float = 60.0):
+        self.config = Config(config_dir)
+        self.timeout = timeout
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """Send one request and return its result
+        
+        Methods in UNBOUNDED_METHODS wait for the daemon however long they take;
+        others give up after timeout seconds.
+        """
+        request = json.dumps({'method': method, 'args': list(args), 'kwargs': kwargs})
+        timeout = None if method in UNBOUNDED_METHODS else self.timeout
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(str(self.config.socket_file))
+                sock.sendall(request.encode('utf-8') + b"\n")
+
+                with sock.makefile('rb') as f:
+                    raw = f.readline()
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise DaemonError(f"Daemon is not running: {e}")
+        except OSError as e:
+            raise DaemonError(f"Daemon communication failed: {e}")
+
+        if not raw:
+            raise DaemonError("Daemon closed the connection")
+
+        response = json.loads(raw.decode('utf-8'))
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Unknown daemon error'))
+        return response.get('result')
+
+    def ping(self) -> bool:
+        """Check whether the daemon answers"""
+        try:
+            self.call('ping')
+            return True
+        except DaemonError:
+            return False
+
+    def __getattr__(self, name: str):
+        if name not in DAEMON_METHODS:
+            raise AttributeError(name)
+
+        def remote(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+
+        remote.__name__ = name
+        return remote
+
+def spawn_daemon(config: Config) -> subprocess.Popen:
+    """Launch the daemon detached from the calling terminal"""
+    env = os.environ.copy()
+    env['PYPM2_HOME'] = str(config.config_dir)
+
+    with open(config.daemon_log_file, 'a') as log:
+        return subprocess.Popen(
+            [sys.executable, '-m', 'pypm2', 'daemon', 'run'],
+            cwd=str(config.config_dir),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True
+        )
+
+def connect(config_dir: Optional[str] = None, spawn: bool = True,
+            timeout: float = 5.0) -> DaemonClient:
+    """Return a client for the running daemon, starting one if needed"""
+    client = DaemonClient(config_dir)
+    if client.ping():
+        return client
+
+    if not spawn:
+        raise DaemonError("Daemon is not running")
+
+    daemon = spawn_daemon(client.config)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.ping():
+            return client
+        if daemon.poll() is not None:
+            break
+        time.sleep(0.05)
+
+    raise DaemonError(f"Daemon failed to start, see {client.config.daemon_log_file}")
+
+def _socket_alive(path) -> bool:
+    """Check whether something accepts connections on a Unix socket"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(str(path))
+        return True
+    except OSError:
+        return False
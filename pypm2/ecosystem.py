@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Ecosystem files for PyPM2
+An ecosystem file declares many apps at once (JSON, or TOML/YAML when a
+parser is available). `pypm2 apply` compares each app's spec hash with the
+one its running processes were started from, so a deploy only starts,
+restarts or removes the apps that actually changed.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+from .backoff import POLICY_DEFAULTS
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Keys an app may set: its name and script plus the start() options. Options
+# the supervisor sets itself (group, instance_id, ecosystem, spec_hash) are not
+# accepted, so a typo or a stray key fails loudly instead of being ignored.
+APP_KEYS = {
+    'name', 'script', 'cwd', 'args', 'env', 'interpreter', 'instances',
+    'max_restarts', 'autorestart', 'max_memory_restart', 'listen', 'ready_timeout',
+    'watch', 'watch_include', 'watch_exclude', 'watch_validate', 'watch_check',
+    'zygote', 'preload', 'gc_freeze',
+    'log_mode', 'log_time', 'log_max_size', 'log_rotate_interval', 'log_retain', 'log_compress',
+} | set(POLICY_DEFAULTS)
+
+class EcosystemError(Exception):
+    """Raised when an ecosystem file cannot be read or is invalid"""
+
+def _parse(path: Path) -> Any:
+    suffix = path.suffix.lower()
+    if suffix == '.toml':
+        if tomllib is None:
+            raise EcosystemError("TOML ecosystem files need Python 3.11+ or the 'tomli' package")
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    if suffix in ('.yaml', '.yml'):
+        if yaml is None:
+            raise EcosystemError("YAML ecosystem files need the 'PyYAML' package")
+        with open(path, 'r') as f:
+            return yaml.safe_load(f)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def load_ecosystem(path) -> Dict[str, Dict[str, Any]]:
+    """App specs by name, from {"apps": [...]} (or a bare list of apps)
+
+    Each app needs a name and a script; every other key is a start() option.
+    cwd is resolved against the file's directory (and defaults to it), env
+    values become strings.
+    """
+    path = Path(path).resolve()
+    try:
+        data = _parse(path)
+    except EcosystemError:
+        raise
+    except (OSError, ValueError) as e:
+        raise EcosystemError(f"Cannot read {path}: {e}")
+    except Exception as e:
+        # Parser-specific errors (YAML)
+        raise EcosystemError(f"Cannot parse {path}: {e}")
+
+    if isinstance(data, dict):
+        data = data.get('apps')
+    if not isinstance(data, list):
+        raise EcosystemError(f"{path}: expected a list of apps under 'apps'")
+
+    apps = {}
+    for app in data:
+        if not isinstance(app, dict) or not app.get('name') or not app.get('script'):
+            raise EcosystemError(f"{path}: every app needs a 'name' and a 'script'")
+        unknown = sorted(set(app) - APP_KEYS)
+        if unknown:
+            raise EcosystemError(f"{path}: app '{app['name']}' has unknown keys: {', '.join(unknown)}")
+        spec = dict(app)
+        name = str(spec.pop('name'))
+        if name in apps:
+            raise EcosystemError(f"{path}: app '{name}' is declared twice")
+        if ':' in name:
+            raise EcosystemError(f"{path}: app name '{name}' cannot contain ':'")
+        spec['cwd'] = os.path.normpath(os.path.join(path.parent, spec.get('cwd') or '.'))
+        if spec.get('env'):
+            spec['env'] = {str(key): str(value) for key, value in spec['env'].items()}
+        if isinstance(spec.get('args'), str):
+            spec['args'] = spec['args'].split()
+        apps[name] = spec
+    return apps
+
+def spec_hash(spec: Dict[str, Any]) -> str:
+    """Stable hash of an app spec (script, args, env and options)"""
+    text = json.dumps(spec, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
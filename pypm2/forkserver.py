@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Supervisor side of the PyPM2 zygote mode
+Starts one pre-warmed zygote per interpreter/cwd/preload set and asks it to
+fork instances instead of booting a fresh interpreter for each start.
+"""
+
+import array
+import hashlib
+import json
+import os
+import queue
+import signal
+import socket
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import psutil
+
+# Standalone fork server run by the app's interpreter
+ZYGOTE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zygote.py')
+
+class ZygoteError(Exception):
+    """Raised when a zygote cannot be started or fails to fork"""
+
+class ZygoteChild:
+    """Popen-like handle for an instance forked by a zygote"""
+
+    def __init__(self, pid: int, zygote: 'Zygote'):
+        self.pid = pid
+        self.returncode = None
+        self._zygote = zygote
+        self._exited = threading.Event()
+
+    def _set_exited(self, code: Optional[int]):
+        self.returncode = code
+        self._exited.set()
+
+    def poll(self) -> Optional[int]:
+        if self._exited.is_set():
+            return self.returncode
+        # Without the zygote nobody reports the exit code
+        if not self._zygote.alive() and not psutil.pid_exists(self.pid):
+            self._set_exited(-1)
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        waited = 0.0
+        while self.poll() is None:
+            if timeout is not None and waited >= timeout:
+                raise subprocess.TimeoutExpired(f"zygote child {self.pid}", timeout)
+            self._exited.wait(0.1)
+            waited += 0.1
+        return self.returncode
+
+    def send_signal(self, sig: int):
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+class Zygote:
+    """One fork server process holding preloaded modules"""
+
+    def __init__(self, interpreter: str, cwd: str, preload: List[str],
+                 env: Dict[str, str], freeze: bool = True, log_path: Optional[str] = None):
+        self.interpreter = interpreter
+        self.cwd = cwd
+        self.preload = preload
+        self.env = env
+        self.freeze = freeze
+        self.log_path = log_path
+        self.process = None
+        self._control = None
+        self._replies: queue.Queue = queue.Queue()
+        self._children: Dict[int, ZygoteChild] = {}
+        # Source files of the app modules it preloaded (None: unknown)
+        self.files: Optional[Set[str]] = None
+        self.started = None
+        self._early_exits: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    def start(self, timeout: float = 120.0):
+        """Launch the zygote and wait until its modules are imported"""
+        self.started = time.time()
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        cmd = [self.interpreter, ZYGOTE_SCRIPT, str(child.fileno()), ','.join(self.preload)]
+        if self.freeze:
+            cmd.append('--freeze')
+
+        log = open(self.log_path, 'a') if self.log_path else subprocess.DEVNULL
+        try:
+            self.process = subprocess.Popen(
+                cmd,
+                cwd=self.cwd,
+                env=self.env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                pass_fds=(child.fileno(),),
+                start_new_session=True
+            )
+        finally:
+            child.close()
+            if log is not subprocess.DEVNULL:
+                log.close()
+
+        self._control = parent
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+        reply = self._reply(timeout)
+        if 'ready' not in reply:
+            self.close()
+            raise ZygoteError(reply.get('error', 'Zygote failed to start'))
+        if reply.get('files') is not None:
+            self.files = set(reply['files'])
+
+    def imported(self, paths: List[str]) -> bool:
+        """Whether any of paths is the source of a module this zygote preloaded
+        and changed since it started"""
+        for path in paths:
+            if self.files is not None and os.path.realpath(path) not in self.files:
+                continue
+            try:
+                if os.stat(path).st_mtime >= self.started:
+                    return True
+            except OSError:
+                # Deleted
+                return True
+        return False
+
+    def spawn(self, script: str, args: List[str], cwd: str, env: Dict[str, str],
+              stdout_fd: int, stderr_fd: int, listen_fds: Tuple[int, ...] = ()) -> ZygoteChild:
+        """Fork a new instance running script"""
+        request = json.dumps({'script': script, 'args': args, 'cwd': cwd, 'env': env})
+        fds = array.array('i', [stdout_fd, stderr_fd] + list(listen_fds))
+
+        with self._lock:
+            try:
+                self._control.sendmsg([request.encode('utf-8')],
+                                      [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+            except OSError as e:
+                raise ZygoteError(f"Zygote unreachable: {e}")
+
+            reply = self._reply(10.0)
+            if 'spawned' not in reply:
+                raise ZygoteError(reply.get('error', 'Zygote failed to fork'))
+
+            child = ZygoteChild(reply['spawned'], self)
+            with self._state_lock:
+                self._children[child.pid] = child
+                if child.pid in self._early_exits:
+                    child._set_exited(self._early_exits.pop(child.pid))
+            return child
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def close(self):
+        """Stop the zygote; forked instances keep running"""
+        if self._control:
+            self._control.close()
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+    def _reply(self, timeout: float) -> dict:
+        try:
+            return self._replies.get(timeout=timeout)
+        except queue.Empty:
+            raise ZygoteError("Zygote did not answer")
+
+    def _read_loop(self):
+        """Dispatch zygote messages: replies to callers, exits to children"""
+        while True:
+            try:
+                data = self._control.recv(65536)
+            except OSError:
+                data = b''
+            if not data:
+                self._replies.put({'error': 'Zygote exited'})
+                return
+
+            message = json.loads(data.decode('utf-8'))
+            if 'exited' in message:
+                with self._state_lock:
+                    child = self._children.pop(message['exited'], None)
+                    if child is None:
+                        self._early_exits[message['exited']] = message['code']
+                if child:
+                    child._set_exited(message['code'])
+            else:
+                self._replies.put(message)
+
+class ZygotePool:
+    """Zygotes shared by every process with the same interpreter, cwd, env and preload list"""
+
+    def __init__(self, log_dir: Optional[str] = None):
+        self.log_dir = log_dir
+        self._zygotes: Dict[tuple, Zygote] = {}
+        self._lock = threading.Lock()
+
+    def get(self, interpreter: str, cwd: str, preload: List[str],
+            env: Dict[str, str], freeze: bool = True) -> Zygote:
+        """Return a running zygote for this configuration, starting it if needed"""
+        key = self._key(interpreter, cwd, preload, env, freeze)
+
+        with self._lock:
+            zygote = self._zygotes.get(key)
+            if zygote is None or not zygote.alive():
+                log_path = None
+                if self.log_dir:
+                    digest = hashlib.sha1(repr(key[:4]).encode()).hexdigest()[:8]
+                    log_path = os.path.join(self.log_dir, f"zygote-{digest}.log")
+                zygote = Zygote(interpreter, cwd, preload, env, freeze, log_path)
+                zygote.start()
+                self._zygotes[key] = zygote
+            return zygote
+
+    def discard(self, interpreter: str, cwd: str, preload: List[str],
+                env: Dict[str, str], freeze: bool = True,
+                changed: Optional[List[str]] = None) -> bool:
+        """Drop the zygote for this configuration so the next start re-imports fresh code
+        
+        With changed, only when one of those files is a module it preloaded.
+        """
+        key = self._key(interpreter, cwd, preload, env, freeze)
+        with self._lock:
+            zygote = self._zygotes.get(key)
+            if zygote is None or changed is not None and not zygote.imported(changed):
+                return False
+            del self._zygotes[key]
+        zygote.close()
+        return True
+
+    def recycle(self):
+        """Drop every zygote so the next start re-imports fresh code"""
+        with self._lock:
+            zygotes, self._zygotes = list(self._zygotes.values()), {}
+        for zygote in zygotes:
+            zygote.close()
+
+    def close(self):
+        self.recycle()
+
+    @staticmethod
+    def _key(interpreter: str, cwd: str, preload: List[str], env: Dict[str, str],
+             freeze: bool) -> tuple:
+        return (interpreter, cwd, tuple(preload), freeze, tuple(sorted(env.items())))
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Path matching for PyPM2 watch mode
+Ignore and include globs (.gitignore syntax) are compiled into one regular
+expression per kind, so matching a path costs two regex calls however many
+patterns there are. Directories are matched too, which lets walkers prune
+ignored trees instead of listing them. Like git, patterns only see the path
+below the root they apply to: a watched project inside a directory called
+`build` is not ignored by a `build` pattern.
+"""
+
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+IGNORE_FILES = ('.gitignore', '.pypm2ignore')
+
+DEFAULT_IGNORE = [
+    '*.log', '*.tmp', '*.swp', '*.pyc', '__pycache__',
+    '.git', 'node_modules', '.pytest_cache', '.coverage',
+    '*.pid', '*.lock'
+]
+
+def _translate_glob(body: str) -> str:
+    """Regex for a glob body: * and ? stay within one path component, ** spans several"""
+    out = []
+    i, n = 0, len(body)
+    while i < n:
+        c = body[i]
+        if c == '*':
+            if body.startswith('**', i):
+                at_start = i == 0 or body[i - 1] == '/'
+                if at_start and body.startswith('**/', i):
+                    out.append('(?:.*/)?')
+                    i += 3
+                    continue
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = body.find(']', i + 2 if body.startswith('[!', i) or body.startswith('[^', i) else i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                content = body[i + 1:end]
+                if content[:1] in ('!', '^'):
+                    content = '^' + content[1:]
+                out.append('[' + content.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(body[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+def glob_to_regex(pattern: str, base: Optional[str] = None,
+                  match_below: bool = True) -> Optional[Tuple[str, bool, bool]]:
+    """(regex, negated, relative) for one .gitignore-style pattern, or None for blanks and comments
+
+    Patterns containing a slash are anchored at base, or at the root without
+    one; others match a name at any depth below the root. Relative regexes
+    are matched against the path relative to the root, the others against
+    the absolute path. A trailing slash only matches directories, which are
+    tested with a trailing slash. With match_below, a pattern matching a
+    directory also matches everything inside it.
+    """
+    pattern = pattern.rstrip('\n')
+    if not pattern.endswith('\\ '):
+        pattern = pattern.rstrip(' ')
+    if not pattern or pattern.startswith('#'):
+        return None
+    negated = pattern.startswith('!')
+    if negated:
+        pattern = pattern[1:]
+    elif pattern.startswith('\\'):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    relative = not anchored or not base
+    if not anchored:
+        prefix = '(?:.*/)?'
+    elif base:
+        prefix = re.escape(base.rstrip(os.sep)) + '/'
+    else:
+        prefix = '/?'
+
+    if dir_only:
+        suffix = '/.*' if match_below else '/'
+    else:
+        suffix = '(?:/.*)?' if match_below else ''
+    return prefix + _translate_glob(pattern) + suffix, negated, relative
+
+def read_ignore_file(path) -> List[str]:
+    """Patterns of an ignore file, or [] when it does not exist"""
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+class PathMatcher:
+    """Compiled exclude/include globs for absolute (or relative) paths
+
+    Excludes follow .gitignore rules, including `!` negation (the last
+    matching pattern wins). Includes restrict which files are relevant;
+    None means every file that is not excluded.
+
+    Paths are matched relative to the outermost root containing them (base
+    and the roots added with add_roots); paths outside every root are
+    matched whole.
+    """
+
+    def __init__(self, exclude: Iterable[str] = (), include: Optional[Iterable[str]] = None,
+                 base: Optional[str] = None):
+        self._rules: List[Tuple[str, bool, bool]] = []
+        self._include: Optional[List[Tuple[str, bool]]] = None
+        self._roots: List[str] = []
+        self._exclude_regexes = None
+        self._include_regexes = None
+        if base:
+            self.add_roots([base])
+        self.add_excludes(exclude, base)
+        if include is not None:
+            self.add_includes(include, base)
+
+    def add_roots(self, paths: Iterable[str]):
+        """Match paths below these directories relative to them"""
+        for path in paths:
+            root = path.rstrip(os.sep)
+            if root not in self._roots:
+                self._roots.append(root)
+        self._roots.sort(key=len)
+
+    def add_excludes(self, patterns: Iterable[str], base: Optional[str] = None):
+        for pattern in patterns:
+            rule = glob_to_regex(pattern, base)
+            if rule is not None:
+                self._rules.append(rule)
+        self._exclude_regexes = None
+
+    def add_includes(self, patterns: Iterable[str], base: Optional[str] = None):
+        if self._include is None:
+            self._include = []
+        for pattern in patterns:
+            rule = glob_to_regex(pattern, base, match_below=False)
+            if rule is not None and not rule[1]:
+                self._include.append((rule[0], rule[2]))
+        self._include_regexes = None
+
+    def add_ignore_files(self, directory: str, names: Iterable[str] = IGNORE_FILES):
+        """Add the patterns of ignore files found in directory, relative to it"""
+        for name in names:
+            self.add_excludes(read_ignore_file(os.path.join(directory, name)), directory)
+
+    def ignored(self, path: str, is_dir: bool = False) -> bool:
+        """Whether path (or anything containing it) is excluded"""
+        if not self._rules:
+            return False
+        if self._exclude_regexes is None:
+            self._exclude_regexes = [self._compile_excludes(relative) for relative in (True, False)]
+        suffix = '/' if is_dir else ''
+        subjects = (self._relative(path) + suffix, path + suffix)
+        winner = -1
+        for (regex, indexes), subject in zip(self._exclude_regexes, subjects):
+            match = regex.fullmatch(subject) if regex is not None else None
+            if match is not None:
+                winner = max(winner, indexes[match.lastindex - 1])
+        if winner < 0:
+            return False
+        negated = self._rules[winner][1]
+        return not negated
+
+    def included(self, path: str) -> bool:
+        """Whether a file matches the include globs"""
+        if self._include is None:
+            return True
+        if self._include_regexes is None:
+            self._include_regexes = [self._compile_includes(relative) for relative in (True, False)]
+        subjects = (self._relative(path), path)
+        return any(regex is not None and regex.fullmatch(subject) is not None
+                   for regex, subject in zip(self._include_regexes, subjects))
+
+    def matches(self, path: str) -> bool:
+        """Whether a change to this file is relevant"""
+        return self.included(path) and not self.ignored(path)
+
+    def _relative(self, path: str) -> str:
+        """path below the outermost root containing it, or path itself"""
+        for root in self._roots:
+            if path == root or path.startswith(root + os.sep):
+                return path[len(root) + 1:]
+        return path
+
+    def _compile_excludes(self, relative: bool):
+        """(regex, rule index per group) for the relative or absolute exclude rules"""
+        # Later patterns take precedence: try them first
+        indexes = [i for i in reversed(range(len(self._rules))) if self._rules[i][2] == relative]
+        if not indexes:
+            return None, indexes
+        return re.compile('|'.join(f'({self._rules[i][0]})' for i in indexes), re.DOTALL), indexes
+
+    def _compile_includes(self, relative: bool):
+        regexes = [regex for regex, rule_relative in self._include if rule_relative == relative]
+        if not regexes:
+            return None
+        return re.compile('|'.join(f'(?:{regex})' for regex in regexes), re.DOTALL)
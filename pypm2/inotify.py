@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Minimal inotify binding for PyPM2 (Linux, ctypes)
+Lets log following and file watching block in the kernel instead of polling.
+`available()` is False on other platforms; callers fall back to polling.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+from typing import List, NamedTuple, Optional
+
+IN_ACCESS = 0x00000001
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_CLOSE_NOWRITE = 0x00000010
+IN_OPEN = 0x00000020
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+
+IN_UNMOUNT = 0x00002000
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+_libc = None
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            libc.inotify_init1
+        except (OSError, AttributeError):
+            libc = False
+        _libc = libc
+    return _libc
+
+def available() -> bool:
+    """Whether inotify can be used on this system"""
+    return bool(_load_libc())
+
+class Event(NamedTuple):
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+class Inotify:
+    """One inotify instance; add watches, then read events"""
+
+    def __init__(self):
+        libc = _load_libc()
+        if not libc:
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._poller = select.poll()
+        self._poller.register(self.fd, select.POLLIN)
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def add_watch(self, path, mask: int) -> int:
+        """Watch path for the events in mask; returns the watch descriptor"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout: Optional[float] = None) -> List[Event]:
+        """Wait up to timeout seconds (None = forever) and return pending events"""
+        if not self._poller.poll(None if timeout is None else timeout * 1000):
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append(Event(wd, mask, cookie, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Sparse timestamp index for PyPM2 log files
+A sidecar `<log>.idx` maps a line timestamp to its byte offset every
+`every_lines` lines or `every_bytes` bytes, so time-window queries seek close
+to the first wanted line instead of scanning the whole file.
+
+The index identifies its log by a hash of the log's first bytes rather than
+by inode, so it stays valid when the log is renamed or copied by rotation.
+"""
+
+import bisect
+import fcntl
+import gzip
+import hashlib
+import os
+import re
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+INDEX_SUFFIX = '.idx'
+
+DEFAULT_EVERY_LINES = 1000
+DEFAULT_EVERY_BYTES = 1024 * 1024
+
+# '[2024-01-31 12:00:00] ...' (supervisor and --time lines) or ISO 8601 prefixes
+TIMESTAMP_PATTERN = re.compile(r'^\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})')
+
+# magic, version, indexed bytes, offset of the last entry, head length, head hash
+_HEADER = struct.Struct('<4sB3xQQI8s')
+_ENTRY = struct.Struct('<dQ')
+_MAGIC = b'PIDX'
+_VERSION = 1
+_HEAD_SIZE = 1024
+_READ_SIZE = 1024 * 1024
+
+def parse_timestamp(line) -> Optional[float]:
+    """Timestamp at the start of a log line (str or bytes), if any"""
+    if isinstance(line, bytes):
+        line = line[:32].decode('ascii', errors='replace')
+    match = TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(f"{match.group(1)} {match.group(2)}",
+                                 "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return None
+
+def index_path(log_path) -> Path:
+    """Sidecar index of a log file or of a (possibly compressed) segment"""
+    log_path = Path(log_path)
+    name = log_path.name[:-3] if log_path.name.endswith('.gz') else log_path.name
+    return log_path.with_name(name + INDEX_SUFFIX)
+
+def _open_log(path):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def _head_hash(head: bytes) -> bytes:
+    return hashlib.blake2b(head, digest_size=8).digest()
+
+class LogIndex:
+    """Sparse (timestamp, offset) index of one log file"""
+
+    def __init__(self, log_path, every_lines: int = DEFAULT_EVERY_LINES,
+                 every_bytes: int = DEFAULT_EVERY_BYTES):
+        self.log_path = Path(log_path)
+        self.path = index_path(log_path)
+        self.every_lines = every_lines
+        self.every_bytes = every_bytes
+        self._indexed = None
+
+    def update(self) -> int:
+        """Index lines appended since the last update; returns the number of new entries
+
+        Rebuilds the index when it is missing or no longer matches the log.
+        Compressed segments are never indexed here, only read.
+        """
+        if str(self.log_path).endswith('.gz'):
+            return 0
+        try:
+            size = os.stat(self.log_path).st_size
+        except FileNotFoundError:
+            return 0
+        if size == self._indexed:
+            return 0
+
+        with open(self.log_path, 'rb') as log, self._locked('r+b', fcntl.LOCK_EX) as index:
+            header = self._read_header(index, log)
+            if header is None:
+                header = [0, 0, 0, b'']
+                index.seek(0)
+                index.truncate(0)
+                index.write(_HEADER.pack(_MAGIC, _VERSION, *header))
+
+            indexed, last_entry, head_len, head_hash = header
+            if head_len < _HEAD_SIZE:
+                # The validated prefix only grew: hash more of it
+                log.seek(0)
+                head = log.read(_HEAD_SIZE)
+                head_len, head_hash = len(head), _head_hash(head)
+
+            first = index.seek(0, os.SEEK_END) == _HEADER.size
+            entries, indexed, last_entry = self._scan(log, indexed, last_entry, first)
+            if entries:
+                index.write(b''.join(_ENTRY.pack(ts, offset) for ts, offset in entries))
+            index.flush()
+            # Header last: readers never see offsets past the written entries
+            index.seek(0)
+            index.write(_HEADER.pack(_MAGIC, _VERSION, indexed, last_entry, head_len, head_hash))
+            self._indexed = indexed
+            return len(entries)
+
+    def entries(self) -> List[Tuple[float, int]]:
+        """Indexed (timestamp, offset) pairs, or [] when the index is missing or stale"""
+        try:
+            with _open_log(self.log_path) as log, self._locked('rb', fcntl.LOCK_SH) as index:
+                if self._read_header(index, log) is None:
+                    return []
+                index.seek(_HEADER.size)
+                data = index.read()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % _ENTRY.size
+        return list(_ENTRY.iter_unpack(data[:usable]))
+
+    def offset_for(self, since: float) -> int:
+        """Offset at or before the first line logged at or after since"""
+        entries = self.entries()
+        position = bisect.bisect_left([ts for ts, _ in entries], since)
+        return entries[position - 1][1] if position > 0 else 0
+
+    def _scan(self, log, indexed: int, last_entry: int, first: bool):
+        """Walk complete lines from indexed and pick index points"""
+        entries = []
+        log.seek(indexed)
+        offset = indexed
+        lines_since = 0
+        pending = b''
+        while True:
+            chunk = log.read(_READ_SIZE)
+            if not chunk:
+                break
+            data = pending + chunk
+            start = 0
+            while True:
+                end = data.find(b'\n', start)
+                if end < 0:
+                    break
+                line_offset = offset + start
+                due = first or lines_since >= self.every_lines or \
+                    line_offset - last_entry >= self.every_bytes
+                if due:
+                    stamp = parse_timestamp(data[start:end])
+                    if stamp is not None:
+                        entries.append((stamp, line_offset))
+                        last_entry = line_offset
+                        lines_since = 0
+                        first = False
+                lines_since += 1
+                start = end + 1
+            offset += start
+            pending = data[start:]
+        # A trailing partial line is indexed once it is complete
+        return entries, offset, last_entry
+
+    def _read_header(self, index, log) -> Optional[list]:
+        """Header fields when the index describes this log, else None"""
+        index.seek(0)
+        raw = index.read(_HEADER.size)
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, indexed, last_entry, head_len, head_hash = _HEADER.unpack(raw)
+        if magic != _MAGIC or version != _VERSION:
+            return None
+
+        log.seek(0)
+        head = log.read(head_len)
+        if len(head) < head_len or _head_hash(head) != head_hash:
+            return None
+        if not str(self.log_path).endswith('.gz') and os.fstat(log.fileno()).st_size < indexed:
+            return None
+        return [indexed, last_entry, head_len, head_hash]
+
+    def _locked(self, mode: str, operation: int):
+        if mode == 'r+b':
+            index = open(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), mode)
+        else:
+            index = open(self.path, mode)
+        fcntl.flock(index.fileno(), operation)
+        return index
+
+def read_range(path, since: Optional[float] = None,
+               until: Optional[float] = None) -> Iterator[str]:
+    """Lines of one log file logged within [since, until]
+
+    Lines without a timestamp belong to the previous timestamped line.
+    Stops at the first line logged after until.
+    """
+    start = 0
+    if since is not None:
+        index = LogIndex(path)
+        index.update()
+        start = index.offset_for(since)
+
+    try:
+        log = _open_log(path)
+    except FileNotFoundError:
+        return
+    with log:
+        log.seek(start)
+        current = None
+        for raw in log:
+            stamp = parse_timestamp(raw)
+            if stamp is not None:
+                current = stamp
+            if until is not None and current is not None and current > until:
+                return
+            if since is not None and (current is None or current < since):
+                continue
+            yield raw.decode('utf-8', errors='replace')
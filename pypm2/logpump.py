@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Supervisor-side log pump for PyPM2
+Children in pipe mode write stdout/stderr to pipes; one selector thread drains
+every pipe into bounded per-file buffers and one writer thread flushes them to
+disk. Reading never waits for the disk: when a buffer is full the output is
+dropped and counted, so a slow disk never blocks a child on a full pipe.
+"""
+
+import fcntl
+import os
+import selectors
+import threading
+import time
+from typing import Dict
+
+# Bytes buffered per log file before output is dropped
+DEFAULT_MAX_BUFFER = 8 * 1024 * 1024
+
+# Requested pipe capacity (best effort, capped by /proc/sys/fs/pipe-max-size)
+PIPE_SIZE = 1024 * 1024
+
+READ_SIZE = 65536
+
+TIMESTAMP_FORMAT = '[%Y-%m-%d %H:%M:%S] '
+
+def timestamp_lines(data: bytes, at_line_start: bool, prefix: bytes):
+    """Prefix every line starting in data; returns (output, ends_at_line_start)"""
+    lines = data.split(b'\n')
+    out = []
+    for i, line in enumerate(lines):
+        last = i == len(lines) - 1
+        if last and not line:
+            break
+        if at_line_start or i > 0:
+            out.append(prefix)
+        out.append(line)
+        if not last:
+            out.append(b'\n')
+    return b''.join(out), data.endswith(b'\n')
+
+class LogWriter:
+    """Buffered output for one log file, shared by every stream writing to it"""
+
+    def __init__(self, path: str, max_buffer: int = DEFAULT_MAX_BUFFER):
+        self.path = str(path)
+        self.max_buffer = max_buffer
+        self.buffered = 0
+        self.dropped = 0
+        self.refs = 0
+        self._chunks = []
+        self._pending_drop = 0
+        self._file = None
+        self.reopen_requested = False
+        self.at_line_start = True
+
+    def append(self, data: bytes) -> bool:
+        """Queue data, or count it as dropped when the buffer is full"""
+        if self.buffered + len(data) > self.max_buffer:
+            self.dropped += len(data)
+            self._pending_drop += len(data)
+            return False
+        self._chunks.append(data)
+        self.buffered += len(data)
+        if data:
+            self.at_line_start = data.endswith(b'\n')
+        return True
+
+    def take(self) -> bytes:
+        """Return and clear everything queued, with a note about dropped output"""
+        data = b''.join(self._chunks)
+        if self._pending_drop:
+            data += f"[pypm2] dropped {self._pending_drop} bytes of output\n".encode()
+        self._chunks = []
+        self.buffered = 0
+        self._pending_drop = 0
+        return data
+
+    def pending(self) -> bool:
+        return bool(self._chunks) or bool(self._pending_drop)
+
+    def write(self, data: bytes):
+        if self.reopen_requested:
+            self.reopen_requested = False
+            self.reopen()
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(data)
+        self._file.flush()
+
+    def reopen(self):
+        """Close the handle so the next write opens the path again"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.reopen()
+
+class _Stream:
+    """One pipe being drained into a writer"""
+
+    def __init__(self, fd: int, writer: LogWriter, timestamps: bool):
+        self.fd = fd
+        self.writer = writer
+        self.timestamps = timestamps
+        self.at_line_start = True
+
+class LogPump:
+    """Drains child output pipes into log files without blocking the children"""
+
+    def __init__(self, max_buffer: int = DEFAULT_MAX_BUFFER, flush_interval: float = 0.2):
+        self.max_buffer = max_buffer
+        self.flush_interval = flush_interval
+        self._writers: Dict[str, LogWriter] = {}
+        self._streams: Dict[int, _Stream] = {}
+        self._pending = []
+        self._in_flight = False
+        self._cond = threading.Condition()
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._running = True
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._reader.start()
+        self._writer.start()
+
+    def pipe(self, path, timestamps: bool = False) -> int:
+        """Create a pipe draining into path and return its write end for the child"""
+        read_fd, write_fd = os.pipe()
+        try:
+            fcntl.fcntl(write_fd, fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+        except (AttributeError, OSError):
+            pass
+        self.attach(read_fd, path, timestamps)
+        return write_fd
+
+    def attach(self, fd: int, path, timestamps: bool = False):
+        """Drain fd into path until EOF; the pump takes ownership of fd"""
+        os.set_blocking(fd, False)
+        with self._cond:
+            writer = self._writers.get(str(path))
+            if writer is None:
+                writer = LogWriter(path, self.max_buffer)
+                self._writers[writer.path] = writer
+            writer.refs += 1
+            self._pending.append(_Stream(fd, writer, timestamps))
+        self._wakeup()
+
+    def write_line(self, path, line: bytes) -> bool:
+        """Queue a supervisor line for a file the pump is writing, between output lines
+
+        Returns False when no stream drains into path, so the caller writes it.
+        """
+        with self._cond:
+            writer = self._writers.get(str(path))
+            if writer is None or writer.refs <= 0:
+                return False
+            if not writer.at_line_start:
+                line = b'\n' + line
+            writer.append(line)
+            self._cond.notify()
+        return True
+
+    def reopen(self, path=None):
+        """Reopen one log file (or all) after it was moved or removed"""
+        with self._cond:
+            for writer in list(self._writers.values()):
+                if path is None or writer.path == str(path):
+                    writer.reopen_requested = True
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Buffered and dropped byte counts per log file"""
+        with self._cond:
+            return {path: {'buffered': w.buffered, 'dropped': w.dropped}
+                    for path, w in self._writers.items()}
+
+    def dropped(self, path) -> int:
+        with self._cond:
+            writer = self._writers.get(str(path))
+            return writer.dropped if writer else 0
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything read so far is on disk"""
+        deadline = time.time() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._in_flight or any(w.pending() for w in self._writers.values()):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 0.05))
+        return True
+
+    def close(self):
+        """Stop the pump after flushing buffered output"""
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup()
+        self._reader.join(timeout=5)
+        with self._cond:
+            self._cond.notify_all()
+        self._writer.join(timeout=5)
+        for writer in self._writers.values():
+            writer.close()
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
+
+    def _wakeup(self):
+        try:
+            os.write(self._wakeup_w, b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def _read_loop(self):
+        while self._running:
+            with self._cond:
+                pending, self._pending = self._pending, []
+            for stream in pending:
+                self._streams[stream.fd] = stream
+                self._selector.register(stream.fd, selectors.EVENT_READ, stream)
+
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    try:
+                        while os.read(self._wakeup_r, 512):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                self._drain(key.data)
+
+        for stream in list(self._streams.values()):
+            self._drain(stream)
+            self._detach(stream)
+        self._selector.close()
+
+    def _drain(self, stream: _Stream):
+        """Read what the pipe holds right now and queue it"""
+        try:
+            data = os.read(stream.fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+
+        if not data:
+            self._detach(stream)
+            return
+
+        if stream.timestamps:
+            prefix = time.strftime(TIMESTAMP_FORMAT).encode()
+            data, stream.at_line_start = timestamp_lines(data, stream.at_line_start, prefix)
+
+        with self._cond:
+            stream.writer.append(data)
+            self._cond.notify()
+
+    def _detach(self, stream: _Stream):
+        if self._streams.pop(stream.fd, None) is None:
+            return
+        self._selector.unregister(stream.fd)
+        os.close(stream.fd)
+        with self._cond:
+            stream.writer.refs -= 1
+            self._cond.notify()
+
+    def _write_loop(self):
+        """Flush queued output; the only thread touching log files"""
+        while True:
+            with self._cond:
+                while self._running and not any(w.pending() or w.refs <= 0
+                                                for w in self._writers.values()):
+                    self._cond.wait(self.flush_interval)
+                batch = [(w, w.take()) for w in self._writers.values() if w.pending()]
+                # Forget writers whose streams are all gone
+                for path, writer in list(self._writers.items()):
+                    if writer.refs <= 0 and not writer.pending():
+                        del self._writers[path]
+                        batch.append((writer, None))
+                stopping = not self._running and not batch
+                self._in_flight = bool(batch)
+
+            for writer, data in batch:
+                try:
+                    if data is None:
+                        writer.close()
+                    else:
+                        writer.write(data)
+                except OSError:
+                    writer.reopen()
+
+            with self._cond:
+                self._in_flight = False
+                self._cond.notify_all()
+            if stopping:
+                return
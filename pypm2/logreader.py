@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Log reading helpers for PyPM2
+Tails log files by reading fixed-size blocks backwards from the end, so the
+cost depends on the number of lines wanted rather than on the file size, and
+follows them by blocking on inotify (or polling where it is unavailable).
+"""
+
+import heapq
+import os
+from collections import deque
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import inotify
+from .logindex import parse_timestamp, read_range
+from .rotation import segment_time, segments
+
+BLOCK_SIZE = 64 * 1024
+
+STREAMS = ('out', 'err', 'both')
+
+# Directory events that may concern a followed file
+FOLLOW_EVENTS = (inotify.IN_MODIFY | inotify.IN_CREATE | inotify.IN_MOVED_TO |
+                 inotify.IN_MOVED_FROM | inotify.IN_DELETE | inotify.IN_ATTRIB)
+
+def log_paths(logs_dir, name: str) -> Tuple[Path, Path]:
+    """Stdout and error log paths of a process"""
+    logs_dir = Path(logs_dir)
+    return logs_dir / f"{name}.log", logs_dir / f"{name}.error.log"
+
+def log_files(logs_dir, names: Iterable[str], stream: str = 'both') -> List[Tuple[str, Path]]:
+    """(label, path) of the selected streams of several processes
+
+    Stdout logs are labelled with the process name, error logs with 'name err'.
+    """
+    if stream not in STREAMS:
+        raise ValueError(f"Unknown log stream: {stream}")
+    files = []
+    for name in names:
+        out_path, err_path = log_paths(logs_dir, name)
+        if stream in ('out', 'both'):
+            files.append((name, out_path))
+        if stream in ('err', 'both'):
+            files.append((f"{name} err", err_path))
+    return files
+
+def tail_lines(path, lines: int, block_size: int = BLOCK_SIZE) -> List[str]:
+    """Last `lines` lines of a file (all lines when lines <= 0)"""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return []
+
+    with f:
+        if lines <= 0:
+            return _decode(f.read())
+
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        chunks = []
+        newlines = 0
+        # Stop once the newline before the first wanted line has been read;
+        # a trailing newline ends the last line rather than starting a new one
+        while position > 0 and newlines < lines:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            chunk = f.read(size)
+            if position + size == end and chunk.endswith(b'\n'):
+                newlines -= 1
+            newlines += chunk.count(b'\n')
+            chunks.append(chunk)
+
+    data = b''.join(reversed(chunks))
+    return _decode(data)[-lines:]
+
+def _decode(data: bytes) -> List[str]:
+    return data.decode('utf-8', errors='replace').splitlines(keepends=True)
+
+def parse_time(value, now: Optional[float] = None) -> float:
+    """Parse a --since/--until value into a timestamp
+
+    Accepts epoch seconds, '30s', '10m', '2h', '1d' (ago), 'HH:MM[:SS]' (today)
+    and 'YYYY-MM-DD[ HH:MM[:SS]]' (local time, 'T' separator allowed).
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    now = time.time() if now is None else now
+    value = value.strip()
+
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd])', value)
+    if match:
+        units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+        return now - float(match.group(1)) * units[match.group(2)]
+
+    for fmt in ('%H:%M', '%H:%M:%S'):
+        try:
+            clock = datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+        return datetime.combine(datetime.fromtimestamp(now).date(), clock).timestamp()
+
+    try:
+        return datetime.fromisoformat(value.replace(' ', 'T')).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time: {value}")
+
+def timestamped(lines: Iterable[str]) -> Iterable[Tuple[float, str]]:
+    """Pair lines with their timestamp; continuation lines inherit the previous one"""
+    current = float('-inf')
+    for line in lines:
+        stamp = parse_timestamp(line)
+        if stamp is not None:
+            current = stamp
+        yield current, line
+
+def merge_labelled(streams: Iterable[Tuple[str, Iterable[str]]]) -> Iterator[Tuple[str, str]]:
+    """Lazily merge (label, lines) streams by line timestamp into (label, line) pairs"""
+    def keyed(index, label, lines):
+        for stamp, line in timestamped(lines):
+            yield stamp, index, label, line
+
+    labelled = [keyed(i, label, lines) for i, (label, lines) in enumerate(streams)]
+    for _, _, label, line in heapq.merge(*labelled):
+        yield label, line
+
+def merge_streams(streams: Iterable[Tuple[str, Iterable[str]]]) -> Iterator[str]:
+    """Lazily merge (label, lines) streams by line timestamp, labelling each line"""
+    for label, line in merge_labelled(streams):
+        yield f"{label} | {line}"
+
+def interleave(streams: List[Tuple[str, List[str]]]) -> List[str]:
+    """Merge (label, lines) streams by line timestamp, labelling each line"""
+    return list(merge_streams(streams))
+
+def read_log_range(path, since: Optional[float] = None,
+                   until: Optional[float] = None) -> Iterator[str]:
+    """Lines logged within [since, until] in a log and its rotated segments"""
+    lower = None
+    for segment in segments(path) + [Path(path)]:
+        # A segment holds lines written between the previous rotation and its own
+        upper = segment_time(segment) if segment != Path(path) else None
+        if until is not None and lower is not None and lower > until:
+            return
+        if since is None or upper is None or upper >= since:
+            yield from read_range(segment, since, until)
+        lower = upper
+
+def read_logs(out_path, err_path, lines: int, stream: str = 'out',
+              since: Optional[float] = None, until: Optional[float] = None) -> List[str]:
+    """Tail the stdout log, the error log or both interleaved
+
+    With since/until, returns the lines of that window instead (the last
+    `lines` of them when lines > 0), using the sparse index to seek.
+    """
+    if stream not in STREAMS:
+        raise ValueError(f"Unknown log stream: {stream}")
+
+    if since is None and until is None:
+        if stream == 'out':
+            return tail_lines(out_path, lines)
+        if stream == 'err':
+            return tail_lines(err_path, lines)
+        merged = interleave([('out', tail_lines(out_path, lines)),
+                             ('err', tail_lines(err_path, lines))])
+        return merged[-lines:] if lines > 0 else merged
+
+    if stream == 'out':
+        selected = read_log_range(out_path, since, until)
+    elif stream == 'err':
+        selected = read_log_range(err_path, since, until)
+    else:
+        selected = merge_streams([('out', read_log_range(out_path, since, until)),
+                                  ('err', read_log_range(err_path, since, until))])
+    if lines > 0:
+        return list(deque(selected, maxlen=lines))
+    return list(selected)
+
+def merge_logs(files: List[Tuple[str, object]], lines: int = 0,
+               since: Optional[float] = None, until: Optional[float] = None) -> Iterator[str]:
+    """Chronological view of several logs as 'label | line' strings
+
+    Without a time window, the last `lines` lines of the merged view (each
+    file is tailed, so only its end is read). With since/until, the window is
+    streamed through a k-way merge holding one line per file in memory.
+    """
+    if since is None and until is None:
+        merged = interleave([(label, tail_lines(path, lines)) for label, path in files])
+        yield from (merged[-lines:] if lines > 0 else merged)
+        return
+
+    selected = merge_streams([(label, read_log_range(path, since, until))
+                              for label, path in files])
+    if lines > 0:
+        yield from deque(selected, maxlen=lines)
+    else:
+        yield from selected
+
+class _FollowedFile:
+    """Read position in one log file, surviving rotation and truncation"""
+
+    def __init__(self, label: str, path):
+        self.label = label
+        self.path = Path(path)
+        self.file = None
+        self.identity = None
+        self.mtime_ns = None
+        self.partial = b''
+        # Existing content was already shown by the tail
+        self._open(at_end=True)
+
+    def _open(self, at_end: bool) -> bool:
+        try:
+            self.file = open(self.path, 'rb')
+        except FileNotFoundError:
+            self.file = None
+            return False
+        st = os.fstat(self.file.fileno())
+        self.identity = (st.st_dev, st.st_ino)
+        self.mtime_ns = st.st_mtime_ns
+        if at_end:
+            self.file.seek(0, os.SEEK_END)
+        return True
+
+    def poll(self) -> List[str]:
+        """Complete lines written since the last poll"""
+        try:
+            st = os.stat(self.path)
+            identity = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            st = identity = None
+
+        lines = []
+        if self.file is not None and identity == self.identity:
+            position = self.file.tell()
+            # Truncated in place (flush, copytruncate rotation); the same size
+            # with a new mtime means it was truncated and written again
+            if st.st_size < position or (st.st_size == position and
+                                         st.st_mtime_ns != self.mtime_ns):
+                self.file.seek(0)
+                self.partial = b''
+        lines.extend(self._read())
+
+        if identity is not None and identity != self.identity:
+            # Rotated or recreated: finish the old file, then read the new one
+            if self.partial:
+                lines.append(self.partial.decode('utf-8', errors='replace'))
+                self.partial = b''
+            if self.file is not None:
+                self.file.close()
+            if self._open(at_end=False):
+                lines.extend(self._read())
+        return lines
+
+    def _read(self) -> List[str]:
+        if self.file is None:
+            return []
+        data = self.file.read()
+        self.mtime_ns = os.fstat(self.file.fileno()).st_mtime_ns
+        if not data:
+            return []
+        complete, newline, self.partial = (self.partial + data).rpartition(b'\n')
+        if not newline:
+            return []
+        return _decode(complete + newline)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class LogFollower:
+    """Stream new lines from several log files as (label, line) pairs
+
+    Waits on inotify watches of the log directories, so following many idle
+    logs costs no CPU; polls every poll_interval seconds without inotify.
+    """
+
+    def __init__(self, files: Iterable[Tuple[str, object]], poll_interval: float = 0.5,
+                 use_inotify: bool = True, merge: bool = False):
+        self.files = [_FollowedFile(label, path) for label, path in files]
+        self.poll_interval = poll_interval
+        # Order the lines read together by timestamp
+        self.merge = merge
+        self._by_name: Dict[Tuple[str, str], List[_FollowedFile]] = {}
+        for followed in self.files:
+            key = (str(followed.path.parent), followed.path.name)
+            self._by_name.setdefault(key, []).append(followed)
+
+        self._inotify = None
+        self._dirs: Dict[int, str] = {}
+        if use_inotify and inotify.available():
+            try:
+                self._inotify = inotify.Inotify()
+                for directory in {key[0] for key in self._by_name}:
+                    wd = self._inotify.add_watch(directory, FOLLOW_EVENTS | inotify.IN_ONLYDIR)
+                    self._dirs[wd] = directory
+            except OSError:
+                self.close_inotify()
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return self.follow()
+
+    def follow(self, timeout: Optional[float] = None) -> Iterator[Tuple[str, str]]:
+        """Yield new lines until timeout seconds pass (None = forever)"""
+        deadline = None if timeout is None else time.time() + timeout
+        pending = self.files
+        while True:
+            if self.merge:
+                yield from merge_labelled([(followed.label, followed.poll())
+                                           for followed in pending])
+            else:
+                for followed in pending:
+                    for line in followed.poll():
+                        yield followed.label, line
+
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return
+            pending = self._wait(remaining)
+
+    def _wait(self, timeout: Optional[float]) -> List[_FollowedFile]:
+        """Block until followed files may have changed; returns those files"""
+        if self._inotify is None:
+            time.sleep(self.poll_interval if timeout is None else min(self.poll_interval, timeout))
+            return self.files
+
+        changed = []
+        for event in self._inotify.read(timeout):
+            if event.mask & inotify.IN_Q_OVERFLOW:
+                return self.files
+            directory = self._dirs.get(event.wd)
+            for followed in self._by_name.get((directory, event.name), ()):
+                if followed not in changed:
+                    changed.append(followed)
+        return changed
+
+    def close_inotify(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def close(self):
+        self.close_inotify()
+        for followed in self.files:
+            followed.close()
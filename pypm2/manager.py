@@ -1,17 +1,54 @@
+import os
 import time
 import threading
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
 from .config import Config
 from .process import Process, ProcessStatus
+from .reaper import ExitWatcher
+from .scheduler import Scheduler
+from .sockets import SocketPool, resolve_instances
+from .forkserver import ZygotePool
+from .logpump import DEFAULT_MAX_BUFFER, LogPump
+from .rotation import LogRotator
+from .logreader import LogFollower, log_files, merge_logs, parse_time, read_logs
+from .logindex import LogIndex, index_path
+from .search import search_logs
+from .validate import validate_changes
+from .ecosystem import spec_hash
+from .supervisorlog import SupervisorLog
+from .ignore import PathMatcher
+from .watcher import WATCH_GLOBS, WatchService, setup_default_watch_paths
 
 class ProcessManager:
     """Main process manager class"""
     
-    def __init__(self, config_dir: Optional[str] = None):
+    def __init__(self, config_dir: Optional[str] = None, pipe_logs: bool = True):
+        """pipe_logs is False when this manager exits with the command that
+        created it (--no-daemon): the log pipes would close with it and their
+        processes die of EPIPE, so pipe mode is refused and saved pipe-mode
+        processes write straight to their log files.
+        """
         self.config = Config(config_dir)
+        self.pipe_logs = pipe_logs
         self.processes: Dict[str, Process] = {}
+        self._lock = threading.RLock()
+        self.exit_watcher = ExitWatcher()
+        self.scheduler = Scheduler()
+        self.sockets = SocketPool()
+        self.zygotes = ZygotePool(str(self.config.logs_dir))
+        self.log_pump = LogPump(self.config.get('log_buffer_size', DEFAULT_MAX_BUFFER))
+        self.supervisor_log = SupervisorLog(**self.config.get('supervisor_log', {}))
+        self.rotator = LogRotator(self.log_pump, self.supervisor_log)
+        self._log_indexes: Dict[str, LogIndex] = {}
+        self.watch_service = WatchService(self.config.get('watch_backend', 'auto'),
+                                          self.config.get('watch_debounce', 0.3))
         self.monitoring = False
         self.monitor_thread = None
+        self._monitor_wakeup = threading.Event()
+        
+        # Exits are event driven; this only paces resource sampling
+        self.monitor_interval = float(self.config.get('monitor_interval', 1.0))
         
         # Load saved processes
         self._load_processes()
@@ -19,107 +56,199 @@ class ProcessManager:
         # Start monitoring
         self.start_monitoring()
     
-    def start(self, name: str, script: str, **kwargs) -> bool:
-        """Start a new process or restart existing one"""
-        if name in self.processes:
-            return self.processes[name].restart()
+    def start(self, name: str, script: str, instances=None, **kwargs) -> bool:
+        """Start a new process or restart existing one
+        
+        With instances (a count or 'max'), start a group of instances named
+        '<name>:<id>' that share the sockets declared in listen.
+        
+        The name is claimed before anything is spawned, so concurrent starts
+        of the same name (two CLIs racing) give one process: the later calls
+        wait for the first and restart it.
+        """
+        if kwargs.get('log_mode') == 'pipe' and not self.pipe_logs and not self._resolve(name):
+            raise ValueError("log_mode 'pipe' needs the daemon: the pipes would close when this command exits")
+        
+        if instances is not None:
+            return self._start_group(name, script, resolve_instances(instances), **kwargs)
         
         process = Process(name, script, self.config, **kwargs)
-        if process.start():
-            self.processes[name] = process
-            self._save_processes()
+        with self._lock:
+            claimed = not self._resolve(name)
+            if claimed:
+                # Held until started: a concurrent restart of the name waits for it
+                process._lock.acquire()
+                self.processes[name] = process
+        if not claimed:
+            return self.restart(name)
+        
+        try:
+            self._attach(process)
+            started = process.start()
+        finally:
+            process._lock.release()
+        if started:
+            self._save_processes([name])
             return True
+        with self._lock:
+            if self.processes.get(name) is process:
+                del self.processes[name]
+        self.watch_service.unsubscribe(name)
         return False
     
     def stop(self, name: str, force: bool = False) -> bool:
-        """Stop a process"""
+        """Stop a process or every instance of a group"""
         if name not in self.processes:
-            return False
+            return self._apply_group(name, lambda member: self.processes[member].stop(force))
         
         result = self.processes[name].stop(force)
         if result:
-            self._save_processes()
+            self._save_processes([name])
         return result
     
     def restart(self, name: str) -> bool:
-        """Restart a process"""
+        """Restart a process or every instance of a group"""
         if name not in self.processes:
-            return False
+            return self._apply_group(name, lambda member: self.processes[member].restart())
         
         result = self.processes[name].restart()
         if result:
-            self._save_processes()
+            self._save_processes([name])
         return result
     
+    def reload(self, name: str, batch_size: int = 1, ready_timeout: Optional[int] = None) -> bool:
+        """Rolling zero-downtime reload of a process or group"""
+        names = self._resolve(name)
+        if not names:
+            return False
+        
+        results = self._rolling_reload(names, batch_size, ready_timeout)
+        return len(results) == len(names) and all(r['success'] for r in results.values())
+    
     def delete(self, name: str) -> bool:
-        """Delete a process"""
+        """Delete a process or a whole group"""
         if name not in self.processes:
-            return False
+            return self._apply_group(name, self._delete)
         
-        process = self.processes[name]
-        if process.status == ProcessStatus.ONLINE:
-            process.stop()
+        if not self._delete(name):
+            return False
         
-        del self.processes[name]
-        self._save_processes()
+        self._save_processes([name])
         return True
     
-    def stop_all(self, force: bool = False) -> int:
-        """Stop all processes"""
-        stopped = 0
-        for process in self.processes.values():
-            if process.status == ProcessStatus.ONLINE:
-                if process.stop(force):
-                    stopped += 1
+    def stop_all(self, force: bool = False, parallel: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Stop all running processes, returning per-process results"""
+        names = [p.name for p in self._snapshot() if p.status == ProcessStatus.ONLINE]
+        results = self._run_bulk(names, lambda name: self.processes[name].stop(force), parallel)
         
-        self._save_processes()
-        return stopped
+        self._save_processes(names)
+        return results
     
-    def restart_all(self) -> int:
-        """Restart all processes"""
-        restarted = 0
-        for process in self.processes.values():
-            if process.restart():
-                restarted += 1
+    def restart_all(self, parallel: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Restart all processes, returning per-process results"""
+        names = [p.name for p in self._snapshot()]
+        results = self._run_bulk(names, lambda name: self.processes[name].restart(), parallel)
         
-        self._save_processes()
-        return restarted
+        self._save_processes(names)
+        return results
     
-    def delete_all(self) -> int:
-        """Delete all processes"""
-        count = len(self.processes)
-        for name in list(self.processes.keys()):
-            self.delete(name)
-        return count
+    def reload_all(self, batch_size: int = 1,
+                   ready_timeout: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Rolling reload of every process, returning per-process results"""
+        names = [p.name for p in self._snapshot()]
+        return self._rolling_reload(names, batch_size, ready_timeout)
+    
+    def delete_all(self, parallel: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Delete all processes, returning per-process results"""
+        names = [p.name for p in self._snapshot()]
+        results = self._run_bulk(names, self._delete, parallel)
+        
+        self._save_processes(names)
+        return results
+    
+    def group_members(self, group: str) -> List[str]:
+        """Names of the instances of a group, ordered by instance id"""
+        members = [p for p in self._snapshot() if p.group == group]
+        return [p.name for p in sorted(members, key=lambda p: p.instance_id or 0)]
     
     def list(self) -> List[Dict[str, Any]]:
         """List all processes"""
-        return [process.to_dict() for process in self.processes.values()]
+        return [process.to_dict() for process in self._snapshot()]
     
     def get_process(self, name: str) -> Optional[Process]:
         """Get process by name"""
         return self.processes.get(name)
     
-    def logs(self, name: str, lines: int = 20, follow: bool = False) -> List[str]:
-        """Get process logs"""
+    def describe(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get process information as a dictionary"""
+        process = self.processes.get(name)
+        return process.to_dict() if process else None
+    
+    def resurrect(self) -> Dict[str, str]:
+        """Start every saved process that is not currently running"""
+        results = {}
+        for process in self._snapshot():
+            if process.status == ProcessStatus.ONLINE:
+                results[process.name] = "running"
+            elif process.start():
+                results[process.name] = "resurrected"
+            else:
+                results[process.name] = "failed"
+        
+        self._save_processes([name for name, state in results.items() if state != "running"])
+        return results
+    
+    def logs(self, name: str, lines: int = 20, follow: bool = False, stream: str = 'out',
+             since=None, until=None) -> List[str]:
+        """Get the last lines of a process's stdout log, error log or both ('out', 'err', 'both')
+        
+        since/until (timestamps or strings such as '14:02' or '10m') select a
+        time window across the current and rotated logs instead.
+        follow is accepted for compatibility; use follow_logs() to stream new lines.
+        """
         if name not in self.processes:
             return []
         
         process = self.processes[name]
+        since = parse_time(since) if since is not None else None
+        until = parse_time(until) if until is not None else None
+        return read_logs(process.log_file, process.error_file, lines, stream, since, until)
+    
+    def merge_logs(self, names: List[str], lines: int = 20, stream: str = 'both',
+                   since=None, until=None) -> List[str]:
+        """Chronological view of several processes' logs as 'label | line' strings
+        
+        names may contain process names, group names or 'all'; stdout lines are
+        labelled with the process name and error lines with 'name err'.
+        """
+        since = parse_time(since) if since is not None else None
+        until = parse_time(until) if until is not None else None
+        files = log_files(self.config.logs_dir, self._expand(names), stream)
+        return list(merge_logs(files, lines, since, until))
+    
+    def grep(self, pattern: str, names=None, stream: str = 'both', ignore_case: bool = False,
+             since=None, until=None, limit: Optional[int] = None) -> List[Dict]:
+        """Search current and rotated logs of processes for a regular expression
+        
+        Returns {name, file, offset, line} dicts; names defaults to all processes.
+        """
+        names = ['all'] if not names else ([names] if isinstance(names, str) else list(names))
+        since = parse_time(since) if since is not None else None
+        until = parse_time(until) if until is not None else None
+        files = log_files(self.config.logs_dir, self._expand(names), stream)
+        return search_logs(files, pattern, ignore_case, since, until, limit)
+    
+    def follow_logs(self, name='all', stream: str = 'out', timeout: Optional[float] = None,
+                    merge: bool = False) -> Iterator[Tuple[str, str]]:
+        """Yield (label, line) for new log lines of processes, groups or all processes"""
+        names = [name] if isinstance(name, str) else list(name)
+        files = log_files(self.config.logs_dir, self._expand(names), stream)
         
+        follower = LogFollower(files, merge=merge)
         try:
-            with open(process.log_file, 'r') as f:
-                log_lines = f.readlines()
-            
-            if follow:
-                # In a real implementation, this would tail the file
-                # For now, just return the last lines
-                return log_lines[-lines:] if lines > 0 else log_lines
-            else:
-                return log_lines[-lines:] if lines > 0 else log_lines
-                
-        except FileNotFoundError:
-            return []
+            yield from follower.follow(timeout)
+        finally:
+            follower.close()
     
     def flush_logs(self, name: Optional[str] = None) -> bool:
         """Flush logs for process or all processes"""
@@ -130,39 +259,413 @@ class ProcessManager:
             try:
                 process.log_file.unlink(missing_ok=True)
                 process.error_file.unlink(missing_ok=True)
+                self._reopen_logs(process)
                 return True
             except Exception:
                 return False
         else:
             # Flush all logs
             success = True
-            for process in self.processes.values():
+            for process in self._snapshot():
                 try:
                     process.log_file.unlink(missing_ok=True)
                     process.error_file.unlink(missing_ok=True)
+                    self._reopen_logs(process)
                 except Exception:
                     success = False
             return success
     
+    def watch(self, name: str, paths: Optional[List[str]] = None, enabled: bool = True,
+              include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+              validate: Optional[bool] = None, check: Optional[str] = None) -> bool:
+        """Restart a process or group when watched files change, or stop watching
+        
+        paths are relative to the process's cwd; without them the script's
+        directory (and a project's src/lib/app directories) are watched.
+        include/exclude replace the process's watch globs when given.
+        validate (byte-compile changed files) and check (a shell command that
+        must exit 0) replace the process's pre-restart checks when given; an
+        empty check removes it.
+        """
+        names = self._resolve(name)
+        if not names:
+            return False
+        for process_name in names:
+            process = self.processes[process_name]
+            process.watch = (list(paths) if paths else True) if enabled else False
+            if include is not None:
+                process.watch_include = list(include)
+            if exclude is not None:
+                process.watch_exclude = list(exclude)
+            if validate is not None:
+                process.watch_validate = validate
+            if check is not None:
+                process.watch_check = check or None
+            self._subscribe_watch(process)
+        self._save_processes(names)
+        return True
+    
+    def plan(self, apps: Dict[str, Dict[str, Any]], source: str) -> Dict[str, str]:
+        """What apply() would do to each app: start, restart, delete or nothing ('unchanged')
+        
+        Apps are compared by spec hash with the processes they were started
+        from; processes applied from source whose app is gone are deleted.
+        """
+        actions = {}
+        for name, spec in apps.items():
+            members = [self.processes[member] for member in self._resolve(name)]
+            if not members:
+                actions[name] = 'start'
+            elif any(process.spec_hash != spec_hash(spec) for process in members):
+                actions[name] = 'restart'
+            elif any(process.status != ProcessStatus.ONLINE for process in members):
+                actions[name] = 'start'
+            else:
+                actions[name] = 'unchanged'
+        
+        for process in self._snapshot():
+            name = process.group or process.name
+            if process.ecosystem == source and name not in apps:
+                actions[name] = 'delete'
+        return actions
+    
+    def apply(self, apps: Dict[str, Dict[str, Any]], source: str, parallel: Optional[int] = None,
+              dry_run: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Reconcile the processes with an ecosystem's apps (see ecosystem.load_ecosystem)
+        
+        New apps are started, apps whose spec changed are reloaded with the
+        new spec, stopped ones are started again and removed ones deleted,
+        at most parallel at a time. Returns each app's action and, unless
+        dry_run, its per-process result.
+        """
+        actions = self.plan(apps, source)
+        if dry_run:
+            return {name: {'action': action} for name, action in actions.items()}
+        
+        def reconcile(name: str) -> bool:
+            action = actions[name]
+            if action == 'delete':
+                return self.delete(name)
+            if action == 'start' and self._resolve(name):
+                return self.restart(name)
+            spec = dict(apps[name])
+            start = self._reconfigure if action == 'restart' else self.start
+            return start(name, spec.pop('script'), ecosystem=source,
+                         spec_hash=spec_hash(apps[name]), **spec)
+        
+        todo = [name for name, action in actions.items() if action != 'unchanged']
+        results = self._run_bulk(todo, reconcile, parallel)
+        unchanged = {'success': True, 'duration': 0.0, 'error': None}
+        return {name: dict(results.get(name, unchanged), action=action)
+                for name, action in actions.items()}
+    
+    def rotate_logs(self, name: Optional[str] = None) -> Dict[str, List[str]]:
+        """Rotate the logs of a process, group or every process now"""
+        if name and name != 'all':
+            names = self._resolve(name)
+        else:
+            names = [p.name for p in self._snapshot()]
+        
+        rotated = {}
+        for process_name in names:
+            process = self.processes.get(process_name)
+            if process is None:
+                continue
+            policy = process.rotation_policy(self.config.get('log_rotate'))
+            copytruncate = process.log_mode != 'pipe'
+            rotated[process_name] = [
+                str(segment) for segment in (
+                    self.rotator.rotate(path, policy, copytruncate)
+                    for path in (process.log_file, process.error_file)
+                ) if segment
+            ]
+        return rotated
+    
     def start_monitoring(self):
         """Start process monitoring thread"""
         if not self.monitoring:
             self.monitoring = True
+            self._monitor_wakeup.clear()
             self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
             self.monitor_thread.start()
     
     def stop_monitoring(self):
         """Stop process monitoring"""
         self.monitoring = False
-        if self.monitor_thread:
+        self._monitor_wakeup.set()
+        if self.monitor_thread and self.monitor_thread is not threading.current_thread():
             self.monitor_thread.join()
+        self.exit_watcher.close()
+        self.scheduler.close()
+        self.zygotes.close()
+        self.watch_service.close()
+        self.rotator.close()
+        self.supervisor_log.close()
+        self.log_pump.close()
     
     def _monitor_loop(self):
-        """Main monitoring loop"""
+        """Resource sampling loop (memory limits, log rotation)"""
         while self.monitoring:
-            for process in self.processes.values():
+            for process in self._snapshot():
                 process.monitor()
-            time.sleep(1)  # Check every second
+                self._maintain_logs(process)
+            self._monitor_wakeup.wait(self.monitor_interval)
+    
+    def _expand(self, names: List[str]) -> List[str]:
+        """Process names addressed by a list of process names, group names or 'all'"""
+        if 'all' in names:
+            return [p.name for p in self._snapshot()]
+        expanded = []
+        for name in names:
+            expanded.extend(n for n in self._resolve(name) if n not in expanded)
+        return expanded
+    
+    def _resolve(self, name: str) -> List[str]:
+        """Process names addressed by a process or group name"""
+        if name in self.processes:
+            return [name]
+        return self.group_members(name)
+    
+    def _start_group(self, group: str, script: str, instances: int, **kwargs) -> bool:
+        """Create and start the instances of a new group"""
+        members = [Process(f"{group}:{instance_id}", script, self.config,
+                           group=group, instance_id=instance_id, **kwargs)
+                   for instance_id in range(instances)]
+        
+        with self._lock:
+            claimed = not self._resolve(group) and not any(p.name in self.processes for p in members)
+            if claimed:
+                for process in members:
+                    self._attach(process)
+                    self.processes[process.name] = process
+        if not claimed:
+            return self.restart(group)
+        
+        results = self._run_bulk([p.name for p in members], lambda name: self.processes[name].start())
+        self._save_processes([p.name for p in members])
+        return all(r['success'] for r in results.values())
+    
+    def _reconfigure(self, name: str, script: str, instances=None, **kwargs) -> bool:
+        """Give a process or group new options and reload it in place
+        
+        Unlike delete and start, the listen sockets stay open meanwhile and
+        the restart and crash history is kept. A group gains or loses
+        instances to match instances; a process turning into a group (or
+        back) is recreated.
+        """
+        if (instances is None) != (name in self.processes):
+            if not self.delete(name):
+                return False
+            return self.start(name, script, instances, **kwargs)
+        
+        if instances is None:
+            options = {name: kwargs}
+        else:
+            count = resolve_instances(instances)
+            options = {f"{name}:{instance_id}": dict(kwargs, group=name, instance_id=instance_id)
+                       for instance_id in range(count)}
+        names = self._resolve(name)
+        surplus = [member for member in names if member not in options]
+        for member in surplus:
+            self._delete(member)
+        
+        kept = [member for member in names if member in options]
+        for member in kept:
+            process = self.processes[member]
+            # The zygote of the old options is no longer needed
+            process.recycle_zygote()
+            process.update_options(script, **options[member])
+            self._subscribe_watch(process)
+        results = self._rolling_reload(kept, 1, None)
+        success = len(results) == len(kept) and all(r['success'] for r in results.values())
+        
+        added = [Process(member, script, self.config, **member_options)
+                 for member, member_options in options.items() if member not in names]
+        with self._lock:
+            for process in added:
+                self._attach(process)
+                self.processes[process.name] = process
+        if added:
+            results = self._run_bulk([p.name for p in added], lambda member: self.processes[member].start())
+            success = success and all(r['success'] for r in results.values())
+        
+        self.sockets.close_unused(spec for p in self._snapshot() for spec in p.listen)
+        self._save_processes(surplus + [p.name for p in added])
+        return success
+    
+    def _recycle_zygotes(self, names: List[str]):
+        """Replace the zygotes of processes about to be reloaded with new code"""
+        for name in names:
+            process = self.processes.get(name)
+            if process is not None:
+                process.recycle_zygote()
+    
+    def _apply_group(self, group: str, operation: Callable[[str], bool]) -> bool:
+        """Run operation on every instance of a group and persist once"""
+        members = self.group_members(group)
+        if not members:
+            return False
+        
+        results = self._run_bulk(members, operation)
+        self._save_processes(members)
+        return all(r['success'] for r in results.values())
+    
+    def _rolling_reload(self, names: List[str], batch_size: int,
+                        ready_timeout: Optional[int]) -> Dict[str, Dict[str, Any]]:
+        """Reload names batch by batch, stopping at the first failed batch"""
+        batch_size = max(1, batch_size)
+        results = {}
+        
+        # A reload deploys new code: re-import it in fresh zygotes
+        self._recycle_zygotes(names)
+        
+        for i in range(0, len(names), batch_size):
+            batch = names[i:i + batch_size]
+            batch_results = self._run_bulk(
+                batch, lambda name: self.processes[name].reload(ready_timeout), batch_size)
+            results.update(batch_results)
+            
+            # Keep the remaining instances serving rather than rolling a broken release
+            if not all(r['success'] for r in batch_results.values()):
+                break
+        
+        self._save_processes(names)
+        return results
+    
+    def _delete(self, name: str) -> bool:
+        """Stop and forget a process without persisting"""
+        process = self.processes.get(name)
+        if process is None:
+            return False
+        
+        if process.status == ProcessStatus.ONLINE:
+            process.stop()
+        
+        with self._lock:
+            self.processes.pop(name, None)
+        self.watch_service.unsubscribe(name)
+        self._release_logs(process)
+        
+        if process.listen:
+            self.sockets.close_unused(spec for p in self._snapshot() for spec in p.listen)
+        return True
+    
+    def _run_bulk(self, names: List[str], operation: Callable[[str], bool],
+                  parallel: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Apply operation to each process through a bounded worker pool"""
+        if parallel is None:
+            parallel = int(self.config.get('parallel', 10))
+        
+        def run(name: str):
+            started = time.monotonic()
+            error = None
+            try:
+                success = bool(operation(name))
+            except Exception as e:
+                success = False
+                error = str(e)
+            return name, {
+                'success': success,
+                'duration': round(time.monotonic() - started, 3),
+                'error': error
+            }
+        
+        results = {}
+        if not names:
+            return results
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(names)))) as pool:
+            for name, result in pool.map(run, names):
+                results[name] = result
+        return results
+    
+    def _attach(self, process: Process):
+        """Hook a process up to the shared exit watcher and scheduler"""
+        process.exit_watcher = self.exit_watcher
+        process.scheduler = self.scheduler
+        process.socket_pool = self.sockets
+        process.zygote_pool = self.zygotes
+        process.log_pump = self.log_pump
+        process.pipe_logs = self.pipe_logs
+        process.supervisor_log = self.supervisor_log
+        self._subscribe_watch(process)
+    
+    def _subscribe_watch(self, process: Process):
+        """Restart process on changes to its watched files, through the shared watch service"""
+        if not process.watch:
+            self.watch_service.unsubscribe(process.name)
+            return
+        if isinstance(process.watch, (list, tuple)):
+            paths = [os.path.join(process.cwd, path) for path in process.watch]
+        else:
+            paths = setup_default_watch_paths(os.path.join(process.cwd, process.script))
+        matcher = PathMatcher(process.watch_exclude, process.watch_include or WATCH_GLOBS,
+                              base=os.path.realpath(process.cwd))
+        matcher.add_roots(os.path.realpath(path if os.path.isdir(path) else os.path.dirname(path))
+                          for path in paths)
+        self.watch_service.subscribe(process.name, paths, self._on_watched_change,
+                                     filter=matcher.matches,
+                                     prune=lambda path: matcher.ignored(path, is_dir=True))
+    
+    def _on_watched_change(self, name: str, paths: List[str]):
+        process = self.processes.get(name)
+        if process is None or process.status != ProcessStatus.ONLINE:
+            return
+        # A file rejected earlier is still broken unless validated again
+        paths = sorted(process.held_changes.union(paths))
+        shown = ', '.join(os.path.basename(path) for path in paths[:3])
+        more = f" and {len(paths) - 3} more" if len(paths) > 3 else ''
+        if process.watch_validate or process.watch_check:
+            env = os.environ.copy()
+            env.update(process.env)
+            errors = validate_changes(paths, process.watch_validate, process.watch_check,
+                                      cwd=process.cwd, env=env, interpreter=process.interpreter)
+            if errors:
+                process.held_changes = set(paths)
+                process._log_error(f"Not restarting after changes to {shown}{more}: "
+                                   f"validation failed\n" + '\n'.join(errors))
+                return
+            process.held_changes = set()
+        process._log_info(f"Restarting after changes to {shown}{more}")
+        # Keep forking from the warm zygote unless a module it preloaded changed
+        process.recycle_zygote(paths)
+        self.restart(name)
+    
+    def _maintain_logs(self, process: Process):
+        """Index new log lines, then rotate the logs of process when they are due"""
+        try:
+            if self.config.get('log_index', True):
+                for path in (process.log_file, process.error_file):
+                    index = self._log_indexes.get(str(path))
+                    if index is None:
+                        index = self._log_indexes[str(path)] = LogIndex(path)
+                    index.update()
+            
+            policy = process.rotation_policy(self.config.get('log_rotate'))
+            for path in (process.log_file, process.error_file):
+                self.rotator.check(path, policy, process.log_mode != 'pipe')
+        except (OSError, ValueError) as e:
+            process._log_warning(f"Log maintenance failed: {e}")
+    
+    def _release_logs(self, process: Process):
+        """Drop the handles and indexes kept for a deleted process's log files"""
+        for path in (process.log_file, process.error_file):
+            self.supervisor_log.release(path)
+            self.rotator.forget(path)
+            self._log_indexes.pop(str(path), None)
+    
+    def _reopen_logs(self, process: Process):
+        """Make the log writers recreate files that were removed, and drop their indexes"""
+        for path in (process.log_file, process.error_file):
+            self.log_pump.reopen(path)
+            self.supervisor_log.reopen(path)
+            index_path(path).unlink(missing_ok=True)
+            self._log_indexes.pop(str(path), None)
+    
+    def _snapshot(self) -> List[Process]:
+        """Copy of the managed processes, safe to iterate from any thread"""
+        with self._lock:
+            return list(self.processes.values())
     
     def _load_processes(self):
         """Load processes from configuration"""
@@ -171,12 +674,14 @@ class ProcessManager:
         for name, config in processes_config.items():
             try:
                 process = Process(name, config['script'], self.config, **config.get('options', {}))
+                self._attach(process)
                 
                 # Restore process state
                 if config.get('pid'):
                     process.pid = config['pid']
                     if process.is_alive():
                         process.status = ProcessStatus.ONLINE
+                        process.watch_exit()
                     else:
                         process.status = ProcessStatus.STOPPED
                         process.pid = None
@@ -185,29 +690,31 @@ class ProcessManager:
             except Exception as e:
                 print(f"Failed to load process {name}: {e}")
     
-    def _save_processes(self):
-        """Save processes to configuration"""
+    def _save_processes(self, names: Optional[List[str]] = None):
+        """Save processes to configuration
+        
+        With names, only those records are written (or removed, for processes
+        that no longer exist), so one operation costs the same however many
+        processes are managed.
+        """
         processes_config = {}
         
-        for name, process in self.processes.items():
+        with self._lock:
+            if names is None:
+                items = list(self.processes.items())
+            else:
+                items = [(name, self.processes[name]) for name in names if name in self.processes]
+        
+        for name, process in items:
             processes_config[name] = {
                 'script': process.script,
                 'pid': process.pid,
                 'status': process.status.value,
-                'options': {
-                    'cwd': process.cwd,
-                    'args': process.args,
-                    'env': process.env,
-                    'interpreter': process.interpreter,
-                    'max_restarts': process.max_restarts,
-                    'restart_delay': process.restart_delay,
-                    'autorestart': process.autorestart,
-                    'watch': process.watch,
-                    'max_memory_restart': process.max_memory_restart
-                }
+                'options': process.get_options()
             }
         
-        self.config.save_processes(processes_config)
+        deleted = None if names is None else [name for name in names if name not in processes_config]
+        self.config.save_processes(processes_config, deleted)
     
     def __del__(self):
         """Cleanup when manager is destroyed"""
@@ -1,13 +1,26 @@
 import os
 import signal
 import subprocess
+import threading
 import time
 import psutil
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set, Tuple
 from enum import Enum
 
+from .backoff import RestartPolicy
+from .sockets import BOOTSTRAP_SCRIPT, SocketPool
+from .forkserver import ZygoteError, ZygotePool
+from .logpump import LogPump
+from .rotation import RotationPolicy
+from .logreader import log_paths
+from .supervisorlog import format_message, write_message
+
+# Seconds between looks at an exit while a stop or reload holds the process lock
+EXIT_RETRY_DELAY = 0.05
+
 class ProcessStatus(Enum):
     """Process status enumeration"""
     ONLINE = "online"
@@ -15,6 +28,33 @@ class ProcessStatus(Enum):
     STOPPING = "stopping"
     ERRORED = "errored"
     LAUNCHING = "launching"
+    CRASHLOOP = "crashloop"
+
+def _pid_alive(pid: int) -> bool:
+    """Check whether a PID refers to a running process (an unreaped zombie is not)"""
+    try:
+        process = psutil.Process(pid)
+        return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+
+def _listening_addresses(pid: int) -> Set[Tuple[str, int]]:
+    """TCP addresses a process or its children are listening on"""
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return set()
+    addresses = set()
+    for process in processes:
+        try:
+            # psutil < 6 only has connections()
+            lister = getattr(process, 'net_connections', None) or process.connections
+            connections = lister(kind='inet')
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        addresses.update(tuple(c.laddr[:2]) for c in connections if c.status == psutil.CONN_LISTEN)
+    return addresses
 
 class Process:
     """Represents a managed process"""
@@ -33,109 +73,223 @@ class Process:
         self.restart_delay = kwargs.get('restart_delay', 1000)
         self.autorestart = kwargs.get('autorestart', True)
         self.watch = kwargs.get('watch', False)
+        # .gitignore-style globs narrowing which watched files restart the process
+        self.watch_include = self._glob_list(kwargs.get('watch_include'))
+        self.watch_exclude = self._glob_list(kwargs.get('watch_exclude'))
+        # Checks a change must pass before a watch restart replaces the running process
+        self.watch_validate = kwargs.get('watch_validate', False)
+        self.watch_check = kwargs.get('watch_check')
+        # Changes a failed validation held back; validated again with the next ones
+        self.held_changes: Set[str] = set()
         self.max_memory_restart = kwargs.get('max_memory_restart', None)
+        # Set by `pypm2 apply`: the ecosystem file and app spec this process was started from
+        self.ecosystem = kwargs.get('ecosystem')
+        self.spec_hash = kwargs.get('spec_hash')
+        self.restart_policy = RestartPolicy(**kwargs)
+        
+        # Cluster mode: instance of a group sharing supervisor-owned sockets
+        self.group = kwargs.get('group')
+        self.instance_id = kwargs.get('instance_id')
+        listen = kwargs.get('listen') or []
+        self.listen = [listen] if isinstance(listen, str) else list(listen)
+        self.ready_timeout = kwargs.get('ready_timeout', 1000)
+        
+        # Zygote mode: fork instances from a pre-warmed interpreter
+        self.zygote = kwargs.get('zygote', False)
+        preload = kwargs.get('preload') or []
+        self.preload = preload.split(',') if isinstance(preload, str) else list(preload)
+        self.gc_freeze = kwargs.get('gc_freeze', True)
+        self.zygote_pool = None
+        self.socket_pool = None
+        
+        # Log mode: 'file' hands the log files to the child, 'pipe' has the
+        # supervisor drain stdout/stderr (required for log_time)
+        self.log_mode = kwargs.get('log_mode', 'file')
+        self.log_time = kwargs.get('log_time', False)
+        self.log_pump = None
+        # Cleared by a manager that exits with its command: pipe mode then falls back to the files
+        self.pipe_logs = True
+        # Set by the manager to queue supervisor messages instead of writing them inline
+        self.supervisor_log = None
+        
+        # Log rotation, overriding the global log_rotate settings
+        self.log_max_size = kwargs.get('log_max_size')
+        self.log_rotate_interval = kwargs.get('log_rotate_interval')
+        self.log_retain = kwargs.get('log_retain')
+        self.log_compress = kwargs.get('log_compress')
         
         # Process state
         self.pid = None
         self.status = ProcessStatus.STOPPED
         self.restart_count = 0
+        self.unstable_restarts = 0
+        # Long enough to hold every crash a crash loop needs
+        self.crash_history = deque(maxlen=max(20, int(self.restart_policy.crashloop_threshold)))
+        self._half_open = False
         self.created_at = datetime.now()
         self.started_at = None
         self.stopped_at = None
         self.process = None
+        self.exit_code = None
+        
+        # Set by the manager to get exit notifications instead of polling
+        self.exit_watcher = None
+        # Set by the manager to book delayed restarts instead of sleeping
+        self.scheduler = None
+        self._pending_restart = None
+        self._restart_generation = 0
+        self._lock = threading.RLock()
         
         # Files
-        self.log_file = self.config.logs_dir / f"{name}.log"
-        self.error_file = self.config.logs_dir / f"{name}.error.log"
+        self.log_file, self.error_file = log_paths(self.config.logs_dir, name)
         self.pid_file = self.config.pids_dir / f"{name}.pid"
         
     def start(self) -> bool:
         """Start the process"""
+        with self._lock:
+            self._cancel_pending_restart()
+            self._reset_crash_state()
+            return self._start()
+    
+    def _start(self) -> bool:
         if self.status == ProcessStatus.ONLINE:
             return False
             
         self.status = ProcessStatus.LAUNCHING
         
         try:
-            # Prepare command
-            cmd = [self.interpreter, self.script] + self.args
-            
-            # Prepare environment
-            env = os.environ.copy()
-            env.update(self.env)
+            self._adopt(self._spawn())
+            return True
             
-            # Open log files
-            log_file = open(self.log_file, 'a')
-            error_file = open(self.error_file, 'a')
+        except Exception as e:
+            self.status = ProcessStatus.ERRORED
+            self._log_error(f"Failed to start process: {e}")
+            return False
+    
+    def _spawn(self) -> subprocess.Popen:
+        """Launch a new child without touching the process state"""
+        # Prepare environment
+        env = os.environ.copy()
+        env.update(self.env)
+        
+        # Prepare command
+        cmd, pass_fds = self._build_command(env)
+        
+        # Output goes to the log files, or to pipes drained by the supervisor
+        stdout_fd, stderr_fd = self._open_output()
+        try:
+            if self.zygote:
+                try:
+                    return self._spawn_from_zygote(env, stdout_fd, stderr_fd, pass_fds)
+                except ZygoteError as e:
+                    self._log_warning(f"Zygote unavailable ({e}), starting a fresh interpreter")
             
             # Start process
-            self.process = subprocess.Popen(
+            return subprocess.Popen(
                 cmd,
                 cwd=self.cwd,
                 env=env,
-                stdout=log_file,
-                stderr=error_file,
+                stdout=stdout_fd,
+                stderr=stderr_fd,
+                pass_fds=pass_fds,
                 preexec_fn=os.setsid
             )
-            
-            self.pid = self.process.pid
-            self.status = ProcessStatus.ONLINE
-            self.started_at = datetime.now()
-            
-            # Save PID to file
-            with open(self.pid_file, 'w') as f:
-                f.write(str(self.pid))
-            
-            return True
-            
-        except Exception as e:
-            self.status = ProcessStatus.ERRORED
-            self._log_error(f"Failed to start process: {e}")
+        finally:
+            # The child holds its own copies
+            os.close(stdout_fd)
+            os.close(stderr_fd)
+    
+    def _open_output(self):
+        """Descriptors for the child's stdout and stderr"""
+        if self.log_mode == 'pipe' and self.pipe_logs:
+            if self.log_pump is None:
+                self.log_pump = LogPump()
+            return (self.log_pump.pipe(self.log_file, self.log_time),
+                    self.log_pump.pipe(self.error_file, self.log_time))
+        
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_CLOEXEC
+        stdout_fd = os.open(self.log_file, flags, 0o644)
+        stderr_fd = os.open(self.error_file, flags, 0o644)
+        return stdout_fd, stderr_fd
+    
+    def _spawn_from_zygote(self, env, stdout_fd, stderr_fd, listen_fds):
+        """Fork the instance from the zygote matching this process"""
+        if self.zygote_pool is None:
+            self.zygote_pool = ZygotePool(str(self.config.logs_dir))
+        
+        zygote = self.zygote_pool.get(self.interpreter, self.cwd, self.preload,
+                                      self._zygote_env(), self.gc_freeze)
+        return zygote.spawn(self.script, self.args, self.cwd, env,
+                            stdout_fd, stderr_fd, listen_fds)
+    
+    def recycle_zygote(self, changed: Optional[List[str]] = None) -> bool:
+        """Drop this process's zygote so the next start imports the code as it is now
+        
+        With changed, only when the zygote preloaded one of those files.
+        """
+        if not self.zygote or self.zygote_pool is None:
             return False
+        return self.zygote_pool.discard(self.interpreter, self.cwd, self.preload,
+                                        self._zygote_env(), self.gc_freeze, changed)
+    
+    def _zygote_env(self) -> Dict[str, str]:
+        env = os.environ.copy()
+        env.update(self.env)
+        return env
+    
+    def _adopt(self, process: subprocess.Popen):
+        """Make a spawned child the current instance"""
+        self.process = process
+        self.pid = process.pid
+        self.status = ProcessStatus.ONLINE
+        self.started_at = datetime.now()
+        self.exit_code = None
+        
+        # Save PID to file
+        with open(self.pid_file, 'w') as f:
+            f.write(str(self.pid))
+        
+        self.watch_exit()
+    
+    def _build_command(self, env: Dict[str, str]):
+        """Command line and inherited fds for a new instance"""
+        cmd = [self.interpreter, self.script] + self.args
+        
+        if self.group is not None:
+            env['PYPM2_GROUP'] = self.group
+            env['PYPM2_INSTANCE_ID'] = str(self.instance_id)
+        
+        if not self.listen:
+            return cmd, ()
+        
+        if self.socket_pool is None:
+            self.socket_pool = SocketPool()
+        fds = [sock.fileno() for sock in self.socket_pool.get_all(self.listen)]
+        
+        # The bootstrap moves the sockets to fd 3+ and sets LISTEN_FDS/LISTEN_PID
+        env['PYPM2_LISTEN_FDS'] = ','.join(str(fd) for fd in fds)
+        env['PYPM2_LISTEN_NAMES'] = ':'.join(f"listen{i}" for i in range(len(fds)))
+        return [self.interpreter, BOOTSTRAP_SCRIPT, self.script] + self.args, tuple(fds)
     
     def stop(self, force: bool = False) -> bool:
         """Stop the process"""
+        with self._lock:
+            pending = self._cancel_pending_restart()
+            if (pending and self.status != ProcessStatus.ONLINE) or self.status == ProcessStatus.CRASHLOOP:
+                # Nothing is running: just drop the booked restart
+                self.status = ProcessStatus.STOPPED
+                self.stopped_at = datetime.now()
+                return True
+            return self._stop(force)
+    
+    def _stop(self, force: bool) -> bool:
         if self.status != ProcessStatus.ONLINE:
             return False
             
         self.status = ProcessStatus.STOPPING
         
         try:
-            if self.process and self.process.poll() is None:
-                if force:
-                    # Force kill
-                    self.process.kill()
-                else:
-                    # Graceful shutdown
-                    self.process.terminate()
-                    
-                    # Wait for process to terminate
-                    try:
-                        self.process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        # Force kill if still alive
-                        self.process.kill()
-                        self.process.wait()
-            
-            # Additional cleanup with psutil
-            if self.pid:
-                try:
-                    if force:
-                        os.killpg(os.getpgid(self.pid), signal.SIGKILL)
-                    else:
-                        os.killpg(os.getpgid(self.pid), signal.SIGTERM)
-                        
-                        # Wait for process to terminate
-                        timeout = 5
-                        while timeout > 0 and self.is_alive():
-                            time.sleep(0.1)
-                            timeout -= 0.1
-                        
-                        # Force kill if still alive
-                        if self.is_alive():
-                            os.killpg(os.getpgid(self.pid), signal.SIGKILL)
-                except (ProcessLookupError, OSError):
-                    pass  # Process already dead
+            self._terminate(self.process, self.pid, force)
             
             self.status = ProcessStatus.STOPPED
             self.stopped_at = datetime.now()
@@ -147,25 +301,77 @@ class Process:
             self._log_error(f"Failed to stop process: {e}")
             return False
     
+    def _terminate(self, process: Optional[subprocess.Popen], pid: Optional[int], force: bool):
+        """Terminate one child and its process group"""
+        if process and process.poll() is None:
+            if force:
+                # Force kill
+                process.kill()
+            else:
+                # Graceful shutdown
+                process.terminate()
+                
+                # Wait for process to terminate
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    # Force kill if still alive
+                    process.kill()
+                    process.wait()
+        
+        # Additional cleanup with psutil
+        if pid:
+            try:
+                if force:
+                    os.killpg(os.getpgid(pid), signal.SIGKILL)
+                else:
+                    os.killpg(os.getpgid(pid), signal.SIGTERM)
+                    
+                    # Wait for process to terminate
+                    timeout = 5
+                    while timeout > 0 and _pid_alive(pid):
+                        time.sleep(0.1)
+                        timeout -= 0.1
+                    
+                    # Force kill if still alive
+                    if _pid_alive(pid):
+                        os.killpg(os.getpgid(pid), signal.SIGKILL)
+            except (ProcessLookupError, OSError):
+                pass  # Process already dead
+    
     def restart(self) -> bool:
         """Restart the process"""
+        with self._lock:
+            self._cancel_pending_restart()
+            self._reset_crash_state()
+            return self._restart()
+    
+    def _restart(self) -> bool:
         self._log_info("Restarting process...")
         
+        # Ports the old instance bound itself must be released before the new one binds them.
+        # Sockets owned by the supervisor (listen) stay bound and queue connections meanwhile.
+        ports_held = (self.status == ProcessStatus.ONLINE and self.pid and not self.listen
+                      and bool(_listening_addresses(self.pid)))
+        
         # Force stop if process is running
         if self.status == ProcessStatus.ONLINE:
             self._log_info(f"Stopping process with PID {self.pid}")
-            if not self.stop():
+            if not self._stop(False):
                 self._log_error("Failed to stop process gracefully, forcing kill")
-                self.stop(force=True)
+                self._stop(True)
         
-        # Wait a bit longer to ensure process is completely stopped
-        time.sleep(max(1.0, self.restart_delay / 1000.0))
+        # Give the kernel time to release the old instance's ports
+        if ports_held:
+            time.sleep(max(1.0, self.restart_delay / 1000.0))
+        else:
+            time.sleep(self.restart_delay / 1000.0)
         
         # Check that no residual process is using the same port/resources
         self._cleanup_resources()
         
         self._log_info("Starting new process instance")
-        result = self.start()
+        result = self._start()
         
         if result:
             self._log_info(f"Process restarted successfully with new PID {self.pid}")
@@ -174,16 +380,58 @@ class Process:
             
         return result
     
+    def reload(self, ready_timeout: Optional[int] = None) -> bool:
+        """Replace the running instance without a gap in service
+        
+        The replacement starts while the old instance still serves the
+        supervisor-owned sockets, and the old one is only stopped once the
+        new one has stayed up for ready_timeout ms. Processes without
+        listen sockets cannot overlap and are restarted instead.
+        """
+        with self._lock:
+            if self.status != ProcessStatus.ONLINE or not self.listen:
+                return self.restart()
+            
+            self._cancel_pending_restart()
+            timeout = self.ready_timeout if ready_timeout is None else ready_timeout
+            old_process, old_pid = self.process, self.pid
+            
+            try:
+                replacement = self._spawn()
+            except Exception as e:
+                self._log_error(f"Failed to start replacement instance: {e}")
+                return False
+            
+            self._log_info(f"Reloading: waiting for replacement PID {replacement.pid}")
+            if not self._wait_ready(replacement, timeout / 1000.0):
+                self._log_error(f"Replacement PID {replacement.pid} exited with code "
+                                f"{replacement.returncode}, keeping PID {old_pid}")
+                return False
+            
+            self._adopt(replacement)
+            try:
+                self._terminate(old_process, old_pid, False)
+            except Exception as e:
+                self._log_error(f"Failed to stop previous instance {old_pid}: {e}")
+            
+            self._log_info(f"Process reloaded, PID {old_pid} replaced by {self.pid}")
+            return True
+    
+    @staticmethod
+    def _wait_ready(process: subprocess.Popen, timeout: float) -> bool:
+        """Wait until the child has stayed alive for timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            time.sleep(0.05)
+        return process.poll() is None
+    
     def is_alive(self) -> bool:
         """Check if process is alive"""
         if not self.pid:
             return False
-            
-        try:
-            process = psutil.Process(self.pid)
-            return process.is_running()
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            return False
+        return _pid_alive(self.pid)
     
     def get_memory_usage(self) -> Optional[int]:
         """Get memory usage in MB"""
@@ -207,22 +455,167 @@ class Process:
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return None
     
+    def watch_exit(self):
+        """Register the current PID with the exit watcher"""
+        if self.exit_watcher and self.pid:
+            self.exit_watcher.watch(self.pid, self._on_exit, self.process)
+    
+    def _on_exit(self, pid: int, returncode: Optional[int]):
+        """Exit notification from the exit watcher
+        
+        Handled on the scheduler: the watcher serves every process and must
+        not wait for a stop or reload holding this process's lock.
+        """
+        if self.scheduler is None:
+            self._handle_exit(pid, returncode)
+        else:
+            self.scheduler.call_later(0, self._handle_exit, pid, returncode)
+    
+    def _handle_exit(self, pid: int, returncode: Optional[int]):
+        if not self._lock.acquire(blocking=self.scheduler is None):
+            # A stop, restart or reload is running: look again once it is over
+            self.scheduler.call_later(EXIT_RETRY_DELAY, self._handle_exit, pid, returncode)
+            return
+        try:
+            # Ignore instances replaced by a restart and exits we caused
+            if pid != self.pid or self.status != ProcessStatus.ONLINE:
+                return
+            self.exit_code = returncode
+            self._handle_crash()
+        finally:
+            self._lock.release()
+    
+    def _handle_crash(self):
+        """Record an unexpected exit and apply the restart policy"""
+        now = datetime.now()
+        uptime = (now - self.started_at).total_seconds() if self.started_at else 0.0
+        policy = self.restart_policy
+        
+        self.status = ProcessStatus.ERRORED
+        self.stopped_at = now
+        self.crash_history.append({
+            'time': now.timestamp(),
+            'exit_code': self.exit_code,
+            'uptime': round(uptime, 3)
+        })
+        self._log_info(f"Process {self.pid} exited with code {self.exit_code} after {uptime:.1f}s")
+        
+        if policy.is_stable(uptime):
+            self.unstable_restarts = 0
+            self._half_open = False
+        
+        if not self.autorestart:
+            return
+        
+        if self._half_open or policy.is_crash_loop(c['time'] for c in self.crash_history):
+            self._open_circuit()
+            return
+        
+        if self.unstable_restarts >= self.max_restarts:
+            self._log_error(f"Too many unstable restarts ({self.unstable_restarts}), giving up")
+            return
+        
+        self.unstable_restarts += 1
+        self.restart_count += 1
+        delay = policy.delay_for(self.unstable_restarts)
+        self._log_info(f"Process crashed, restarting in {delay:.2f}s "
+                       f"({self.unstable_restarts}/{self.max_restarts})")
+        self._schedule_restart(delay)
+    
+    def _open_circuit(self):
+        """Park a crash-looping process, optionally booking one trial restart"""
+        cooldown = self.restart_policy.crashloop_cooldown
+        self.status = ProcessStatus.CRASHLOOP
+        self._half_open = False
+        
+        if cooldown and self.scheduler is not None:
+            self._log_error(f"Crash loop detected, retrying in {cooldown}s")
+            self._schedule_restart(cooldown)
+            self._half_open = True
+        else:
+            self._log_error("Crash loop detected, waiting for a manual restart")
+    
+    def _reset_crash_state(self):
+        """Operator start/restart closes the circuit breaker"""
+        self.unstable_restarts = 0
+        self._half_open = False
+    
+    def _schedule_restart(self, delay: float):
+        """Book a restart without blocking the caller"""
+        if self.scheduler is None:
+            self.restart()
+            return
+        
+        with self._lock:
+            if self._pending_restart is None:
+                self._restart_generation += 1
+                self._pending_restart = self.scheduler.call_later(
+                    delay, self._run_pending_restart, self._restart_generation)
+    
+    def _run_pending_restart(self, generation: int):
+        """Scheduled restart, skipped if cancelled by stop/start/restart"""
+        with self._lock:
+            if self._pending_restart is None or generation != self._restart_generation:
+                return
+            
+            if self.status == ProcessStatus.ONLINE:
+                # Memory restart: stopping and readiness can take their whole timeouts,
+                # so it runs on its own thread and keeps the scheduler workers free
+                threading.Thread(target=self._run_memory_restart, args=(generation,),
+                                 name=f"pypm2-restart-{self.name}", daemon=True).start()
+                return
+            self._pending_restart = None
+            
+            # Crash restart: the old instance is already gone
+            self._cleanup_pid_file()
+            self.pid = None
+            if self._start():
+                self._log_info(f"Process restarted successfully with new PID {self.pid}")
+            else:
+                self._log_error("Failed to restart process")
+    
+    def _run_memory_restart(self, generation: int):
+        """Replace a running instance over its memory limit, unless stop/start/restart came first"""
+        with self._lock:
+            if self._pending_restart is None or generation != self._restart_generation:
+                return
+            self._pending_restart = None
+            
+            # Hand the sockets over without a gap
+            if self.listen:
+                self.reload()
+            else:
+                self._restart()
+    
+    def _cancel_pending_restart(self) -> bool:
+        """Cancel a booked restart, returning whether one was pending"""
+        if self._pending_restart is None:
+            return False
+        self._pending_restart.cancel()
+        self._pending_restart = None
+        return True
+    
     def monitor(self):
         """Monitor process for auto-restart and memory limits"""
-        if not self.is_alive() and self.status == ProcessStatus.ONLINE:
-            self.status = ProcessStatus.ERRORED
-            
-            if self.autorestart and self.restart_count < self.max_restarts:
-                self.restart_count += 1
-                self._log_info(f"Process crashed, restarting ({self.restart_count}/{self.max_restarts})")
-                self.restart()
+        # Exits are pushed by the exit watcher when one is attached
+        if self.exit_watcher is None and self.status == ProcessStatus.ONLINE and not self.is_alive():
+            with self._lock:
+                if self.status == ProcessStatus.ONLINE:
+                    self._handle_crash()
         
         # Check memory limit
         if self.max_memory_restart:
             memory_usage = self.get_memory_usage()
             if memory_usage and self._parse_memory_limit(self.max_memory_restart) < memory_usage:
                 self._log_info(f"Memory limit exceeded ({memory_usage}MB), restarting")
-                self.restart()
+                self._schedule_restart(0)
+    
+    @staticmethod
+    def _glob_list(value) -> List[str]:
+        """Globs given as a list or a comma-separated string"""
+        if not value:
+            return []
+        return value.split(',') if isinstance(value, str) else list(value)
     
     def _parse_memory_limit(self, limit: str) -> int:
         """Parse memory limit string (e.g., '1G', '512M')"""
@@ -233,23 +626,29 @@ class Process:
         else:
             return int(limit)
     
+    def _log(self, level: str, message: str):
+        """Supervisor message: errors go to the error log, the rest to the output log"""
+        path = self.error_file if level == 'ERROR' else self.log_file
+        # In pipe mode the pump owns the file and keeps whole lines together
+        if self.log_mode == 'pipe' and self.log_pump is not None and \
+                self.log_pump.write_line(path, format_message(level, message)):
+            return
+        if self.supervisor_log is not None:
+            self.supervisor_log.write(path, level, message)
+        else:
+            write_message(path, level, message)
+    
     def _log_info(self, message: str):
         """Log info message"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.log_file, 'a') as f:
-            f.write(f"[{timestamp}] INFO: {message}\n")
+        self._log('INFO', message)
     
     def _log_error(self, message: str):
         """Log error message"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.error_file, 'a') as f:
-            f.write(f"[{timestamp}] ERROR: {message}\n")
+        self._log('ERROR', message)
     
     def _log_warning(self, message: str):
         """Log warning message"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.log_file, 'a') as f:
-            f.write(f"[{timestamp}] WARNING: {message}\n")
+        self._log('WARNING', message)
     
     def _cleanup_pid_file(self):
         """Remove PID file"""
@@ -265,21 +664,85 @@ class Process:
         if self.pid:
             try:
                 # Vérifier si le processus existe encore
-                if psutil.pid_exists(self.pid):
-                    process = psutil.Process(self.pid)
-                    if process.is_running():
-                        self._log_warning(f"Process {self.pid} still running, force killing")
-                        try:
-                            os.killpg(os.getpgid(self.pid), signal.SIGKILL)
-                            time.sleep(0.5)  # Attendre que le kill prenne effet
-                        except:
-                            pass
+                if _pid_alive(self.pid):
+                    self._log_warning(f"Process {self.pid} still running, force killing")
+                    try:
+                        os.killpg(os.getpgid(self.pid), signal.SIGKILL)
+                        time.sleep(0.5)  # Attendre que le kill prenne effet
+                    except:
+                        pass
             except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
                 pass
         
         # Reset PID
         self.pid = None
     
+    def update_options(self, script: str, **kwargs):
+        """Take the options of a new process in place; they apply from the next start
+        
+        The running child, its history and the supervisor hookups are kept.
+        """
+        fresh = Process(self.name, script, self.config, **kwargs)
+        with self._lock:
+            self.script = script
+            for key in fresh.get_options():
+                if hasattr(fresh, key):
+                    setattr(self, key, getattr(fresh, key))
+            self.restart_policy = fresh.restart_policy
+            if self.crash_history.maxlen < fresh.crash_history.maxlen:
+                self.crash_history = deque(self.crash_history, maxlen=fresh.crash_history.maxlen)
+    
+    def get_options(self) -> Dict[str, Any]:
+        """Options needed to recreate this process"""
+        options = {
+            'cwd': self.cwd,
+            'args': self.args,
+            'env': self.env,
+            'interpreter': self.interpreter,
+            'max_restarts': self.max_restarts,
+            'autorestart': self.autorestart,
+            'watch': self.watch,
+            'watch_include': self.watch_include,
+            'watch_exclude': self.watch_exclude,
+            'watch_validate': self.watch_validate,
+            'watch_check': self.watch_check,
+            'max_memory_restart': self.max_memory_restart,
+            'ecosystem': self.ecosystem,
+            'spec_hash': self.spec_hash,
+            'group': self.group,
+            'instance_id': self.instance_id,
+            'listen': self.listen,
+            'ready_timeout': self.ready_timeout,
+            'zygote': self.zygote,
+            'preload': self.preload,
+            'gc_freeze': self.gc_freeze,
+            'log_mode': self.log_mode,
+            'log_time': self.log_time,
+            'log_max_size': self.log_max_size,
+            'log_rotate_interval': self.log_rotate_interval,
+            'log_retain': self.log_retain,
+            'log_compress': self.log_compress
+        }
+        options.update(self.restart_policy.options())
+        return options
+    
+    def rotation_policy(self, defaults: Optional[Dict[str, Any]] = None) -> RotationPolicy:
+        """Rotation settings for this process's logs on top of the global ones"""
+        options = dict(defaults or {})
+        options.update({key: value for key, value in (
+            ('max_size', self.log_max_size),
+            ('interval', self.log_rotate_interval),
+            ('retain', self.log_retain),
+            ('compress', self.log_compress),
+        ) if value is not None})
+        return RotationPolicy(**options)
+    
+    def _log_dropped(self) -> int:
+        """Bytes of output the log pump had to drop"""
+        if self.log_pump is None:
+            return 0
+        return self.log_pump.dropped(self.log_file) + self.log_pump.dropped(self.error_file)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert process to dictionary"""
         return {
@@ -288,6 +751,9 @@ class Process:
             "pid": self.pid,
             "status": self.status.value,
             "restart_count": self.restart_count,
+            "unstable_restarts": self.unstable_restarts,
+            "exit_code": self.exit_code,
+            "crash_history": list(self.crash_history),
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "stopped_at": self.stopped_at.isoformat() if self.stopped_at else None,
@@ -296,5 +762,10 @@ class Process:
             "cwd": self.cwd,
             "args": self.args,
             "env": self.env,
-            "interpreter": self.interpreter
+            "interpreter": self.interpreter,
+            "group": self.group,
+            "instance_id": self.instance_id,
+            "listen": self.listen,
+            "log_mode": self.log_mode,
+            "log_dropped": self._log_dropped()
         }
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Child exit detection for PyPM2
+Reports process exits as they happen instead of polling every PID
+"""
+
+import os
+import selectors
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import psutil
+
+# callback(pid, returncode) - returncode is None when it cannot be known
+ExitCallback = Callable[[int, Optional[int]], None]
+
+class ExitWatcher:
+    """Waits on pidfds in one selector thread, with a thread-per-child fallback"""
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._pending: List[Tuple[int, object, ExitCallback]] = []
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = None
+        self._running = False
+
+    @staticmethod
+    def pidfd_supported() -> bool:
+        """Check whether the platform provides os.pidfd_open"""
+        return hasattr(os, 'pidfd_open')
+
+    def watch(self, pid: int, callback: ExitCallback, popen=None):
+        """Call callback once pid exits; popen is used to reap our own children"""
+        if self.pidfd_supported():
+            with self._lock:
+                self._pending.append((pid, popen, callback))
+                self._ensure_thread()
+            os.write(self._wake_w, b"\0")
+        else:
+            threading.Thread(target=self._wait_blocking, args=(pid, popen, callback),
+                             daemon=True).start()
+
+    def close(self):
+        """Stop the selector thread"""
+        with self._lock:
+            self._running = False
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+
+    def _ensure_thread(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _register_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for pid, popen, callback in pending:
+            try:
+                fd = os.pidfd_open(pid)
+            except OSError:
+                # Already gone or not permitted: let the blocking path report it
+                threading.Thread(target=self._wait_blocking, args=(pid, popen, callback),
+                                 daemon=True).start()
+                continue
+            self._selector.register(fd, selectors.EVENT_READ, (pid, popen, callback))
+
+    def _run(self):
+        """Selector loop delivering exit notifications"""
+        while True:
+            with self._lock:
+                if not self._running:
+                    break
+            self._register_pending()
+
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    try:
+                        while os.read(self._wake_r, 512):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+
+                pid, popen, callback = key.data
+                self._selector.unregister(key.fd)
+                os.close(key.fd)
+                self._notify(callback, pid, _reap(pid, popen))
+
+        for key in list(self._selector.get_map().values()):
+            if key.data is not None:
+                os.close(key.fd)
+        self._selector.close()
+
+    def _wait_blocking(self, pid: int, popen, callback: ExitCallback):
+        """Fallback: block a dedicated thread until the process exits"""
+        if popen is not None:
+            returncode = popen.wait()
+        else:
+            try:
+                returncode = psutil.Process(pid).wait()
+            except psutil.NoSuchProcess:
+                returncode = None
+        self._notify(callback, pid, returncode)
+
+    @staticmethod
+    def _notify(callback: ExitCallback, pid: int, returncode: Optional[int]):
+        try:
+            callback(pid, returncode)
+        except Exception as e:
+            print(f"Exit callback for PID {pid} failed: {e}")
+
+def _reap(pid: int, popen) -> Optional[int]:
+    """Collect the exit status of a process known to have exited"""
+    if popen is not None:
+        return popen.wait()
+    try:
+        _, status = os.waitpid(pid, os.WNOHANG)
+        return os.waitstatus_to_exitcode(status) if status else None
+    except (ChildProcessError, OSError, AttributeError):
+        return None
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Log rotation for PyPM2
+Rotates process logs by size or time, copies and compresses rotated segments
+in a background thread and keeps a bounded number of them.
+
+Rotated segments are named `<log>.<YYYYmmdd-HHMMSS>` (`.gz` once compressed),
+so sorting them by name sorts them by age.
+"""
+
+import gzip
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from .logindex import index_path
+
+SEGMENT_TIME_FORMAT = '%Y%m%d-%H%M%S'
+SEGMENT_PATTERN = re.compile(r'\.(\d{8}-\d{6})(?:-(\d+))?(\.gz)?$')
+
+INTERVALS = {'hourly': 3600, 'daily': 86400, 'weekly': 7 * 86400}
+
+ROTATION_DEFAULTS = {
+    'max_size': None,      # bytes, or '10M' / '1G'
+    'interval': None,      # 'hourly', 'daily', 'weekly' or None
+    'retain': 10,          # rotated segments kept per log file (0 = all)
+    'compress': True,
+}
+
+def parse_size(value) -> Optional[int]:
+    """Parse a size such as 1048576, '500K', '10M' or '1G' into bytes"""
+    if value in (None, '', 0, '0'):
+        return None
+    if isinstance(value, int):
+        return value
+    value = str(value).strip().upper().rstrip('B')
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+def segments(path) -> List[Path]:
+    """Rotated segments of a log file, oldest first"""
+    path = Path(path)
+    found = []
+    if path.parent.exists():
+        for entry in path.parent.iterdir():
+            if entry.name.startswith(path.name + '.') and \
+                    SEGMENT_PATTERN.fullmatch(entry.name[len(path.name):]):
+                found.append(entry)
+    return sorted(found, key=_segment_order)
+
+def _segment_order(segment: Path):
+    match = SEGMENT_PATTERN.search(segment.name)
+    return match.group(1), int(match.group(2) or 0)
+
+def segment_time(segment: Path) -> Optional[float]:
+    """Rotation time encoded in a segment name"""
+    match = SEGMENT_PATTERN.search(segment.name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), SEGMENT_TIME_FORMAT).timestamp()
+
+class RotationPolicy:
+    """When to rotate a log and how many segments to keep"""
+
+    def __init__(self, **options):
+        values = dict(ROTATION_DEFAULTS)
+        values.update({k: v for k, v in options.items() if v is not None})
+        self.max_size = parse_size(values['max_size'])
+        self.interval = values['interval'] or None
+        if self.interval and self.interval not in INTERVALS:
+            raise ValueError(f"Unknown rotation interval: {self.interval}")
+        self.retain = int(values['retain'])
+        self.compress = bool(values['compress'])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_size or self.interval)
+
+    def due(self, size: int, last_rotation: float, now: float) -> bool:
+        """Check whether a log of this size last rotated at last_rotation must rotate"""
+        if size == 0:
+            return False
+        if self.max_size and size >= self.max_size:
+            return True
+        if self.interval:
+            return _period_start(self.interval, now) > last_rotation
+        return False
+
+def _period_start(interval: str, now: float) -> float:
+    """Start of the local hour/day/week containing now"""
+    current = datetime.fromtimestamp(now)
+    if interval == 'hourly':
+        start = current.replace(minute=0, second=0, microsecond=0)
+    else:
+        start = current.replace(hour=0, minute=0, second=0, microsecond=0)
+        if interval == 'weekly':
+            start = datetime.fromtimestamp(start.timestamp() - current.weekday() * 86400)
+    return start.timestamp()
+
+class LogRotator:
+    """Rotates log files and copies or compresses segments off the hot path"""
+
+    def __init__(self, log_pump=None, supervisor_log=None):
+        # Files written by the pump are reopened after a rename; files held
+        # open by children are copied and truncated instead
+        self.log_pump = log_pump
+        self.supervisor_log = supervisor_log
+        self._last_rotation: Dict[str, float] = {}
+        # Logs whose copy is still running; they are not rotated again meanwhile
+        self._copying: Set[str] = set()
+        self._lock = threading.Lock()
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pypm2-logrotate')
+
+    def check(self, path, policy: RotationPolicy, copytruncate: bool) -> Optional[Path]:
+        """Rotate path if the policy says so; returns the new segment"""
+        if not policy.enabled:
+            return None
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        with self._lock:
+            last = self._last_rotation.get(str(path))
+            if last is None:
+                last = self._initial_rotation_time(path)
+                self._last_rotation[str(path)] = last
+        if not policy.due(size, last, now):
+            return None
+        return self.rotate(path, policy, copytruncate)
+
+    def rotate(self, path, policy: RotationPolicy, copytruncate: bool) -> Optional[Path]:
+        """Move the current content of path to a new segment
+        
+        A copytruncate rotation only books the copy: the segment is written
+        by the background thread (see flush()).
+        """
+        path = Path(path)
+        with self._lock:
+            if str(path) in self._copying:
+                return None
+            try:
+                if path.stat().st_size == 0:
+                    return None
+            except FileNotFoundError:
+                return None
+
+            segment = self._segment_name(path)
+            if copytruncate:
+                # Copying a large log takes a while: keep it off the caller's thread
+                self._copying.add(str(path))
+            else:
+                os.rename(path, segment)
+                if self.log_pump:
+                    self.log_pump.reopen(path)
+                if self.supervisor_log:
+                    self.supervisor_log.reopen(path)
+                self._move_index(path, segment)
+            self._last_rotation[str(path)] = time.time()
+
+        if copytruncate:
+            self._compressor.submit(self._copy_truncate, path, segment, policy)
+        else:
+            self._compressor.submit(self._finish, path, segment, policy)
+        return segment
+
+    def flush(self):
+        """Wait for the copies and compressions booked so far"""
+        self._compressor.submit(lambda: None).result()
+
+    def forget(self, path):
+        """Drop what is remembered about a log file that is no longer used"""
+        with self._lock:
+            self._last_rotation.pop(str(path), None)
+
+    def close(self):
+        self._compressor.shutdown(wait=True)
+
+    def _copy_truncate(self, path: Path, segment: Path, policy: RotationPolicy):
+        """Copy the log to the segment, then empty it (background thread)"""
+        try:
+            # The child keeps writing through its O_APPEND descriptor;
+            # lines written between copy and truncate are lost
+            shutil.copyfile(path, segment)
+            os.truncate(path, 0)
+            self._move_index(path, segment)
+        except OSError:
+            return
+        finally:
+            with self._lock:
+                self._copying.discard(str(path))
+        self._finish(path, segment, policy)
+
+    @staticmethod
+    def _move_index(path: Path, segment: Path):
+        """The timestamp index describes the rotated content now"""
+        try:
+            os.replace(index_path(path), index_path(segment))
+        except FileNotFoundError:
+            pass
+
+    def _finish(self, path: Path, segment: Path, policy: RotationPolicy):
+        """Compress the new segment and enforce retention (background thread)"""
+        if self.log_pump:
+            # Past this point the pump only writes to the reopened file
+            self.log_pump.flush()
+        if policy.compress:
+            try:
+                compress(segment)
+            except OSError:
+                pass
+        if policy.retain > 0:
+            for old in segments(path)[:-policy.retain]:
+                for stale in (old, index_path(old)):
+                    try:
+                        stale.unlink()
+                    except FileNotFoundError:
+                        pass
+
+    def _segment_name(self, path: Path) -> Path:
+        """Next segment name, ordered after every segment of the same second"""
+        stamp = datetime.now().strftime(SEGMENT_TIME_FORMAT)
+        counter = 0
+        for segment in segments(path):
+            match = SEGMENT_PATTERN.search(segment.name)
+            if match.group(1) == stamp:
+                counter = max(counter, int(match.group(2) or 0) + 1)
+        if counter:
+            return path.with_name(f"{path.name}.{stamp}-{counter}")
+        return path.with_name(f"{path.name}.{stamp}")
+
+    def _initial_rotation_time(self, path) -> float:
+        """Last rotation before this supervisor started, or now"""
+        previous = segments(path)
+        if previous:
+            return segment_time(previous[-1])
+        return time.time()
+
+def compress(segment: Path) -> Path:
+    """Gzip segment next to itself and remove the original"""
+    target = segment.with_name(segment.name + '.gz')
+    partial = segment.with_name(segment.name + '.gz.tmp')
+    with open(segment, 'rb') as src, gzip.open(partial, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(partial, target)
+    segment.unlink()
+    return target
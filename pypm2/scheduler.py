@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Timer scheduler for PyPM2
+Books delayed work (restarts, sampling) as future events instead of sleeping
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+class ScheduledCall:
+    """Handle for a callback booked on the scheduler"""
+
+    def __init__(self, when: float, callback: Callable, args: tuple):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Prevent the callback from running if it has not started yet"""
+        self.cancelled = True
+
+class Scheduler:
+    """Single timer thread over a heap; due callbacks run on a small worker pool"""
+
+    def __init__(self, max_workers: int = 4):
+        self._heap: List[Tuple[float, int, ScheduledCall]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='pypm2-scheduler')
+        self._thread = None
+        self._running = False
+
+    def call_later(self, delay: float, callback: Callable, *args) -> ScheduledCall:
+        """Run callback(*args) after delay seconds"""
+        call = ScheduledCall(time.monotonic() + max(0.0, delay), callback, args)
+
+        with self._cond:
+            heapq.heappush(self._heap, (call.when, next(self._counter), call))
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+        return call
+
+    def pending(self) -> int:
+        """Number of booked calls not yet dispatched"""
+        with self._cond:
+            return sum(1 for _, _, call in self._heap if not call.cancelled)
+
+    def close(self):
+        """Stop the timer thread and drop pending calls"""
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._executor.shutdown(wait=False)
+
+    def _run(self):
+        """Timer loop: sleep until the earliest call is due, then dispatch it"""
+        with self._cond:
+            while self._running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                when, _, call = self._heap[0]
+                delay = when - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                if not call.cancelled:
+                    self._executor.submit(self._invoke, call)
+
+    @staticmethod
+    def _invoke(call: ScheduledCall):
+        if call.cancelled:
+            return
+        try:
+            call.callback(*call.args)
+        except Exception as e:
+            print(f"Scheduled callback {call.callback} failed: {e}")
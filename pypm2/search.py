@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Cross-process log search for PyPM2
+Scans the current and rotated logs of many processes in a process pool:
+plain files through mmap, compressed segments by streaming decompression.
+"""
+
+import gzip
+import mmap
+import multiprocessing
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .logindex import LogIndex, parse_timestamp
+from .rotation import segment_time, segments
+
+def search_files(files: List[Tuple[str, object]]) -> List[Tuple[str, Path]]:
+    """Expand (name, log path) pairs to every rotated segment plus the log itself"""
+    expanded = []
+    for name, path in files:
+        for segment in segments(path) + [Path(path)]:
+            expanded.append((name, segment))
+    return expanded
+
+def grep_file(name: str, path: str, pattern: str, flags: int = 0,
+              since: Optional[float] = None, until: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict]:
+    """Matching lines of one log file as {name, file, offset, line} dicts
+
+    The time window applies to lines starting with a timestamp; lines without
+    one are matched whenever they lie in the scanned region. Patterns match
+    within one line, ^ and $ at its ends, for plain and compressed files alike.
+    """
+    regex = re.compile(pattern.encode('utf-8'), flags | re.MULTILINE)
+    start = 0
+    if since is not None:
+        start = LogIndex(path).offset_for(since)
+
+    if str(path).endswith('.gz'):
+        lines = _gzip_lines(path, start)
+    else:
+        lines = _mmap_lines(path, start, regex)
+
+    matches = []
+    for offset, line in lines:
+        if not regex.search(line):
+            continue
+        if since is not None or until is not None:
+            stamp = parse_timestamp(line)
+            if stamp is not None:
+                if since is not None and stamp < since:
+                    continue
+                if until is not None and stamp > until:
+                    break
+        matches.append({
+            'name': name,
+            'file': str(path),
+            'offset': offset,
+            'line': line.decode('utf-8', errors='replace').rstrip('\n'),
+        })
+        if limit is not None and len(matches) >= limit:
+            break
+    return matches
+
+def _mmap_lines(path, start: int, regex):
+    """Lines around regex hits, found by searching the mapped file
+    
+    A hit may span lines; the line it starts on is yielded for the caller to
+    check, and the search resumes on the next line so nothing is skipped.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size <= start:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                position = start
+                while True:
+                    match = regex.search(data, position)
+                    if match is None or match.start() >= len(data):
+                        return
+                    line_start = data.rfind(b'\n', start, match.start()) + 1 or start
+                    line_end = data.find(b'\n', match.start())
+                    line_end = len(data) if line_end < 0 else line_end + 1
+                    yield line_start, data[line_start:line_end]
+                    # One result per line
+                    position = line_end
+    except FileNotFoundError:
+        return
+
+def _gzip_lines(path, start: int):
+    """Every line of a compressed segment with its uncompressed offset"""
+    try:
+        with gzip.open(path, 'rb') as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                yield offset, line
+                offset += len(line)
+    except (FileNotFoundError, EOFError, gzip.BadGzipFile):
+        return
+
+def search_logs(files: List[Tuple[str, object]], pattern: str, ignore_case: bool = False,
+                since: Optional[float] = None, until: Optional[float] = None,
+                limit: Optional[int] = None, workers: Optional[int] = None) -> List[Dict]:
+    """Search the logs (and rotated segments) of several processes in parallel
+
+    Results are ordered by file and offset. With a limit, pending scans are
+    cancelled as soon as enough matches were found, so the matches returned
+    are not necessarily the earliest ones.
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    re.compile(pattern.encode('utf-8'), flags)
+
+    targets = []
+    for name, path in search_files(files):
+        upper = segment_time(path)
+        # A segment only holds lines written before its rotation
+        if since is not None and upper is not None and upper < since:
+            continue
+        targets.append((name, path))
+
+    order = {(name, str(path)): i for i, (name, path) in enumerate(targets)}
+    matches = []
+    if len(targets) <= 1:
+        for name, path in targets:
+            matches.extend(grep_file(name, str(path), pattern, flags, since, until, limit))
+    else:
+        # forkserver: never fork the (threaded) supervisor itself
+        context = multiprocessing.get_context('forkserver')
+        workers = workers or min(len(targets), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            pending = {pool.submit(grep_file, name, str(path), pattern, flags, since, until, limit)
+                       for name, path in targets}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    matches.extend(future.result())
+                if limit is not None and len(matches) >= limit:
+                    for future in pending:
+                        future.cancel()
+                    break
+
+    matches.sort(key=lambda m: (order[(m['name'], m['file'])], m['offset']))
+    return matches[:limit] if limit is not None else matches
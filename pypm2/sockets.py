@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Listening sockets owned by the PyPM2 supervisor
+Sockets are bound once and inherited by every instance that serves them
+"""
+
+import os
+import socket
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+# Standalone script run by the interpreter in front of the user script
+BOOTSTRAP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bootstrap.py')
+
+# First descriptor of the inherited sockets in the child (systemd convention)
+LISTEN_FDS_START = 3
+
+def parse_address(spec: str) -> Tuple[int, object]:
+    """Parse '8000', 'host:8000', '[::1]:8000' or 'unix:/path' into (family, address)"""
+    spec = str(spec).strip()
+
+    if spec.startswith('unix:'):
+        return socket.AF_UNIX, spec[len('unix:'):]
+
+    if spec.startswith('['):
+        host, _, port = spec[1:].partition(']:')
+        return socket.AF_INET6, (host, int(port))
+
+    host, sep, port = spec.rpartition(':')
+    if not sep:
+        return socket.AF_INET, ('0.0.0.0', int(spec))
+    return socket.AF_INET, (host or '0.0.0.0', int(port))
+
+def create_listener(spec: str, backlog: int = 511) -> socket.socket:
+    """Bind and listen on the address described by spec"""
+    family, address = parse_address(spec)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+
+    try:
+        if family == socket.AF_UNIX:
+            if os.path.exists(address):
+                os.unlink(address)
+        else:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Lets a restarted supervisor bind again while adopted instances
+            # still hold the previous socket
+            if hasattr(socket, 'SO_REUSEPORT'):
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(address)
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+
+    return sock
+
+def inherited_sockets() -> List[socket.socket]:
+    """Sockets passed to this process by the supervisor (LISTEN_FDS protocol)
+
+    For use inside managed apps; returns an empty list when started without
+    listen sockets.
+    """
+    if os.environ.get('LISTEN_PID') != str(os.getpid()):
+        return []
+    count = int(os.environ.get('LISTEN_FDS', '0'))
+    return [socket.socket(fileno=LISTEN_FDS_START + i) for i in range(count)]
+
+def resolve_instances(value) -> int:
+    """Turn an instances option ('max', 0, -1, 4...) into a positive count"""
+    cpus = os.cpu_count() or 1
+    if value in ('max', 0, '0'):
+        return cpus
+    count = int(value)
+    if count < 0:
+        return max(1, cpus + count)
+    return count
+
+class SocketPool:
+    """Listening sockets keyed by their spec, shared by all processes using them"""
+
+    def __init__(self):
+        self._sockets: Dict[str, socket.socket] = {}
+        self._lock = threading.Lock()
+
+    def get(self, spec: str) -> socket.socket:
+        """Return the socket for spec, binding it on first use"""
+        with self._lock:
+            sock = self._sockets.get(spec)
+            if sock is None:
+                sock = create_listener(spec)
+                self._sockets[spec] = sock
+            return sock
+
+    def get_all(self, specs: Iterable[str]) -> List[socket.socket]:
+        return [self.get(spec) for spec in specs]
+
+    def close_unused(self, in_use: Iterable[str]):
+        """Close sockets no remaining process declares"""
+        keep = set(in_use)
+        with self._lock:
+            for spec in [s for s in self._sockets if s not in keep]:
+                self._sockets.pop(spec).close()
+
+    def close(self):
+        self.close_unused(())
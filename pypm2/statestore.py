@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Process state store for PyPM2
+Saved processes live in a SQLite database in WAL mode, one row per process,
+so starting, stopping or deleting a process writes only its own record in a
+short transaction instead of rewriting the whole file. A crash mid-write
+leaves the previous state intact, and CLIs running without the daemon can
+update different processes concurrently.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processes (
+    name TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+)
+"""
+
+BUSY_TIMEOUT = 5000
+
+class StateStore:
+    """Saved process records keyed by name
+
+    Records are JSON-serialisable dicts. A record identical to the one this
+    store last wrote or read is not written again, so saving every process
+    after a bulk operation only touches the ones that changed.
+    """
+
+    def __init__(self, path, legacy_file=None):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._known: Dict[str, str] = {}
+        self._db = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT / 1000,
+                                   isolation_level=None, check_same_thread=False)
+        self._db.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT}")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        # WAL keeps the database consistent on a crash; only the last commits may be lost
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute(SCHEMA)
+        if legacy_file is not None:
+            self._migrate(Path(legacy_file))
+
+    def load(self) -> Dict[str, Dict]:
+        """Every saved record"""
+        with self._lock:
+            rows = self._db.execute("SELECT name, record FROM processes ORDER BY rowid").fetchall()
+        records = {}
+        known = {}
+        for name, text in rows:
+            try:
+                records[name] = json.loads(text)
+            except ValueError:
+                continue
+            known[name] = text
+        with self._lock:
+            self._known = known
+        return records
+
+    def put(self, name: str, record: Dict):
+        """Insert or replace one record"""
+        self.put_many({name: record})
+
+    def put_many(self, records: Dict[str, Dict], delete: Iterable[str] = ()):
+        """Write several records and delete others in one transaction"""
+        changed = []
+        with self._lock:
+            for name, record in records.items():
+                text = json.dumps(record, sort_keys=True)
+                if self._known.get(name) != text:
+                    changed.append((name, text))
+            removed = [(name,) for name in delete]
+            if not changed and not removed:
+                return
+            with self._transaction():
+                self._db.executemany(
+                    "INSERT INTO processes (name, record) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET record = excluded.record", changed)
+                self._db.executemany("DELETE FROM processes WHERE name = ?", removed)
+            for name, text in changed:
+                self._known[name] = text
+            for (name,) in removed:
+                self._known.pop(name, None)
+
+    def delete(self, name: str):
+        """Remove one record"""
+        self.put_many({}, delete=[name])
+
+    def replace(self, records: Dict[str, Dict]):
+        """Make the saved records exactly records, writing only the differences"""
+        with self._lock:
+            saved = {name for (name,) in self._db.execute("SELECT name FROM processes")}
+        self.put_many(records, delete=saved - set(records))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @contextmanager
+    def _transaction(self):
+        # Take the write lock up front so concurrent writers wait instead of failing
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _migrate(self, legacy_file: Path):
+        """Import a processes.json written by older versions, once"""
+        if not legacy_file.exists():
+            return
+        with self._lock:
+            empty = self._db.execute("SELECT 1 FROM processes LIMIT 1").fetchone() is None
+        if empty:
+            try:
+                with open(legacy_file, 'r') as f:
+                    records = json.load(f)
+            except (ValueError, OSError):
+                records = {}
+            if isinstance(records, dict):
+                self.put_many(records)
+        try:
+            os.replace(legacy_file, legacy_file.with_name(legacy_file.name + '.migrated'))
+        except FileNotFoundError:
+            # Another CLI migrated it first
+            pass
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Supervisor messages for PyPM2 process logs
+Restarts, crashes and backoff decisions are queued in memory and written by
+one thread through a persistent append handle per log file, instead of
+opening and closing the log for every message. Lines carry a `[pypm2]` tag
+so they stand apart from the application's own output.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_FLUSH_INTERVAL = 0.2
+DEFAULT_FLUSH_LINES = 100
+
+PREFIX = '[pypm2]'
+
+_stamp_cache = (None, '')
+
+def format_message(level: str, message: str, now: Optional[float] = None) -> bytes:
+    """'[2024-01-31 12:00:00] [pypm2] LEVEL: message' as one log line"""
+    global _stamp_cache
+    second = int(time.time() if now is None else now)
+    cached_second, stamp = _stamp_cache
+    if cached_second != second:
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+        _stamp_cache = (second, stamp)
+    return f"[{stamp}] {PREFIX} {level}: {message}\n".encode('utf-8', errors='replace')
+
+def write_message(path, level: str, message: str):
+    """Append one message synchronously (processes outside a manager)"""
+    with open(path, 'ab') as f:
+        f.write(format_message(level, message))
+
+class SupervisorLog:
+    """Bounded message queue drained into the process logs by one writer thread
+
+    Queued lines are written once flush_lines of them are waiting, an ERROR is
+    queued, or the oldest has waited flush_interval seconds (0 writes every
+    message right away). When the queue is full, messages are dropped and a
+    note with the count is written instead.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 flush_lines: int = DEFAULT_FLUSH_LINES):
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.flush_lines = flush_lines
+        self.dropped = 0
+        self._queue = deque()
+        self._pending_drop = 0
+        self._urgent = False
+        self._oldest = None
+        self._in_flight = False
+        self._handles: Dict[str, int] = {}
+        self._reopen = set()
+        self._release = set()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, path, level: str, message: str) -> bool:
+        """Queue a message for path; returns False when it had to be dropped"""
+        line = format_message(level, message)
+        with self._cond:
+            if len(self._queue) >= self.queue_size or not self._running:
+                self.dropped += 1
+                self._pending_drop += 1
+                return False
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._queue.append((str(path), line))
+            if level == 'ERROR':
+                self._urgent = True
+            if self._due():
+                self._cond.notify()
+        return True
+
+    def reopen(self, path=None):
+        """Reopen one log file (or all) on the next write, after a move or removal"""
+        with self._cond:
+            self._reopen.update([str(path)] if path is not None else self._handles)
+
+    def release(self, path):
+        """Close the handle of a log file that is no longer used, once its queued messages are written"""
+        with self._cond:
+            self._release.add(str(path))
+            self._cond.notify()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued message is written"""
+        deadline = time.time() + timeout
+        with self._cond:
+            self._urgent = True
+            self._cond.notify_all()
+            while self._queue or self._release or self._in_flight:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 0.05))
+        return True
+
+    def close(self):
+        """Write what is queued and close the handles"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        for fd in self._handles.values():
+            os.close(fd)
+        self._handles.clear()
+
+    def _due(self) -> bool:
+        if not self._queue:
+            return False
+        return (self._urgent or len(self._queue) >= self.flush_lines or
+                time.monotonic() - self._oldest >= self.flush_interval)
+
+    def _write_loop(self):
+        """The only thread writing supervisor messages"""
+        while True:
+            with self._cond:
+                while self._running and not self._due() and not self._release:
+                    timeout = None
+                    if self._queue:
+                        timeout = max(self._oldest + self.flush_interval - time.monotonic(), 0)
+                    self._cond.wait(timeout)
+                batch, self._queue = self._queue, deque()
+                if self._pending_drop and batch:
+                    batch.append((batch[-1][0], format_message(
+                        'WARNING', f"dropped {self._pending_drop} supervisor messages")))
+                    self._pending_drop = 0
+                reopen, self._reopen = self._reopen, set()
+                release, self._release = self._release, set()
+                self._urgent = False
+                self._oldest = None
+                self._in_flight = bool(batch or release)
+                stopping = not self._running
+
+            for path in reopen:
+                fd = self._handles.pop(path, None)
+                if fd is not None:
+                    os.close(fd)
+
+            grouped: Dict[str, list] = {}
+            for path, line in batch:
+                grouped.setdefault(path, []).append(line)
+            for path, lines in grouped.items():
+                self._append(path, b''.join(lines))
+
+            for path in release:
+                fd = self._handles.pop(path, None)
+                if fd is not None:
+                    os.close(fd)
+
+            with self._cond:
+                self._in_flight = False
+                self._cond.notify_all()
+            if stopping:
+                return
+
+    def _append(self, path: str, data: bytes):
+        try:
+            fd = self._handles.get(path)
+            if fd is None:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_CLOEXEC, 0o644)
+                self._handles[path] = fd
+            os.write(fd, data)
+        except OSError:
+            # Reopen on the next batch, e.g. when the logs directory was recreated
+            fd = self._handles.pop(path, None)
+            if fd is not None:
+                os.close(fd)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Pre-restart validation for PyPM2 watch mode
+Before a watched process is restarted, the changed Python files are
+byte-compiled by the process's own interpreter (several interpreter
+processes in parallel when there are many files) and an optional check
+command is run. When either fails, the restart is skipped and the running
+process keeps serving. Compiling writes the __pycache__ files of the
+interpreter that will run them, so the new instance starts from a warm
+bytecode cache.
+"""
+
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+DEFAULT_CHECK_TIMEOUT = 60.0
+
+# Run by the process's interpreter: compile every file, print each error
+# (`-m py_compile` stops at the first one on recent versions)
+COMPILE_SCRIPT = """
+import py_compile, sys
+failed = 0
+for path in sys.argv[1:]:
+    try:
+        py_compile.compile(path, doraise=True)
+    except py_compile.PyCompileError as e:
+        failed = 1
+        print(e.msg.strip())
+sys.exit(failed)
+"""
+
+def _compile_batch(interpreter: str, paths: List[str], cwd: Optional[str],
+                   env: Optional[Dict[str, str]], timeout: float) -> Optional[str]:
+    """Compile paths in one interpreter process; its errors, or None when all compile"""
+    try:
+        result = subprocess.run([interpreter, '-c', COMPILE_SCRIPT] + paths, cwd=cwd, env=env,
+                                timeout=timeout, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    except subprocess.TimeoutExpired:
+        return f"{interpreter}: compiling timed out after {timeout:g}s"
+    except OSError as e:
+        return f"{interpreter} could not run: {e}"
+    if result.returncode == 0:
+        return None
+    output = result.stdout.decode('utf-8', errors='replace').strip()
+    return output or f"{interpreter}: compiling exited with {result.returncode}"
+
+def compile_files(paths: List[str], interpreter: str = sys.executable,
+                  cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                  workers: Optional[int] = None,
+                  timeout: float = DEFAULT_CHECK_TIMEOUT) -> List[str]:
+    """Byte-compile the .py files among paths with interpreter; the errors of each failing batch
+    
+    Files are split into at most workers batches (one per CPU by default),
+    each compiled by one interpreter process.
+    """
+    targets = sorted({path for path in paths if path.endswith('.py') and os.path.isfile(path)})
+    if not targets:
+        return []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(targets)))
+    batches = [targets[i::workers] for i in range(workers)]
+    if len(batches) == 1:
+        results = [_compile_batch(interpreter, batches[0], cwd, env, timeout)]
+    else:
+        with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+            results = list(pool.map(
+                lambda batch: _compile_batch(interpreter, batch, cwd, env, timeout), batches))
+    return [error for error in results if error]
+
+def run_check(command: str, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+              timeout: float = DEFAULT_CHECK_TIMEOUT) -> Optional[str]:
+    """Run a shell check command; why it failed, or None when it exits 0"""
+    try:
+        result = subprocess.run(command, shell=True, cwd=cwd, env=env, timeout=timeout,
+                                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+    except subprocess.TimeoutExpired:
+        return f"'{command}' timed out after {timeout:g}s"
+    except OSError as e:
+        return f"'{command}' could not run: {e}"
+    if result.returncode == 0:
+        return None
+    output = result.stdout.decode('utf-8', errors='replace').strip().splitlines()
+    tail = '\n'.join(output[-20:])
+    return f"'{command}' exited with {result.returncode}" + (f":\n{tail}" if tail else '')
+
+def validate_changes(paths: List[str], byte_compile: bool = True, check: Optional[str] = None,
+                     cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                     timeout: float = DEFAULT_CHECK_TIMEOUT,
+                     interpreter: str = sys.executable) -> List[str]:
+    """Errors that should keep the running process in place ([] when the restart may go ahead)
+
+    Files are compiled by interpreter, the one the process runs. The check
+    command only runs once every changed file compiles.
+    """
+    errors = compile_files(paths, interpreter, cwd, env, timeout=timeout) if byte_compile else []
+    if check and not errors:
+        error = run_check(check, cwd, env, timeout)
+        if error:
+            errors.append(error)
+    return errors
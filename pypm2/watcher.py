@@ -4,40 +4,256 @@ File watcher module for PyPM2 watch mode
 Monitors file changes and triggers process restarts
 """
 
+import hashlib
 import os
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Set, List, Callable, Optional, Dict
+from typing import Any, Set, List, Callable, Optional, Dict, Tuple
+
+from . import inotify
+from .ignore import DEFAULT_IGNORE, PathMatcher
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# File types that trigger a restart
+WATCH_EXTENSIONS = ('.py', '.pyx', '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg')
+WATCH_GLOBS = ['*' + extension for extension in WATCH_EXTENSIONS]
+
+def _file_key(st: os.stat_result) -> Tuple[int, int, int]:
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+class TreePoller:
+    """Cached view of watched trees, refreshed incrementally
+    
+    Each poll stats every directory and re-lists (with os.scandir) only those
+    whose mtime changed, which catches created, deleted and renamed files,
+    including editors saving through a temporary file. In-place writes do not
+    touch the directory, so known files are also re-stat'd round-robin, at
+    most max_stats_per_tick per poll: small trees are fully checked every
+    poll, huge ones within a few polls.
+    """
+    
+    def __init__(self, is_relevant: Callable[[str], bool],
+                 should_ignore_dir: Callable[[str], bool], max_stats_per_tick: int = 5000):
+        self.is_relevant = is_relevant
+        self.should_ignore_dir = should_ignore_dir
+        self.max_stats_per_tick = max_stats_per_tick
+        # directory -> (mtime_ns, inode), and its relevant files and subdirectories
+        self._dirs: Dict[str, Tuple[int, int]] = {}
+        self._dir_files: Dict[str, Set[str]] = {}
+        self._dir_subdirs: Dict[str, Set[str]] = {}
+        # file -> (mtime_ns, size, inode)
+        self._files: Dict[str, Tuple[int, int, int]] = {}
+        # Explicitly watched files, checked on every poll
+        self._single_files: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self._rotation: List[str] = []
+        self._rotation_dirty = False
+        self._cursor = 0
+    
+    def add(self, path: str) -> List[str]:
+        """Watch a directory tree or a single file; returns the relevant files found"""
+        if os.path.isdir(path):
+            found: Dict[str, None] = {}
+            self._add_tree(path, found)
+            return list(found)
+        try:
+            self._single_files[path] = _file_key(os.stat(path))
+        except OSError:
+            self._single_files[path] = None
+            return []
+        return [path]
+    
+    def refresh(self) -> List[str]:
+        """Pick up subdirectories pruned so far (the rules changed); returns the relevant files in them"""
+        found: Dict[str, None] = {}
+        for directory in list(self._dirs):
+            try:
+                with os.scandir(directory) as entries:
+                    subdirs = {entry.path for entry in entries if entry.is_dir(follow_symlinks=False)}
+            except OSError:
+                continue
+            for path in subdirs - self._dir_subdirs.get(directory, set()):
+                if not self.should_ignore_dir(path):
+                    self._dir_subdirs.setdefault(directory, set()).add(path)
+                    self._add_tree(path, found)
+        return list(found)
+    
+    def remove(self, path: str, keep: List[str] = ()):
+        """Stop watching a tree or single file, except what the paths in keep still cover"""
+        if path in self._single_files:
+            del self._single_files[path]
+            return
+        if any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in keep):
+            return
+        self._drop_tree(path, None, set(keep))
+    
+    def poll(self) -> List[str]:
+        """Files created, modified or deleted since the last poll"""
+        changed: Dict[str, None] = {}
+        
+        for directory in list(self._dirs):
+            if directory not in self._dirs:
+                # Dropped with a removed parent during this poll
+                continue
+            try:
+                st = os.stat(directory)
+            except OSError:
+                self._drop_tree(directory, changed)
+                continue
+            if (st.st_mtime_ns, st.st_ino) != self._dirs[directory]:
+                self._rescan(directory, (st.st_mtime_ns, st.st_ino), changed)
+        
+        for path, key in self._single_files.items():
+            try:
+                current = _file_key(os.stat(path))
+            except OSError:
+                current = None
+            if current != key:
+                self._single_files[path] = current
+                changed[path] = None
+        
+        self._check_files(changed)
+        return list(changed)
+    
+    def _check_files(self, changed: Dict[str, None]):
+        """Re-stat the next slice of known files"""
+        if self._rotation_dirty:
+            self._rotation = list(self._files)
+            self._rotation_dirty = False
+            self._cursor = 0
+        total = len(self._rotation)
+        if not total:
+            return
+        count = min(total, self.max_stats_per_tick)
+        for i in range(count):
+            path = self._rotation[(self._cursor + i) % total]
+            key = self._files.get(path)
+            if key is None:
+                continue
+            try:
+                current = _file_key(os.stat(path))
+            except OSError:
+                # The directory rescan reports and forgets it
+                continue
+            if current != key:
+                self._files[path] = current
+                changed[path] = None
+        self._cursor = (self._cursor + count) % total
+    
+    def _add_tree(self, root: str, changed: Optional[Dict[str, None]]):
+        """Cache root and everything below it; new files are reported when changed is given"""
+        try:
+            st = os.stat(root)
+        except OSError:
+            return
+        self._rescan(root, (st.st_mtime_ns, st.st_ino), changed)
+    
+    def _rescan(self, directory: str, key: Tuple[int, int], changed: Optional[Dict[str, None]]):
+        """List one directory again and diff it against the cache"""
+        files: Set[str] = set()
+        subdirs: Set[str] = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.should_ignore_dir(entry.path):
+                                subdirs.add(entry.path)
+                        elif self.is_relevant(entry.path):
+                            current = _file_key(entry.stat())
+                            files.add(entry.path)
+                            if self._files.get(entry.path) != current:
+                                if changed is not None:
+                                    changed[entry.path] = None
+                                if entry.path not in self._files:
+                                    self._rotation_dirty = True
+                                self._files[entry.path] = current
+                    except OSError:
+                        continue
+        except OSError:
+            self._drop_tree(directory, changed)
+            return
+        
+        self._dirs[directory] = key
+        for path in self._dir_files.get(directory, set()) - files:
+            self._files.pop(path, None)
+            self._rotation_dirty = True
+            if changed is not None:
+                changed[path] = None
+        for path in self._dir_subdirs.get(directory, set()) - subdirs:
+            self._drop_tree(path, changed)
+        new_subdirs = subdirs - self._dir_subdirs.get(directory, set())
+        self._dir_files[directory] = files
+        self._dir_subdirs[directory] = subdirs
+        for path in new_subdirs:
+            self._add_tree(path, changed)
+    
+    def _drop_tree(self, directory: str, changed: Optional[Dict[str, None]],
+                   keep: Set[str] = frozenset()):
+        """Forget a removed directory (but not the trees in keep) and report its files as deleted"""
+        if directory in keep or self._dirs.pop(directory, None) is None:
+            return
+        for path in self._dir_files.pop(directory, set()):
+            self._files.pop(path, None)
+            if changed is not None:
+                changed[path] = None
+        for path in self._dir_subdirs.pop(directory, set()):
+            self._drop_tree(path, changed, keep)
+        self._rotation_dirty = True
 
 class SimpleFileWatcher:
-    """Simple file watcher using polling (no external dependencies)"""
+    """Simple file watcher using polling (no external dependencies)
     
-    def __init__(self, callback: Callable):
+    Backends share one interface: watch(paths) once, then wait_for_changes()
+    returns the changed files (an empty list when nothing changed in time).
+    add_paths() and remove_paths() change what is watched without losing
+    track of the other paths. prune(directory) can skip more directories
+    than the matcher ignores; call refresh() when its answers may change.
+    """
+    
+    def __init__(self, callback: Callable, matcher: Optional[PathMatcher] = None,
+                 prune: Optional[Callable[[str], bool]] = None):
         self.callback = callback
+        self.prune = prune
         self.file_times: Dict[str, float] = {}
-        self.ignore_patterns = [
-            '*.log', '*.tmp', '*.swp', '*.pyc', '__pycache__',
-            '.git', 'node_modules', '.pytest_cache', '.coverage',
-            '*.pid', '*.lock'
-        ]
-        self.last_restart = 0
-        self.restart_debounce = 1.0  # Minimum 1 second between restarts
+        # .gitignore-style globs, compiled into matcher on first use
+        self.ignore_patterns = list(DEFAULT_IGNORE)
+        self.matcher = matcher
         self.poll_interval = 1.0  # Check every second
+        self.watched_paths: List[str] = []
+        self._poller: Optional[TreePoller] = None
+    
+    def _matcher(self) -> PathMatcher:
+        if self.matcher is None:
+            self.matcher = PathMatcher(self.ignore_patterns, WATCH_GLOBS)
+        return self.matcher
     
     def should_ignore(self, path: str) -> bool:
         """Check if file should be ignored"""
-        path_obj = Path(path)
-        
-        # Check ignore patterns
-        for pattern in self.ignore_patterns:
-            if pattern.startswith('*'):
-                if path_obj.name.endswith(pattern[1:]):
-                    return True
-            elif pattern in str(path_obj):
-                return True
-        
-        return False
+        return self._matcher().ignored(path)
+    
+    def should_ignore_dir(self, path: str) -> bool:
+        """Check if a directory should not be descended into"""
+        return self._matcher().ignored(path, is_dir=True) or \
+            (self.prune is not None and self.prune(path))
+    
+    def is_relevant(self, path: str) -> bool:
+        """Check if a change to this file should trigger a restart"""
+        return self._matcher().matches(path)
+    
+    def _load_ignore_files(self, paths: List[str]):
+        """Match relative to the watched paths and honour the .gitignore and
+        .pypm2ignore at the root of watched directories"""
+        matcher = self._matcher()
+        matcher.add_roots(path if os.path.isdir(path) else os.path.dirname(path) for path in paths)
+        for path in paths:
+            if os.path.isdir(path):
+                matcher.add_ignore_files(path)
     
     def scan_directory(self, directory: str, recursive: bool = True) -> List[str]:
         """Scan directory for Python files and other relevant files"""
@@ -45,14 +261,13 @@ class SimpleFileWatcher:
         try:
             for root, dirs, filenames in os.walk(directory):
                 # Filter out ignored directories
-                dirs[:] = [d for d in dirs if not any(pattern in d for pattern in self.ignore_patterns)]
+                dirs[:] = [d for d in dirs if not self.should_ignore_dir(os.path.join(root, d))]
                 
                 for filename in filenames:
                     filepath = os.path.join(root, filename)
                     
                     # Only watch relevant file types
-                    if (filename.endswith(('.py', '.pyx', '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg')) 
-                        and not self.should_ignore(filepath)):
+                    if self.is_relevant(filepath):
                         files.append(filepath)
                 
                 if not recursive:
@@ -64,15 +279,17 @@ class SimpleFileWatcher:
     
     def check_file_changes(self, files: List[str]) -> bool:
         """Check if any files have changed"""
-        changed = False
+        return bool(self._changed_files(files))
+    
+    def _changed_files(self, files: List[str]) -> List[str]:
+        changed = []
         
         for filepath in files:
             try:
                 current_time = os.path.getmtime(filepath)
                 if filepath in self.file_times:
                     if current_time > self.file_times[filepath]:
-                        print(f"📁 File changed: {filepath}")
-                        changed = True
+                        changed.append(filepath)
                 self.file_times[filepath] = current_time
             except (OSError, FileNotFoundError):
                 # File might have been deleted, ignore
@@ -80,17 +297,366 @@ class SimpleFileWatcher:
                     del self.file_times[filepath]
         
         return changed
+    
+    def watch(self, paths: List[str]):
+        """Start tracking files under paths (directories or single files)"""
+        self.watched_paths = []
+        self._poller = TreePoller(self.is_relevant, self.should_ignore_dir)
+        self.add_paths(paths)
+    
+    def add_paths(self, paths: List[str]) -> List[str]:
+        """Start tracking more paths; returns the relevant files found under them"""
+        if self._poller is None:
+            self._poller = TreePoller(self.is_relevant, self.should_ignore_dir)
+        paths = [path for path in paths if path not in self.watched_paths]
+        self.watched_paths.extend(paths)
+        self._load_ignore_files(paths)
+        found = []
+        for path in paths:
+            found.extend(self._poller.add(path))
+        return found
+    
+    def remove_paths(self, paths: List[str]):
+        """Stop tracking paths, except what the remaining watched paths cover"""
+        self.watched_paths = [path for path in self.watched_paths if path not in paths]
+        if self._poller is not None:
+            for path in paths:
+                self._poller.remove(path, self.watched_paths)
+    
+    def refresh(self) -> List[str]:
+        """Track directories that are no longer pruned; returns the relevant files found"""
+        return self._poller.refresh() if self._poller is not None else []
+    
+    def known_files(self) -> List[str]:
+        """Relevant files found when watching started"""
+        if self._poller is None:
+            return []
+        return list(self._poller._files) + list(self._poller._single_files)
+    
+    def wait_for_changes(self, timeout: Optional[float] = None) -> List[str]:
+        """Poll the tree and return changed files, sleeping one poll interval when there are none"""
+        changed = self._poller.poll()
+        if not changed:
+            delay = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+            time.sleep(delay)
+        return changed
+    
+    def close(self):
+        """Release backend resources"""
+
+class InotifyFileWatcher(SimpleFileWatcher):
+    """File watcher driven by Linux inotify events instead of rescanning
+    
+    Every directory under the watched paths gets its own watch (ignored
+    directories are pruned); directories created later are added as their
+    events arrive. Bursts of events, such as an editor saving through a
+    temporary file, are coalesced into one change list.
+    """
+    
+    EVENTS = (inotify.IN_MODIFY | inotify.IN_CLOSE_WRITE | inotify.IN_CREATE |
+              inotify.IN_DELETE | inotify.IN_MOVED_FROM | inotify.IN_MOVED_TO |
+              inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF)
+    
+    def __init__(self, callback: Callable, matcher: Optional[PathMatcher] = None,
+                 coalesce_delay: float = 0.05, prune: Optional[Callable[[str], bool]] = None):
+        super().__init__(callback, matcher, prune)
+        self.coalesce_delay = coalesce_delay
+        self._inotify = inotify.Inotify()
+        self._dirs: Dict[int, str] = {}
+        self._watched_dirs: Dict[str, int] = {}
+        # Explicitly watched files, by their parent directory
+        self._files: Dict[str, Set[str]] = {}
+        self._known_files: List[str] = []
+    
+    def watch(self, paths: List[str]):
+        """Add watches for every directory under paths"""
+        if self._inotify.fd < 0:
+            self._inotify = inotify.Inotify()
+        self.watched_paths = []
+        self._known_files = self.add_paths(paths)
+    
+    def add_paths(self, paths: List[str]) -> List[str]:
+        """Add watches under more paths; returns the relevant files found"""
+        paths = [path for path in paths if path not in self.watched_paths]
+        self.watched_paths.extend(paths)
+        self._load_ignore_files(paths)
+        found = []
+        for path in paths:
+            if os.path.isdir(path):
+                found.extend(self._add_tree(path))
+            elif os.path.isfile(path):
+                parent = os.path.dirname(path)
+                self._files.setdefault(parent, set()).add(path)
+                self._add_dir(parent)
+                found.append(path)
+        return found
+    
+    def remove_paths(self, paths: List[str]):
+        """Drop the watches only paths needed"""
+        self.watched_paths = [path for path in self.watched_paths if path not in paths]
+        for path in paths:
+            parent = os.path.dirname(path)
+            if path in self._files.get(parent, ()):
+                self._files[parent].discard(path)
+                if not self._files[parent]:
+                    del self._files[parent]
+        for directory in list(self._watched_dirs):
+            if directory not in self._files and not self._covered(directory):
+                wd = self._watched_dirs.pop(directory)
+                self._dirs.pop(wd, None)
+                self._inotify.rm_watch(wd)
+    
+    def refresh(self) -> List[str]:
+        """Watch directories that are no longer pruned; returns the relevant files found"""
+        found = []
+        for path in self.watched_paths:
+            if os.path.isdir(path):
+                found.extend(self._add_tree(path))
+        return found
+    
+    def _covered(self, directory: str) -> bool:
+        """Whether directory lies in a watched tree"""
+        return any(directory == path or directory.startswith(path.rstrip(os.sep) + os.sep)
+                   for path in self.watched_paths)
+    
+    def known_files(self) -> List[str]:
+        """Relevant files found when watching started"""
+        return list(self._known_files)
+    
+    def wait_for_changes(self, timeout: Optional[float] = None) -> List[str]:
+        """Block until files change (or timeout) and return them"""
+        events = self._inotify.read(timeout)
+        if not events:
+            return []
+        
+        changed: Dict[str, None] = {}
+        deadline = time.time() + max(self.coalesce_delay * 20, 1.0)
+        while events:
+            for event in events:
+                self._handle(event, changed)
+            if time.time() >= deadline:
+                break
+            # Keep reading until the burst is over
+            events = self._inotify.read(self.coalesce_delay)
+        
+        return list(changed)
+    
+    def close(self):
+        """Close the inotify instance and drop every watch"""
+        self._inotify.close()
+        self._dirs.clear()
+        self._watched_dirs.clear()
+        self._files.clear()
+        self._known_files = []
+    
+    def _handle(self, event, changed: Dict[str, None]):
+        if event.mask & inotify.IN_Q_OVERFLOW:
+            # Events were lost: report every watched path as changed
+            for path in self.watched_paths:
+                changed[path] = None
+            return
+        
+        directory = self._dirs.get(event.wd)
+        if directory is None:
+            return
+        if event.mask & (inotify.IN_IGNORED | inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF):
+            if event.mask & inotify.IN_IGNORED:
+                self._dirs.pop(event.wd, None)
+                self._watched_dirs.pop(directory, None)
+            return
+        
+        path = os.path.join(directory, event.name)
+        if event.mask & inotify.IN_ISDIR:
+            if event.mask & (inotify.IN_CREATE | inotify.IN_MOVED_TO) and \
+                    directory not in self._files and not self.should_ignore_dir(path):
+                # Files may already exist in the new tree before its watch is added
+                for filepath in self._add_tree(path):
+                    changed[filepath] = None
+            return
+        
+        if directory in self._files:
+            if path in self._files[directory]:
+                changed[path] = None
+        elif self.is_relevant(path):
+            changed[path] = None
+    
+    def _add_tree(self, root: str) -> List[str]:
+        """Watch root and its subdirectories; returns the relevant files found"""
+        files = []
+        for current, dirs, filenames in os.walk(root):
+            dirs[:] = [d for d in dirs if not self.should_ignore_dir(os.path.join(current, d))]
+            if not self._add_dir(current):
+                dirs[:] = []
+                continue
+            files.extend(path for path in (os.path.join(current, f) for f in filenames)
+                         if self.is_relevant(path))
+        return files
+    
+    def _add_dir(self, directory: str) -> bool:
+        if directory in self._watched_dirs:
+            return True
+        try:
+            wd = self._inotify.add_watch(directory, self.EVENTS | inotify.IN_ONLYDIR)
+        except OSError:
+            return False
+        self._dirs[wd] = directory
+        self._watched_dirs[directory] = wd
+        return True
+
+def create_file_watcher(callback: Callable, backend: str = 'auto',
+                        matcher: Optional[PathMatcher] = None,
+                        prune: Optional[Callable[[str], bool]] = None) -> SimpleFileWatcher:
+    """File watcher backend: 'inotify', 'poll' or 'auto' (inotify when available)"""
+    if backend not in ('auto', 'inotify', 'poll'):
+        raise ValueError(f"Unknown watch backend: {backend}")
+    if backend != 'poll' and inotify.available():
+        try:
+            return InotifyFileWatcher(callback, matcher, prune=prune)
+        except OSError:
+            # e.g. out of inotify instances
+            if backend == 'inotify':
+                raise
+    elif backend == 'inotify':
+        raise OSError("inotify is not available")
+    return SimpleFileWatcher(callback, matcher, prune)
+
+def content_digest(path: str) -> bytes:
+    """Digest of a file's content (xxhash when installed, else blake2b)"""
+    digest = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+# Baseline of a file whose content before the change is not known
+UNKNOWN = object()
+
+# Larger files are not hashed up front; their first change always counts
+PRIME_MAX_SIZE = 4 * 1024 * 1024
+
+class ContentHasher:
+    """Content digests of watched files, cached per (inode, size, mtime_ns)
+    
+    Confirms that a reported change really changed the content, so touch,
+    a checkout of an identical file or a save-with-backup are not restarts.
+    A missing file has the digest None.
+    """
+    
+    def __init__(self):
+        self._cache: Dict[str, Tuple[Optional[Tuple[int, int, int]], Optional[bytes]]] = {}
+        self._lock = threading.Lock()
+    
+    def digest(self, path: str) -> Optional[bytes]:
+        """Current digest of path, rehashing only when its stat changed"""
+        try:
+            key = _file_key(os.stat(path))
+            with self._lock:
+                cached = self._cache.get(path)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            value = content_digest(path)
+        except OSError:
+            key, value = None, None
+        with self._lock:
+            self._cache[path] = (key, value)
+        return value
+    
+    def confirm(self, paths: List[str]) -> List[Tuple[str, Any]]:
+        """(path, digest before the change) for paths whose content really changed"""
+        confirmed = []
+        for path in paths:
+            with self._lock:
+                cached = self._cache.get(path)
+            before = cached[1] if cached is not None else UNKNOWN
+            if self.digest(path) != before:
+                confirmed.append((path, before))
+        return confirmed
+    
+    def still_changed(self, changes: List[Tuple[str, Any]]) -> List[str]:
+        """Paths that still differ from their baseline (edits that were undone are dropped)"""
+        return [path for path, before in changes if self.digest(path) != before]
+    
+    def prime(self, paths: List[str], before: float, max_size: Optional[int] = PRIME_MAX_SIZE):
+        """Record baselines for files last modified before the given time
+        
+        Files modified later (or while being read) and files over max_size
+        bytes are left unknown, so their first change always counts.
+        """
+        for path in paths:
+            with self._lock:
+                if path in self._cache:
+                    continue
+            try:
+                st = os.stat(path)
+                if st.st_mtime >= before - 1.0:
+                    continue
+                if max_size is not None and st.st_size > max_size:
+                    continue
+                value = content_digest(path)
+                if _file_key(os.stat(path)) != _file_key(st):
+                    continue
+            except OSError:
+                continue
+            with self._lock:
+                self._cache.setdefault(path, (_file_key(st), value))
+
+class ChangeBatcher:
+    """Trailing-edge debounce of confirmed changes
+    
+    Changes are released once none arrived for delay seconds (or max_delay
+    after the first one), so a burst gives one restart that includes its
+    last edit. Each path keeps the baseline from before its first change.
+    """
+    
+    def __init__(self, delay: float = 0.3, max_delay: float = 5.0):
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending: Dict[str, Any] = {}
+        self._first = None
+        self._last = None
+    
+    def add(self, changes: List[Tuple[str, Any]], now: Optional[float] = None):
+        if not changes:
+            return
+        now = time.monotonic() if now is None else now
+        for path, before in changes:
+            self._pending.setdefault(path, before)
+        if self._first is None:
+            self._first = now
+        self._last = now
+    
+    def timeout(self, default: float, now: Optional[float] = None) -> float:
+        """How long to wait for more changes before the batch is due"""
+        if not self._pending:
+            return default
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(default, self._due() - now))
+    
+    def release(self, now: Optional[float] = None) -> List[Tuple[str, Any]]:
+        """The pending batch once it is due, else []"""
+        now = time.monotonic() if now is None else now
+        if not self._pending or now < self._due():
+            return []
+        batch = list(self._pending.items())
+        self._pending.clear()
+        self._first = self._last = None
+        return batch
+    
+    def _due(self) -> float:
+        return min(self._last + self.delay, self._first + self.max_delay)
 
 class ProcessWatcher:
     """Watches files and restarts processes on changes"""
     
-    def __init__(self, process_name: str, restart_callback: Callable):
+    def __init__(self, process_name: str, restart_callback: Callable, backend: str = 'auto'):
         self.process_name = process_name
         self.restart_callback = restart_callback
         self.watched_paths: Set[str] = set()
         self.is_running = False
         self.watcher_thread = None
-        self.file_watcher = SimpleFileWatcher(self._on_file_change)
+        self.file_watcher = create_file_watcher(self._on_file_change, backend)
+        self.hasher = ContentHasher()
+        self.batcher = ChangeBatcher()
     
     def add_watch_path(self, path: str, recursive: bool = True):
         """Add a path to watch for changes"""
@@ -108,12 +674,6 @@ class ProcessWatcher:
     
     def _on_file_change(self):
         """Internal callback for file changes"""
-        # Debounce rapid successive changes
-        current_time = time.time()
-        if current_time - self.file_watcher.last_restart < self.file_watcher.restart_debounce:
-            return
-        
-        self.file_watcher.last_restart = current_time
         print(f"🔄 Restarting '{self.process_name}' due to file changes...")
         
         try:
@@ -126,25 +686,26 @@ class ProcessWatcher:
     
     def _watch_loop(self):
         """Main watching loop"""
+        started = time.time()
+        self.file_watcher.watch(sorted(self.watched_paths))
+        threading.Thread(target=self.hasher.prime, daemon=True,
+                         args=(self.file_watcher.known_files(), started)).start()
         while self.is_running:
             try:
-                # Collect all files to watch
-                all_files = []
-                for path in self.watched_paths:
-                    if os.path.isfile(path):
-                        all_files.append(path)
-                    elif os.path.isdir(path):
-                        all_files.extend(self.file_watcher.scan_directory(path))
-                
-                # Check for changes
-                if self.file_watcher.check_file_changes(all_files):
+                # Wakes up periodically to notice stop()
+                changed = self.file_watcher.wait_for_changes(timeout=self.batcher.timeout(0.5))
+                self.batcher.add(self.hasher.confirm(changed))
+                changed = self.hasher.still_changed(self.batcher.release())
+                if changed:
+                    # Foreground watcher: report on the terminal
+                    for path in changed:
+                        print(f"📁 File changed: {path}")
                     self._on_file_change()
                 
-                time.sleep(self.file_watcher.poll_interval)
-                
             except Exception as e:
                 print(f"❌ Error in watch loop: {e}")
                 time.sleep(1)
+        self.file_watcher.close()
     
     def start(self):
         """Start watching for file changes"""
@@ -179,6 +740,234 @@ class ProcessWatcher:
         
         print(f"🛑 Stopped watching process '{self.process_name}'")
 
+def collapse_roots(paths: List[str]) -> List[str]:
+    """Distinct paths with those inside another path removed"""
+    roots: List[str] = []
+    for path in sorted(set(paths)):
+        if not any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in roots):
+            roots.append(path)
+    return roots
+
+class _Subscription:
+    """One subscriber of the watch service"""
+    
+    def __init__(self, key: str, paths: List[str], callback: Callable,
+                 filter: Optional[Callable[[str], bool]], debounce: float,
+                 prune: Optional[Callable[[str], bool]] = None):
+        self.key = key
+        self.paths = paths
+        self.callback = callback
+        self.filter = filter
+        self.prune = prune
+        self.batcher = ChangeBatcher(debounce)
+        # Set while its callback runs; changes meanwhile wait for the next batch
+        self.running = False
+    
+    def covers(self, path: str) -> bool:
+        for root in self.paths:
+            prefix = root.rstrip(os.sep) + os.sep
+            # An ancestor is reported when events were lost (inotify overflow)
+            if path == root or path.startswith(prefix) or root.startswith(path.rstrip(os.sep) + os.sep):
+                return True
+        return False
+
+class WatchService:
+    """One file watcher shared by every watched process
+    
+    Subscriptions are keyed (by process name); overlapping and nested paths
+    are collapsed into a single set of roots watched by one backend and one
+    thread. Roots are added to and removed from the live backend as
+    subscriptions change, so the other roots keep reporting meanwhile. Each change is fanned out to every subscriber whose paths contain
+    it and whose optional filter accepts it; callbacks run on a small worker
+    pool so a slow restart does not delay the others. A directory is not
+    walked or watched at all once every subscriber covering it prunes it.
+    
+    Changes are confirmed against content digests and batched per subscriber
+    until debounce seconds pass without another one, so a burst of saves
+    gives exactly one callback, and touching or reverting a file gives none.
+    """
+    
+    def __init__(self, backend: str = 'auto', debounce: float = 0.3, workers: int = 4):
+        self.backend = backend
+        self.debounce = debounce
+        self.hasher = ContentHasher()
+        self._subscriptions: Dict[str, _Subscription] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        # Paths of new subscriptions: they may want directories pruned so far
+        self._fresh: List[str] = []
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self._workers = workers
+        self._dispatcher = None
+    
+    def subscribe(self, key: str, paths: List[str], callback: Callable[[str, List[str]], Any],
+                  filter: Optional[Callable[[str], bool]] = None,
+                  prune: Optional[Callable[[str], bool]] = None):
+        """Call callback(key, changed_paths) on changes under paths, replacing key's subscription
+        
+        prune(directory) tells that nothing below directory is wanted.
+        """
+        resolved = [str(Path(path).resolve()) for path in paths]
+        with self._lock:
+            self._subscriptions[key] = _Subscription(key, resolved, callback, filter,
+                                                     self.debounce, prune)
+            self._fresh.extend(resolved)
+            self._dirty = True
+            if not self._running:
+                self._running = True
+                self._dispatcher = ThreadPoolExecutor(max_workers=self._workers,
+                                                      thread_name_prefix='pypm2-watch')
+                self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+    
+    def unsubscribe(self, key: str) -> bool:
+        with self._lock:
+            if self._subscriptions.pop(key, None) is None:
+                return False
+            self._dirty = True
+        return True
+    
+    def subscribers(self) -> Dict[str, List[str]]:
+        """Watched paths per subscriber"""
+        with self._lock:
+            return {key: list(sub.paths) for key, sub in self._subscriptions.items()}
+    
+    def roots(self) -> List[str]:
+        """Paths actually watched once overlapping subscriptions are collapsed"""
+        with self._lock:
+            return collapse_roots([path for sub in self._subscriptions.values() for path in sub.paths])
+    
+    def close(self):
+        """Stop the watch thread"""
+        with self._lock:
+            running, self._running = self._running, False
+        if not running:
+            return
+        self._wakeup.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._dispatcher.shutdown(wait=False)
+    
+    def _watch_loop(self):
+        file_watcher = None
+        try:
+            while self._running:
+                if self._dirty:
+                    started = time.time()
+                    with self._lock:
+                        self._dirty = False
+                        fresh, self._fresh = self._fresh, []
+                    roots = self.roots()
+                    if file_watcher is not None and not roots:
+                        file_watcher.close()
+                        file_watcher = None
+                    elif roots:
+                        if file_watcher is None:
+                            # Every file that is not ignored; subscriber filters narrow it down
+                            file_watcher = create_file_watcher(None, self.backend,
+                                                               PathMatcher(DEFAULT_IGNORE),
+                                                               self._prunable)
+                        watched = list(file_watcher.watched_paths)
+                        found = file_watcher.add_paths([root for root in roots if root not in watched])
+                        file_watcher.remove_paths([root for root in watched if root not in roots])
+                        if any(path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+                               for path in fresh for root in watched):
+                            # A new subscriber inside a watched tree
+                            found.extend(file_watcher.refresh())
+                        threading.Thread(target=self._prime, daemon=True,
+                                         args=(found, started)).start()
+                
+                if file_watcher is None:
+                    self._wakeup.wait(0.5)
+                    self._wakeup.clear()
+                    continue
+                
+                try:
+                    changed = file_watcher.wait_for_changes(timeout=self._timeout(0.5))
+                except Exception as e:
+                    print(f"❌ Error in watch service: {e}")
+                    time.sleep(1)
+                    continue
+                if changed:
+                    self._collect(changed)
+                self._release_due()
+        finally:
+            if file_watcher is not None:
+                file_watcher.close()
+    
+    def _prunable(self, directory: str) -> bool:
+        """Whether every subscriber covering directory prunes it"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        prefix = directory.rstrip(os.sep) + os.sep
+        covering = []
+        for sub in subscriptions:
+            if any(path == directory or path.startswith(prefix) for path in sub.paths):
+                # Holds a watched path
+                return False
+            if sub.covers(directory):
+                covering.append(sub)
+        return bool(covering) and all(sub.prune is not None and sub.prune(directory)
+                                      for sub in covering)
+    
+    def _prime(self, paths: List[str], before: float):
+        """Record baselines for the files some subscriber would be told about"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        self.hasher.prime([path for path in paths if any(
+            sub.covers(path) and (sub.filter is None or sub.filter(path)) for sub in subscriptions)],
+            before)
+    
+    def _timeout(self, default: float) -> float:
+        """Wait until the next batch is due (polling while its callback still runs)"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        timeout = default
+        for sub in subscriptions:
+            timeout = min(timeout, sub.batcher.timeout(default) if not sub.running else 0.1)
+        return timeout
+    
+    def _collect(self, changed: List[str]):
+        """Batch the confirmed changes each subscriber cares about"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        hits = {}
+        for sub in subscriptions:
+            hits[sub.key] = [path for path in changed
+                             if sub.covers(path) and (sub.filter is None or sub.filter(path))]
+        wanted = sorted({path for paths in hits.values() for path in paths})
+        confirmed = dict(self.hasher.confirm(wanted))
+        for sub in subscriptions:
+            sub.batcher.add([(path, confirmed[path]) for path in hits[sub.key] if path in confirmed])
+    
+    def _release_due(self):
+        """Hand each subscriber its batch once it has settled"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        for sub in subscriptions:
+            if sub.running:
+                continue
+            paths = self.hasher.still_changed(sub.batcher.release())
+            if not paths:
+                continue
+            sub.running = True
+            try:
+                self._dispatcher.submit(self._notify, sub, paths)
+            except RuntimeError:
+                # Closing
+                return
+    
+    def _notify(self, sub: _Subscription, hits: List[str]):
+        try:
+            sub.callback(sub.key, hits)
+        except Exception as e:
+            print(f"❌ Watch callback for '{sub.key}' failed: {e}")
+        finally:
+            sub.running = False
+
 def setup_default_watch_paths(script_path: str) -> List[str]:
     """Setup default paths to watch based on script location"""
     script_path_obj = Path(script_path).resolve()
@@ -203,9 +992,10 @@ def setup_default_watch_paths(script_path: str) -> List[str]:
     return watch_paths
 
 def create_watcher(process_name: str, restart_callback: Callable, 
-                  script_path: str, watch_paths: Optional[List[str]] = None) -> ProcessWatcher:
+                  script_path: str, watch_paths: Optional[List[str]] = None,
+                  backend: str = 'auto') -> ProcessWatcher:
     """Create a new file watcher for a process"""
-    watcher = ProcessWatcher(process_name, restart_callback)
+    watcher = ProcessWatcher(process_name, restart_callback, backend)
     
     if watch_paths:
         for path in watch_paths:
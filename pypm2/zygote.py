@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Fork server ("zygote") for PyPM2
+Run by the app's interpreter; imports the declared modules once, then forks
+ready-to-run instances on request. Must only depend on the standard library.
+
+    python zygote.py CONTROL_FD MODULE[,MODULE...] [--freeze]
+
+Messages on the SOCK_SEQPACKET control socket are JSON objects. Spawn
+requests carry the child's stdout, stderr and listen sockets as SCM_RIGHTS
+descriptors; the zygote answers {"spawned": pid} and later reports
+{"exited": pid, "code": code} once it has reaped the child. Its first
+message, {"ready": pid, "files": [...]}, lists the source files of the
+modules it imported from the app's directory (null when there are too many
+to report), so the supervisor knows which edits make it stale.
+"""
+
+import array
+import gc
+import importlib
+import importlib.util
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import traceback
+
+MAX_FDS = 16
+# Keeps the ready message within one read of the supervisor (64 KiB)
+MAX_READY_SIZE = 60 * 1024
+
+def load_bootstrap():
+    """Import bootstrap.py from this directory under a private name"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bootstrap.py')
+    spec = importlib.util.spec_from_file_location('_pypm2_bootstrap', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def send(sock, message):
+    sock.send(json.dumps(message).encode('utf-8'))
+
+def receive(sock):
+    """Read one request and its descriptors; (None, []) on EOF"""
+    data, ancdata, _, _ = sock.recvmsg(1 << 20, socket.CMSG_SPACE(MAX_FDS * 4))
+    fds = array.array('i')
+    for level, kind, payload in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(payload[:len(payload) - (len(payload) % fds.itemsize)])
+    if not data:
+        return None, list(fds)
+    return json.loads(data.decode('utf-8')), list(fds)
+
+def app_files(root):
+    """Source files of the imported modules that live under root"""
+    prefix = os.path.join(os.path.realpath(root), '')
+    files = set()
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if path:
+            path = os.path.realpath(path)
+            if path.startswith(prefix):
+                files.add(path)
+    return sorted(files)
+
+def exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+def run_child(request, fds, bootstrap):
+    """Turn the forked zygote into the requested instance; returns the exit code"""
+    os.setsid()
+
+    stdout_fd, stderr_fd, listen_fds = fds[0], fds[1], fds[2:]
+    os.dup2(stdout_fd, 1)
+    os.dup2(stderr_fd, 2)
+    os.close(stdout_fd)
+    os.close(stderr_fd)
+
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    if listen_fds:
+        os.environ['PYPM2_LISTEN_FDS'] = ','.join(str(fd) for fd in listen_fds)
+    bootstrap.setup_listen_fds()
+
+    try:
+        bootstrap.run_script(request['script'], request['args'])
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        sys.stderr.write(f"{e.code}\n")
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+def serve(control, bootstrap):
+    """Answer spawn requests until the supervisor closes the control socket"""
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    selector = selectors.DefaultSelector()
+    selector.register(control, selectors.EVENT_READ)
+    selector.register(wake_r, selectors.EVENT_READ)
+
+    while True:
+        for key, _ in selector.select():
+            if key.fileobj is control:
+                request, fds = receive(control)
+                if request is None:
+                    return
+
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+                if pid == 0:
+                    selector.close()
+                    control.close()
+                    os.close(wake_r)
+                    os.close(wake_w)
+                    signal.set_wakeup_fd(-1)
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    sys.exit(run_child(request, fds, bootstrap))
+
+                for fd in fds:
+                    os.close(fd)
+                send(control, {'spawned': pid})
+            else:
+                try:
+                    while os.read(wake_r, 512):
+                        pass
+                except BlockingIOError:
+                    pass
+                reap(control)
+
+def reap(control):
+    """Collect exited children and report their exit codes"""
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        send(control, {'exited': pid, 'code': exit_code(status)})
+
+def main():
+    if len(sys.argv) < 3:
+        sys.stderr.write("usage: zygote.py CONTROL_FD MODULES [--freeze]\n")
+        sys.exit(2)
+
+    control = socket.socket(fileno=int(sys.argv[1]))
+    modules = [m for m in sys.argv[2].split(',') if m]
+    freeze = '--freeze' in sys.argv[3:]
+
+    bootstrap = load_bootstrap()
+    # Resolve imports like the app would, not from the pypm2 package directory
+    sys.path[0] = os.getcwd()
+
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            traceback.print_exc()
+            send(control, {'error': f"Failed to preload {module}"})
+            sys.exit(1)
+
+    if freeze and hasattr(gc, 'freeze'):
+        # Keep preloaded objects out of collections so pages stay shared
+        gc.collect()
+        gc.freeze()
+
+    ready = {'ready': os.getpid(), 'files': app_files(os.getcwd())}
+    if len(json.dumps(ready)) > MAX_READY_SIZE:
+        ready['files'] = None
+    send(control, ready)
+    serve(control, bootstrap)
+
+if __name__ == '__main__':
+    main()
@@ -244,7 +244,7 @@ run_test "Config directory exists" "[ -d ~/.pypm2 ] || mkdir -p ~/.pypm2"
 python3 pypm2-cli start examples/simple_script.py --name persist-test > /dev/null 2>&1 || true
 sleep 1
 
-run_test "Process config persistence" "[ -f ~/.pypm2/processes.json ]"
+run_test "Process config persistence" "[ -f ~/.pypm2/state.db ]"
 
 # Clean up
 python3 pypm2-cli stop persist-test > /dev/null 2>&1 || true
@@ -39,6 +39,9 @@ setup(
             "black>=21.0",
             "flake8>=3.8",
         ],
+        "watch": [
+            "xxhash>=3.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,122 @@
+import os
+import signal
+import tempfile
+import time
+from pathlib import Path
+from pypm2.backoff import RestartPolicy
+from pypm2.config import Config
+from pypm2.process import Process, ProcessStatus
+from pypm2.reaper import ExitWatcher
+from pypm2.scheduler import Scheduler
+
+class TestRestartPolicy:
+    def test_fixed_delay_without_backoff(self):
+        """Test that restart_delay is used when backoff is disabled"""
+        policy = RestartPolicy(restart_delay=500)
+        assert policy.delay_for(1) == 0.5
+        assert policy.delay_for(5) == 0.5
+    
+    def test_exponential_backoff_is_capped(self):
+        """Test that backoff doubles per attempt up to the cap"""
+        policy = RestartPolicy(exp_backoff_restart_delay=100, max_backoff_delay=1000,
+                               backoff_jitter=0)
+        assert [policy.delay_for(n) for n in range(1, 6)] == [0.1, 0.2, 0.4, 0.8, 1.0]
+    
+    def test_jitter_stays_in_bounds(self):
+        """Test that jitter spreads delays within the configured fraction"""
+        policy = RestartPolicy(exp_backoff_restart_delay=1000, backoff_jitter=0.2)
+        delays = [policy.delay_for(1) for _ in range(50)]
+        assert all(0.8 <= d <= 1.2 for d in delays)
+    
+    def test_min_uptime(self):
+        """Test stable run detection"""
+        policy = RestartPolicy(min_uptime=2000)
+        assert policy.is_stable(1.5) == False
+        assert policy.is_stable(2.0) == True
+    
+    def test_crash_loop_detection(self):
+        """Test that only crashes inside the window count"""
+        policy = RestartPolicy(crashloop_threshold=3, crashloop_window=10)
+        now = time.time()
+        assert policy.is_crash_loop([now - 1, now - 2, now - 3]) == True
+        assert policy.is_crash_loop([now - 1, now - 2, now - 30]) == False
+        assert RestartPolicy().is_crash_loop([now] * 100) == False
+
+class TestCircuitBreaker:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config(self.temp_dir)
+        self.exit_watcher = ExitWatcher()
+        self.scheduler = Scheduler()
+        
+        self.crash_script = Path(self.temp_dir) / "crash_script.py"
+        self.crash_script.write_text("raise SystemExit(2)\n")
+    
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.scheduler.close()
+        self.exit_watcher.close()
+    
+    def test_crash_loop_parks_process(self):
+        """Test that a crash loop opens the circuit and records history"""
+        process = Process("test", str(self.crash_script), self.config,
+                          restart_delay=0, crashloop_threshold=3, crashloop_cooldown=0)
+        process.exit_watcher = self.exit_watcher
+        process.scheduler = self.scheduler
+        process.start()
+        
+        deadline = time.time() + 10
+        while process.status != ProcessStatus.CRASHLOOP:
+            assert time.time() < deadline
+            time.sleep(0.05)
+        
+        assert len(process.crash_history) == 3
+        assert all(c['exit_code'] == 2 for c in process.crash_history)
+        assert process.to_dict()['status'] == 'crashloop'
+        
+        # Stopping a parked process acknowledges it
+        assert process.stop() == True
+        assert process.status == ProcessStatus.STOPPED
+    
+    def test_exit_during_stop_books_nothing(self):
+        """Test that an exit seen while a stop holds the lock neither restarts nor blocks others"""
+        sleeper = Path(self.temp_dir) / "sleeper.py"
+        sleeper.write_text("import time\ntime.sleep(60)\n")
+        process = Process("test", str(sleeper), self.config, restart_delay=0)
+        other = Process("other", str(self.crash_script), self.config, autorestart=False)
+        for p in (process, other):
+            p.exit_watcher = self.exit_watcher
+            p.scheduler = self.scheduler
+        process.start()
+        
+        with process._lock:
+            # As if stop() were running: the child dies before the status changes
+            os.kill(process.pid, signal.SIGKILL)
+            time.sleep(0.2)
+            other.start()
+            deadline = time.time() + 5
+            while other.status != ProcessStatus.ERRORED:
+                assert time.time() < deadline
+                time.sleep(0.05)
+            process.status = ProcessStatus.STOPPED
+        
+        time.sleep(0.3)
+        assert process.status == ProcessStatus.STOPPED
+        assert process._pending_restart is None and not process.crash_history
+    
+    def test_threshold_above_history_size(self):
+        """Test that the crash history keeps enough crashes for a large threshold"""
+        process = Process("test", str(self.crash_script), self.config,
+                          restart_delay=0, max_restarts=50, crashloop_threshold=25,
+                          crashloop_cooldown=0)
+        process.exit_watcher = self.exit_watcher
+        process.scheduler = self.scheduler
+        process.start()
+        
+        deadline = time.time() + 10
+        while process.status != ProcessStatus.CRASHLOOP:
+            assert time.time() < deadline
+            time.sleep(0.05)
+        assert len(process.crash_history) == 25
+        assert process.stop() == True
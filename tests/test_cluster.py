@@ -0,0 +1,168 @@
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+from pypm2.manager import ProcessManager
+from pypm2.process import ProcessStatus
+from pypm2.sockets import parse_address, resolve_instances
+
+class TestSocketHelpers:
+    def test_parse_address(self):
+        """Test listen spec parsing"""
+        assert parse_address("8000") == (socket.AF_INET, ('0.0.0.0', 8000))
+        assert parse_address("127.0.0.1:9000") == (socket.AF_INET, ('127.0.0.1', 9000))
+        assert parse_address("[::1]:9000") == (socket.AF_INET6, ('::1', 9000))
+        assert parse_address("unix:/tmp/app.sock") == (socket.AF_UNIX, '/tmp/app.sock')
+    
+    def test_resolve_instances(self):
+        """Test instance count resolution"""
+        assert resolve_instances(3) == 3
+        assert resolve_instances("2") == 2
+        assert resolve_instances("max") >= 1
+        assert resolve_instances(-100) == 1
+
+class TestClusterMode:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = ProcessManager(self.temp_dir)
+        self.socket_path = Path(self.temp_dir) / "app.sock"
+        
+        # Each instance answers with its instance id on the shared socket
+        self.test_script = Path(self.temp_dir) / "server.py"
+        self.test_script.write_text("""
+import os
+import socket
+
+assert os.environ['LISTEN_PID'] == str(os.getpid())
+server = socket.socket(fileno=3)
+while True:
+    conn, _ = server.accept()
+    conn.sendall(os.environ['PYPM2_INSTANCE_ID'].encode())
+    conn.close()
+""")
+    
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.manager.delete_all()
+        self.manager.sockets.close()
+    
+    def _request(self) -> str:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(str(self.socket_path))
+            return sock.recv(16).decode()
+    
+    def test_group_shares_listening_socket(self):
+        """Test that every instance serves the supervisor-owned socket"""
+        assert self.manager.start("app", str(self.test_script), instances=2,
+                                  listen=[f"unix:{self.socket_path}"]) == True
+        assert self.manager.group_members("app") == ["app:0", "app:1"]
+        
+        pids = {p['pid'] for p in self.manager.list()}
+        assert len(pids) == 2
+        
+        answers = {self._request() for _ in range(40)}
+        assert answers <= {"0", "1"}
+        assert answers
+    
+    def test_group_level_operations(self):
+        """Test stopping and deleting a group by its name"""
+        self.manager.start("app", str(self.test_script), instances=2,
+                           listen=[f"unix:{self.socket_path}"])
+        
+        assert self.manager.stop("app") == True
+        assert all(p['status'] == ProcessStatus.STOPPED.value for p in self.manager.list())
+        
+        assert self.manager.delete("app") == True
+        assert self.manager.list() == []
+    
+    def test_rolling_reload_keeps_serving(self):
+        """Test that a reload replaces every instance without refusing connections"""
+        self.manager.start("app", str(self.test_script), instances=2,
+                           listen=[f"unix:{self.socket_path}"], ready_timeout=200)
+        old_pids = {p['pid'] for p in self.manager.list()}
+        
+        errors = []
+        done = threading.Event()
+        
+        def client():
+            while not done.is_set():
+                try:
+                    self._request()
+                except OSError as e:
+                    errors.append(e)
+        
+        thread = threading.Thread(target=client, daemon=True)
+        thread.start()
+        try:
+            assert self.manager.reload("app") == True
+        finally:
+            done.set()
+            thread.join(timeout=5)
+        
+        new_pids = {p['pid'] for p in self.manager.list()}
+        assert not new_pids & old_pids
+        assert all(p['status'] == ProcessStatus.ONLINE.value for p in self.manager.list())
+        assert errors == []
+
+class TestSocketHandoff:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = ProcessManager(self.temp_dir)
+        self.socket_path = Path(self.temp_dir) / "app.sock"
+        
+        self.test_script = Path(self.temp_dir) / "server.py"
+        self.test_script.write_text("""
+import os
+from pypm2.sockets import inherited_sockets
+
+server, = inherited_sockets()
+while True:
+    conn, _ = server.accept()
+    conn.sendall(str(os.getpid()).encode())
+    conn.close()
+""")
+    
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.manager.delete_all()
+        self.manager.sockets.close()
+    
+    def test_restart_never_refuses_connections(self):
+        """Test that the socket stays bound while a single instance restarts"""
+        env = {'PYTHONPATH': str(Path(__file__).resolve().parent.parent)}
+        self.manager.start("app", str(self.test_script), env=env, restart_delay=200,
+                           listen=[f"unix:{self.socket_path}"])
+        old_pid = self.manager.get_process("app").pid
+        
+        answers = []
+        errors = []
+        done = threading.Event()
+        
+        def client():
+            # Connections made during the restart gap wait in the backlog
+            while not done.is_set():
+                try:
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                        sock.settimeout(10)
+                        sock.connect(str(self.socket_path))
+                        answers.append(sock.recv(16).decode())
+                except OSError as e:
+                    errors.append(e)
+        
+        thread = threading.Thread(target=client, daemon=True)
+        thread.start()
+        try:
+            time.sleep(0.3)
+            assert self.manager.restart("app") == True
+            time.sleep(0.3)
+        finally:
+            done.set()
+            thread.join(timeout=10)
+        
+        new_pid = str(self.manager.get_process("app").pid)
+        assert errors == []
+        assert str(old_pid) in answers and new_pid in answers
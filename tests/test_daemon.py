@@ -0,0 +1,101 @@
+import pytest
+import tempfile
+import threading
+import time
+from pathlib import Path
+from pypm2.daemon import Daemon, DaemonClient, DaemonError
+from pypm2.process import ProcessStatus
+
+class TestDaemon:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.daemon = Daemon(self.temp_dir)
+        self.daemon.bind()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = DaemonClient(self.temp_dir)
+
+        # Create a simple test script
+        self.test_script = Path(self.temp_dir) / "test_script.py"
+        self.test_script.write_text("""
+import time
+while True:
+    time.sleep(0.1)
+""")
+
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.daemon.manager.delete_all()
+        self.daemon.shutdown()
+        self.thread.join(timeout=5)
+
+    def test_ping(self):
+        """Test that the daemon answers and writes its PID file"""
+        assert self.client.ping() == True
+        assert self.daemon.config.daemon_pid_file.exists()
+
+    def test_remote_start_and_list(self):
+        """Test starting and listing a process through the socket"""
+        assert self.client.start("test", str(self.test_script)) == True
+
+        processes = self.client.list()
+        assert len(processes) == 1
+        assert processes[0]['name'] == 'test'
+        assert processes[0]['status'] == ProcessStatus.ONLINE.value
+        assert "test" in self.daemon.manager.processes
+
+    def test_remote_stop(self):
+        """Test stopping a process through the socket"""
+        self.client.start("test", str(self.test_script))
+
+        assert self.client.stop("test") == True
+        assert self.client.describe("test")['status'] == ProcessStatus.STOPPED.value
+
+    def test_bulk_calls_wait_for_the_daemon(self):
+        """Test that slow bulk calls are not cut off by the client timeout"""
+        client = DaemonClient(self.temp_dir, timeout=0.2)
+        real_stop_all = self.daemon.manager.stop_all
+
+        def slow_stop_all(*args, **kwargs):
+            time.sleep(0.5)
+            return real_stop_all(*args, **kwargs)
+
+        self.daemon.manager.stop_all = slow_stop_all
+        assert client.stop_all() == {}
+        self.daemon.manager.list = lambda: time.sleep(0.5)
+        with pytest.raises(DaemonError):
+            client.list()
+        # kill stops every process before answering
+        assert client.call('kill') == True
+
+    def test_shutdown_refused_with_piped_processes(self):
+        """Test that stopping the daemon needs force while it drains process output"""
+        self.client.start("piped", str(self.test_script), log_mode='pipe')
+
+        with pytest.raises(DaemonError):
+            self.client.call('shutdown')
+        assert self.client.ping() == True
+
+        self.client.stop("piped")
+        assert self.client.call('shutdown') == True
+        self.thread.join(timeout=5)
+        assert not self.thread.is_alive()
+
+    def test_forced_shutdown_with_piped_processes(self):
+        """Test that force stops the daemon despite pipe-mode processes"""
+        self.client.start("piped", str(self.test_script), log_mode='pipe')
+
+        assert self.client.call('shutdown', force=True) == True
+        self.thread.join(timeout=5)
+        assert not self.thread.is_alive()
+
+    def test_unknown_method(self):
+        """Test that non-exported methods are rejected"""
+        with pytest.raises(DaemonError):
+            self.client.call('_save_processes')
+
+    def test_refuses_second_daemon(self):
+        """Test that a live socket is not replaced"""
+        with pytest.raises(DaemonError):
+            Daemon(self.temp_dir).bind()
@@ -0,0 +1,108 @@
+import json
+import tempfile
+from pathlib import Path
+import pytest
+from pypm2.ecosystem import EcosystemError, load_ecosystem, spec_hash
+from pypm2.manager import ProcessManager
+from pypm2.process import ProcessStatus
+
+class TestEcosystem:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        (self.temp_dir / "app.py").write_text("import time\nwhile True:\n    time.sleep(0.1)\n")
+        self.file = self.temp_dir / "ecosystem.json"
+        self.manager = None
+
+    def teardown_method(self):
+        """Cleanup after test"""
+        if self.manager is not None:
+            self.manager.delete_all()
+
+    def write(self, apps):
+        self.file.write_text(json.dumps({"apps": apps}))
+        return load_ecosystem(self.file)
+
+    def test_load(self):
+        """Test app specs: cwd relative to the file, string env, validation"""
+        apps = self.write([{"name": "api", "script": "app.py", "cwd": "srv",
+                            "env": {"PORT": 8000}, "args": "--fast -v"}])
+        assert apps == {"api": {"script": "app.py", "cwd": str(self.temp_dir / "srv"),
+                                "env": {"PORT": "8000"}, "args": ["--fast", "-v"]}}
+        assert spec_hash(apps["api"]) == spec_hash(dict(reversed(list(apps["api"].items()))))
+
+        with pytest.raises(EcosystemError):
+            self.write([{"name": "api"}])
+        with pytest.raises(EcosystemError, match="instaces"):
+            self.write([{"name": "api", "script": "app.py", "instaces": 4}])
+        for key in ("spec_hash", "ecosystem", "group"):
+            with pytest.raises(EcosystemError, match=key):
+                self.write([{"name": "api", "script": "app.py", key: "x"}])
+        with pytest.raises(EcosystemError):
+            self.write([{"name": "a", "script": "app.py"}, {"name": "a", "script": "app.py"}])
+        self.file.write_text("{broken")
+        with pytest.raises(EcosystemError):
+            load_ecosystem(self.file)
+
+    def test_apply_touches_only_changed_apps(self):
+        """Test that apply starts new apps, recreates changed ones and deletes removed ones"""
+        self.manager = ProcessManager(str(self.temp_dir / "home"))
+        source = str(self.file)
+        specs = [{"name": f"app{i}", "script": "app.py"} for i in range(5)]
+        specs.append({"name": "web", "script": "app.py", "instances": 2})
+        results = self.manager.apply(self.write(specs), source)
+        assert {r['action'] for r in results.values()} == {'start'}
+        assert all(r['success'] for r in results.values())
+        assert len(self.manager.list()) == 7
+        pids = {p.name: p.pid for p in self.manager._snapshot()}
+
+        specs[1]["env"] = {"DEBUG": "1"}
+        specs[5]["instances"] = 3
+        del specs[4]
+        apps = self.write(specs)
+        assert self.manager.plan(apps, source) == {
+            'app0': 'unchanged', 'app1': 'restart', 'app2': 'unchanged',
+            'app3': 'unchanged', 'web': 'restart', 'app4': 'delete'}
+        results = self.manager.apply(apps, source, parallel=2)
+        assert all(r['success'] for r in results.values())
+
+        after = {p.name: p.pid for p in self.manager._snapshot()}
+        assert sorted(after) == ['app0', 'app1', 'app2', 'app3', 'web:0', 'web:1', 'web:2']
+        assert all(after[name] == pids[name] for name in ('app0', 'app2', 'app3'))
+        assert after['app1'] != pids['app1']
+        assert self.manager.get_process('app1').env == {"DEBUG": "1"}
+
+        # Stopped apps are started again; a reloaded manager still knows the hashes
+        self.manager.stop('app2')
+        assert self.manager.plan(apps, source)['app2'] == 'start'
+        self.manager.apply(apps, source)
+        assert self.manager.get_process('app2').status == ProcessStatus.ONLINE
+        reloaded = ProcessManager(str(self.temp_dir / "home"))
+        reloaded.stop_monitoring()
+        assert set(reloaded.plan(apps, source).values()) == {'unchanged'}
+
+    def test_apply_reloads_changed_apps_in_place(self):
+        """Test that a changed app keeps its processes and listen sockets"""
+        self.manager = ProcessManager(str(self.temp_dir / "home"))
+        source = str(self.file)
+        spec = f"unix:{self.temp_dir / 'web.sock'}"
+        specs = [{"name": "web", "script": "app.py", "instances": 2, "listen": spec,
+                  "ready_timeout": 200}]
+        self.manager.apply(self.write(specs), source)
+        sock = self.manager.sockets._sockets[spec]
+        members = {p.name: (p, p.pid) for p in self.manager._snapshot()}
+
+        specs[0]["env"] = {"DEBUG": "1"}
+        results = self.manager.apply(self.write(specs), source)
+        assert results['web']['action'] == 'restart' and results['web']['success']
+        assert self.manager.sockets._sockets[spec] is sock and sock.fileno() != -1
+        for name, (process, pid) in members.items():
+            assert self.manager.processes[name] is process
+            assert process.pid != pid and process.env == {"DEBUG": "1"}
+            assert process.status == ProcessStatus.ONLINE
+
+        specs[0]["instances"] = 1
+        self.manager.apply(self.write(specs), source)
+        assert sorted(self.manager.processes) == ['web:0']
+        assert self.manager.processes['web:0'] is members['web:0'][0]
+        assert self.manager.sockets._sockets[spec] is sock
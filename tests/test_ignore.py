@@ -0,0 +1,92 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+from pypm2.ignore import DEFAULT_IGNORE, PathMatcher
+from pypm2.watcher import WATCH_GLOBS, SimpleFileWatcher, TreePoller
+
+class TestPathMatcher:
+    def test_names_match_whole_components(self):
+        """Test that '.git' no longer ignores everything containing the text"""
+        matcher = PathMatcher(DEFAULT_IGNORE, WATCH_GLOBS)
+        assert matcher.ignored("/repo/.git/config")
+        assert matcher.ignored("/repo/.git", is_dir=True)
+        assert not matcher.ignored("/repo/my.github_helper.py")
+        assert not matcher.ignored("/repo/.github", is_dir=True)
+        assert matcher.matches("/repo/my.github_helper.py")
+        assert not matcher.matches("/repo/README.md")
+
+    def test_gitignore_rules(self):
+        """Test anchoring, directory-only patterns, ** and negation"""
+        matcher = PathMatcher(["build/", "/dist", "*.log", "!keep.log",
+                               "docs/**/*.md", "# comment", ""], base="/repo")
+        assert matcher.ignored("/repo/build", is_dir=True)
+        assert matcher.ignored("/repo/src/build/gen.py")
+        assert not matcher.ignored("/repo/build")
+        assert matcher.ignored("/repo/dist/app.py")
+        assert not matcher.ignored("/repo/src/dist/app.py")
+        assert matcher.ignored("/repo/a/b/debug.log")
+        assert not matcher.ignored("/repo/a/keep.log")
+        assert matcher.ignored("/repo/docs/api/v1/index.md")
+        assert not matcher.ignored("/repo/guide.md")
+
+    def test_single_regex(self):
+        """Test that many patterns still compile to one expression per kind"""
+        matcher = PathMatcher([f"generated_{i}/" for i in range(500)], ["*.py"])
+        assert matcher.ignored("/repo/generated_499/x.py")
+        assert not matcher.ignored("/repo/generated_500/x.py")
+        assert matcher._exclude_regexes[0][0].groups == 500
+
+    def test_ancestors_of_the_root_are_not_matched(self):
+        """Test that ignored names above the watch root do not hide the project"""
+        matcher = PathMatcher(DEFAULT_IGNORE + ['build'], ['*.py'], base='/home/u/build/proj')
+        assert matcher.matches('/home/u/build/proj/app.py')
+        assert not matcher.matches('/home/u/build/proj/build/gen.py')
+        assert matcher.ignored('/home/u/build/proj/build', is_dir=True)
+
+        matcher = PathMatcher(DEFAULT_IGNORE)
+        matcher.add_roots(['/srv/release.tmp/app'])
+        assert not matcher.ignored('/srv/release.tmp/app/main.py')
+        assert matcher.ignored('/srv/release.tmp/app/cache.tmp')
+        assert not matcher.ignored('/srv/release.tmp/app', is_dir=True)
+
+class TestIgnoreFiles:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp()).resolve()
+        (self.temp_dir / ".gitignore").write_text("venv/\n/data\n")
+        (self.temp_dir / ".pypm2ignore").write_text("migrations/\n")
+        for path in ("app.py", "venv/lib/site.py", "data/big.json",
+                     "migrations/0001.py", "pkg/data/schema.json"):
+            (self.temp_dir / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.temp_dir / path).write_text("x")
+
+    def test_ignored_trees_are_pruned(self):
+        """Test that ignored directories are never listed"""
+        watcher = SimpleFileWatcher(Mock())
+        watcher.watch([str(self.temp_dir)])
+        listed = []
+        real_scandir = os.scandir
+
+        def scandir(path):
+            listed.append(os.path.relpath(path, self.temp_dir))
+            return real_scandir(path)
+
+        poller = TreePoller(watcher.is_relevant, watcher.should_ignore_dir)
+        with patch('pypm2.watcher.os.scandir', side_effect=scandir):
+            poller.add(str(self.temp_dir))
+        assert sorted(listed) == ['.', 'pkg', 'pkg/data']
+        assert sorted(os.path.relpath(p, self.temp_dir) for p in poller._files) == \
+            ['app.py', 'pkg/data/schema.json']
+
+    def test_project_below_an_ignored_name(self):
+        """Test that a project checked out under an ignored directory name is watched"""
+        project = self.temp_dir / "release.tmp" / "app"
+        project.mkdir(parents=True)
+        (project / "main.py").write_text("x")
+
+        watcher = SimpleFileWatcher(Mock())
+        watcher.watch([str(project)])
+        poller = TreePoller(watcher.is_relevant, watcher.should_ignore_dir)
+        poller.add(str(project))
+        assert list(poller._files) == [str(project / "main.py")]
@@ -0,0 +1,114 @@
+import pytest
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from pypm2.logindex import LogIndex, index_path, read_range
+from pypm2.logreader import parse_time, read_log_range
+from pypm2.rotation import LogRotator, RotationPolicy, segments
+
+# Two hours ago, so rotations done by the tests happen after the logged lines
+BASE = float(int(time.time()) - 7200)
+
+def stamp(offset: float) -> str:
+    return datetime.fromtimestamp(BASE + offset).strftime("[%Y-%m-%d %H:%M:%S]")
+
+class TestLogIndex:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.log_path = self.temp_dir / "app.log"
+        # One line per second for an hour, with untimestamped continuation lines
+        with open(self.log_path, 'w') as f:
+            for i in range(3600):
+                f.write(f"{stamp(i)} request {i}\n")
+                if i % 10 == 0:
+                    f.write("  continuation\n")
+
+    def _expected(self, since, until):
+        lines, current = [], None
+        for line in self.log_path.read_text().splitlines(keepends=True):
+            if line.startswith('['):
+                current = datetime.strptime(line[1:20], "%Y-%m-%d %H:%M:%S").timestamp()
+            if since <= current <= until:
+                lines.append(line)
+        return lines
+
+    def test_sparse_entries(self):
+        """Test that entries are written every N lines and point at line starts"""
+        index = LogIndex(self.log_path, every_lines=100)
+        assert index.update() > 30
+        assert index.update() == 0
+
+        data = self.log_path.read_bytes()
+        entries = index.entries()
+        assert entries[0] == (BASE, 0)
+        for ts, offset in entries:
+            assert offset == 0 or data[offset - 1:offset] == b"\n"
+            assert data[offset:offset + 21].decode() == stamp(ts - BASE)
+
+    def test_read_range_matches_scan(self):
+        """Test that an indexed window read equals a full scan"""
+        LogIndex(self.log_path, every_lines=100).update()
+        since, until = BASE + 1202, BASE + 1505
+        assert list(read_range(self.log_path, since, until)) == self._expected(since, until)
+
+    def test_incremental_update_and_rebuild(self):
+        """Test appends extend the index and a rewritten log rebuilds it"""
+        index = LogIndex(self.log_path, every_lines=100)
+        index.update()
+        count = len(index.entries())
+
+        with open(self.log_path, 'a') as f:
+            for i in range(3600, 3800):
+                f.write(f"{stamp(i)} request {i}\n")
+        assert index.update() >= 1
+        assert len(index.entries()) > count
+
+        self.log_path.write_text(f"{stamp(5000)} fresh\n")
+        assert LogIndex(self.log_path).entries() == []
+        assert LogIndex(self.log_path).update() == 1
+        assert LogIndex(self.log_path).entries() == [(BASE + 5000, 0)]
+
+    def test_index_survives_rotation(self):
+        """Test that the index follows the rotated segment and is rebuilt lazily"""
+        LogIndex(self.log_path, every_lines=100).update()
+        rotator = LogRotator()
+        segment = rotator.rotate(self.log_path, RotationPolicy(compress=False), copytruncate=False)
+        rotator.close()
+
+        assert not index_path(self.log_path).exists()
+        assert len(LogIndex(segment).entries()) > 30
+
+        self.log_path.write_text(f"{stamp(7300)} after rotation\n")
+        since, until = BASE + 3590, BASE + 7300
+        lines = list(read_log_range(self.log_path, since, until))
+        assert lines[0].startswith(stamp(3590))
+        assert lines[-1] == f"{stamp(7300)} after rotation\n"
+        assert index_path(self.log_path).exists()
+
+    def test_compressed_segment(self):
+        """Test window reads inside a gzip segment"""
+        LogIndex(self.log_path, every_lines=100).update()
+        rotator = LogRotator()
+        rotator.rotate(self.log_path, RotationPolicy(), copytruncate=True)
+        rotator.close()
+
+        segment = segments(self.log_path)[0]
+        assert segment.name.endswith(".gz")
+        since, until = BASE + 100, BASE + 102
+        assert list(read_range(segment, since, until)) == [
+            f"{stamp(100)} request 100\n", "  continuation\n",
+            f"{stamp(101)} request 101\n", f"{stamp(102)} request 102\n",
+        ]
+
+class TestParseTime:
+    def test_formats(self):
+        """Test --since/--until values"""
+        now = datetime(2024, 1, 31, 14, 0, 0).timestamp()
+        assert parse_time("10m", now) == now - 600
+        assert parse_time("2024-01-31 14:02") == now + 120
+        assert parse_time("2024-01-31T14:02:30") == now + 150
+        assert parse_time("14:05", now) == now + 300
+        with pytest.raises(ValueError):
+            parse_time("yesterday-ish")
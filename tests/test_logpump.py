@@ -0,0 +1,123 @@
+import os
+import pytest
+import re
+import tempfile
+import time
+from pathlib import Path
+from pypm2.logpump import LogPump, LogWriter, timestamp_lines
+from pypm2.manager import ProcessManager
+from pypm2.process import ProcessStatus
+
+class TestLogPump:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "app.log"
+        self.pump = LogPump()
+
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.pump.close()
+
+    def test_pipe_output_reaches_file(self):
+        """Test that data written to a pump pipe lands in the log file"""
+        fd = self.pump.pipe(self.log_path)
+        os.write(fd, b"hello\nworld\n")
+        os.close(fd)
+
+        assert self.pump.flush()
+        deadline = time.time() + 5
+        while not self.log_path.exists() and time.time() < deadline:
+            time.sleep(0.05)
+        assert self.log_path.read_bytes() == b"hello\nworld\n"
+
+    def test_timestamp_lines(self):
+        """Test that timestamps are added at line starts only"""
+        data, at_start = timestamp_lines(b"a\nb", True, b"T ")
+        assert data == b"T a\nT b"
+        assert at_start == False
+
+        data, at_start = timestamp_lines(b"c\n", at_start, b"T ")
+        assert data == b"c\n"
+        assert at_start == True
+
+    def test_full_buffer_drops_output(self):
+        """Test that a full buffer drops and counts output instead of blocking"""
+        writer = LogWriter(self.log_path, max_buffer=10)
+        assert writer.append(b"12345") == True
+        assert writer.append(b"123456789") == False
+        assert writer.dropped == 9
+
+        data = writer.take()
+        assert data.startswith(b"12345")
+        assert b"dropped 9 bytes" in data
+        assert writer.pending() == False
+
+class TestPipeLogMode:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = ProcessManager(self.temp_dir)
+
+        self.test_script = Path(self.temp_dir) / "chatty.py"
+        self.test_script.write_text("""
+import sys
+print("out line", flush=True)
+print("err line", file=sys.stderr, flush=True)
+""")
+
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.manager.delete_all()
+        self.manager.stop_monitoring()
+
+    def test_supervisor_writes_timestamped_logs(self):
+        """Test that pipe mode logs both streams with timestamps"""
+        self.manager.start("chatty", str(self.test_script), log_mode='pipe',
+                           log_time=True, autorestart=False)
+        process = self.manager.get_process("chatty")
+
+        deadline = time.time() + 5
+        while process.status == ProcessStatus.ONLINE and time.time() < deadline:
+            time.sleep(0.05)
+        # The pipes reach EOF once the child is gone
+        while self.manager.log_pump.stats() and time.time() < deadline:
+            time.sleep(0.05)
+
+        stamp = r"^\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] "
+        assert re.search(stamp + "out line", process.log_file.read_text(), re.M)
+        assert re.search(stamp + "err line", process.error_file.read_text(), re.M)
+
+    def test_refused_without_daemon(self):
+        """Test that a manager exiting with its command refuses pipe mode"""
+        local = ProcessManager(self.temp_dir, pipe_logs=False)
+        try:
+            with pytest.raises(ValueError):
+                local.start("chatty", str(self.test_script), log_mode='pipe')
+            assert local.get_process("chatty") is None
+        finally:
+            local.stop_monitoring()
+
+    def test_restart_without_daemon_writes_to_files(self):
+        """Test that pipe-mode processes outlive a manager that exits with its command"""
+        self.test_script.write_text("""
+import time
+while True:
+    print("tick", flush=True)
+    time.sleep(0.05)
+""")
+        self.manager.start("chatty", str(self.test_script), log_mode='pipe')
+        self.manager.stop("chatty")
+
+        local = ProcessManager(self.temp_dir, pipe_logs=False)
+        local.restart("chatty")
+        child = local.get_process("chatty").process
+        local.stop_monitoring()
+        try:
+            size = os.path.getsize(self.manager.get_process("chatty").log_file)
+            time.sleep(0.5)
+            assert child.poll() is None
+            assert os.path.getsize(self.manager.get_process("chatty").log_file) > size
+        finally:
+            child.kill()
+            child.wait()
@@ -0,0 +1,170 @@
+import pytest
+import tempfile
+import time
+from pathlib import Path
+from pypm2.logreader import (LogFollower, interleave, merge_logs, merge_streams, parse_time,
+                             parse_timestamp, read_logs, tail_lines)
+
+class TestTailLines:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "app.log"
+        self.log_path.write_text("".join(f"line {i}\n" for i in range(1000)))
+
+    def test_tail_matches_readlines(self):
+        """Test that block tailing returns the same lines as readlines"""
+        expected = self.log_path.read_text().splitlines(keepends=True)
+        for lines in (1, 7, 20, 999, 1000, 5000):
+            for block_size in (4, 64, 65536):
+                assert tail_lines(self.log_path, lines, block_size) == expected[-lines:]
+        assert tail_lines(self.log_path, 0) == expected
+
+    def test_tail_without_trailing_newline(self):
+        """Test a file whose last line is still being written"""
+        self.log_path.write_text("a\nb\npartial")
+        assert tail_lines(self.log_path, 2, block_size=3) == ["b\n", "partial"]
+
+    def test_missing_file(self):
+        """Test tailing a log that does not exist yet"""
+        assert tail_lines(Path(self.temp_dir) / "missing.log", 10) == []
+
+class TestInterleave:
+    def test_parse_timestamp(self):
+        """Test timestamp prefixes"""
+        assert parse_timestamp("[2024-01-31 12:00:00] INFO: x") is not None
+        assert parse_timestamp("2024-01-31T12:00:00Z x") is not None
+        assert parse_timestamp("no timestamp") is None
+
+    def test_interleave_by_timestamp(self):
+        """Test that both streams are merged in time order"""
+        out = ["[2024-01-31 12:00:00] start\n", "[2024-01-31 12:00:02] done\n"]
+        err = ["[2024-01-31 12:00:01] warn\n", "  traceback line\n"]
+        assert interleave([('out', out), ('err', err)]) == [
+            "out | [2024-01-31 12:00:00] start\n",
+            "err | [2024-01-31 12:00:01] warn\n",
+            "err |   traceback line\n",
+            "out | [2024-01-31 12:00:02] done\n",
+        ]
+
+    def test_read_logs_both(self):
+        """Test the interleaved view keeps the last N lines overall"""
+        temp_dir = Path(tempfile.mkdtemp())
+        (temp_dir / "a.log").write_text("[2024-01-31 12:00:00] a\n[2024-01-31 12:00:02] c\n")
+        (temp_dir / "a.error.log").write_text("[2024-01-31 12:00:01] b\n")
+        assert read_logs(temp_dir / "a.log", temp_dir / "a.error.log", 2, 'both') == [
+            "err | [2024-01-31 12:00:01] b\n",
+            "out | [2024-01-31 12:00:02] c\n",
+        ]
+        with pytest.raises(ValueError):
+            read_logs(temp_dir / "a.log", temp_dir / "a.error.log", 2, 'bogus')
+
+class TestLogFollower:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.out_path = self.temp_dir / "app.log"
+        self.err_path = self.temp_dir / "app.error.log"
+        self.out_path.write_text("old line\n")
+
+    def _collect(self, follower, count, timeout=5):
+        lines = []
+        deadline = time.time() + timeout
+        for item in follower.follow(timeout=0.2):
+            lines.append(item)
+        while len(lines) < count and time.time() < deadline:
+            lines.extend(follower.follow(timeout=0.2))
+        return lines
+
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    def test_follow_new_lines_and_streams(self, use_inotify):
+        """Test that only new complete lines of both files are streamed"""
+        follower = LogFollower([("out", self.out_path), ("err", self.err_path)],
+                               poll_interval=0.05, use_inotify=use_inotify)
+        try:
+            with open(self.out_path, 'a') as f:
+                f.write("new line\npartial")
+            self.err_path.write_text("boom\n")
+            assert sorted(self._collect(follower, 2)) == [("err", "boom\n"), ("out", "new line\n")]
+        finally:
+            follower.close()
+
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    def test_follow_across_rotation_and_truncation(self, use_inotify):
+        """Test that renamed and truncated files are reopened"""
+        follower = LogFollower([("out", self.out_path)], poll_interval=0.05,
+                               use_inotify=use_inotify)
+        try:
+            with open(self.out_path, 'a') as f:
+                f.write("before rotation\n")
+            assert self._collect(follower, 1) == [("out", "before rotation\n")]
+
+            self.out_path.rename(self.temp_dir / "app.log.1")
+            self.out_path.write_text("after rotation\n")
+            assert self._collect(follower, 1) == [("out", "after rotation\n")]
+
+            self.out_path.write_text("")
+            with open(self.out_path, 'a') as f:
+                f.write("cut\n")
+            assert self._collect(follower, 1) == [("out", "cut\n")]
+        finally:
+            follower.close()
+
+class TestMergeLogs:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.api = self.temp_dir / "api.log"
+        self.worker = self.temp_dir / "worker.log"
+        self.api.write_text("[2024-01-31 12:00:00] api receive\n"
+                            "[2024-01-31 12:00:03] api respond\n")
+        self.worker.write_text("[2024-01-31 12:00:01] worker start\n"
+                               "  detail\n"
+                               "[2024-01-31 12:00:02] worker done\n")
+        self.files = [("api", self.api), ("worker", self.worker)]
+
+    def test_merge_is_chronological(self):
+        """Test the merged timeline of several processes"""
+        assert list(merge_logs(self.files)) == [
+            "api | [2024-01-31 12:00:00] api receive\n",
+            "worker | [2024-01-31 12:00:01] worker start\n",
+            "worker |   detail\n",
+            "worker | [2024-01-31 12:00:02] worker done\n",
+            "api | [2024-01-31 12:00:03] api respond\n",
+        ]
+        assert len(list(merge_logs(self.files, lines=2))) == 2
+
+    def test_merge_with_window(self):
+        """Test that merging composes with since/until"""
+        since = parse_time("2024-01-31 12:00:01")
+        until = parse_time("2024-01-31 12:00:02")
+        assert [line.split(" | ")[0] for line in merge_logs(self.files, 0, since, until)] == \
+            ["worker", "worker", "worker"]
+
+    def test_merge_is_lazy(self):
+        """Test that the merge pulls lines on demand"""
+        pulled = []
+
+        def lines(label, count):
+            for i in range(count):
+                pulled.append(label)
+                yield f"[2024-01-31 12:00:{i:02d}] {label}\n"
+
+        merged = merge_streams([("a", lines("a", 50)), ("b", lines("b", 50))])
+        assert next(merged).startswith("a | ")
+        assert len(pulled) <= 3
+
+    def test_follow_merged(self):
+        """Test that followed lines read together are ordered by timestamp"""
+        follower = LogFollower(self.files, poll_interval=0.05, use_inotify=False, merge=True)
+        try:
+            with open(self.api, 'a') as f:
+                f.write("[2024-01-31 12:00:05] api late\n")
+            with open(self.worker, 'a') as f:
+                f.write("[2024-01-31 12:00:04] worker early\n")
+            assert list(follower.follow(timeout=0.1)) == [
+                ("worker", "[2024-01-31 12:00:04] worker early\n"),
+                ("api", "[2024-01-31 12:00:05] api late\n"),
+            ]
+        finally:
+            follower.close()
@@ -1,6 +1,8 @@
 import pytest
 import tempfile
 import os
+import psutil
+import threading
 import time
 from pathlib import Path
 from pypm2.manager import ProcessManager
@@ -72,6 +74,60 @@ print("Test script finished")
         processes = self.manager.list()
         assert len(processes) == 0
     
+    def test_resurrect_saves_only_resurrected(self):
+        """Test that resurrect writes the records it changed instead of replacing all"""
+        self.manager.start("running", str(self.test_script))
+        self.manager.start("stopped", str(self.test_script))
+        self.manager.stop("stopped")
+        written = []
+        real_save = self.manager.config.save_processes
+        
+        def save_processes(processes, deleted=None):
+            assert deleted is not None
+            written.extend(processes)
+            real_save(processes, deleted)
+        
+        self.manager.config.save_processes = save_processes
+        assert self.manager.resurrect() == {"running": "running", "stopped": "resurrected"}
+        assert written == ["stopped"]
+        assert self.manager.config.load_processes()["stopped"]['status'] == ProcessStatus.ONLINE.value
+    
+    def test_delete_releases_log_handles(self):
+        """Test that create/delete churn does not leak file descriptors"""
+        def open_fds():
+            assert self.manager.supervisor_log.flush()
+            assert self.manager.log_pump.flush()
+            return len(os.listdir('/proc/self/fd'))
+        
+        def churn(name, mode):
+            self.manager.start(name, str(self.test_script), log_mode=mode)
+            process = self.manager.get_process(name)
+            process._log_info("supervisor message")
+            process._log_error("supervisor error")
+            self.manager.delete(name)
+        
+        for mode in ('file', 'pipe'):
+            churn("warmup", mode)
+        before = open_fds()
+        for i in range(10):
+            churn(f"churn{i}", 'pipe' if i % 2 else 'file')
+        time.sleep(0.5)
+        assert open_fds() <= before
+        assert self.manager.supervisor_log._handles == {}
+    
+    def test_concurrent_starts_give_one_process(self):
+        """Test that racing starts of one name leave a single managed child"""
+        threads = [threading.Thread(target=self.manager.start, args=("app", str(self.test_script)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        children = [child for child in psutil.Process().children(recursive=True)
+                    if str(self.test_script) in ' '.join(child.cmdline())]
+        assert [child.pid for child in children] == [self.manager.get_process("app").pid]
+    
     def test_multiple_processes(self):
         """Test managing multiple processes"""
         self.manager.start("test1", str(self.test_script))
@@ -105,3 +161,118 @@ print("Test script finished")
         else:
             # If no logs yet, at least verify the process is running
             assert test_process['status'] == 'online'
+    
+    def test_crash_restart_is_scheduled(self):
+        """Test that a crashed process is restarted by the scheduler"""
+        crash_script = Path(self.temp_dir) / "crash_script.py"
+        crash_script.write_text("import time\ntime.sleep(0.2)\nraise SystemExit(1)\n")
+        
+        self.manager.start("crash", str(crash_script), restart_delay=100, max_restarts=1)
+        first_pid = self.manager.get_process("crash").pid
+        
+        deadline = time.time() + 5
+        process = self.manager.get_process("crash")
+        while process.restart_count == 0 or process.status != ProcessStatus.ONLINE:
+            assert time.time() < deadline
+            time.sleep(0.05)
+        
+        assert process.restart_count == 1
+        assert process.pid != first_pid
+    
+    def test_memory_restart_leaves_scheduler_free(self):
+        """Test that a slow memory-limit restart does not occupy a scheduler worker"""
+        self.manager.start("hog", str(self.test_script))
+        process = self.manager.get_process("hog")
+        restarted = threading.Event()
+        real_restart = process._restart
+        
+        def slow_restart():
+            time.sleep(1.0)
+            result = real_restart()
+            restarted.set()
+            return result
+        
+        process._restart = slow_restart
+        process._schedule_restart(60)
+        start = time.monotonic()
+        process._run_pending_restart(process._restart_generation)
+        assert time.monotonic() - start < 0.5
+        
+        assert restarted.wait(10)
+        assert process.status == ProcessStatus.ONLINE
+        assert process._pending_restart is None
+    
+    def test_restart_all_runs_in_parallel(self):
+        """Test that bulk restarts overlap and report per-process results"""
+        for i in range(4):
+            self.manager.start(f"test{i}", str(self.test_script))
+        
+        started = time.monotonic()
+        results = self.manager.restart_all(parallel=4)
+        elapsed = time.monotonic() - started
+        
+        assert sorted(results) == ['test0', 'test1', 'test2', 'test3']
+        assert all(r['success'] for r in results.values())
+        assert all(r['duration'] >= 1.0 for r in results.values())
+        # Each restart waits at least 1s; serially this would take 4s
+        assert elapsed < 3.0
+    
+    def test_watch_restarts_on_change(self):
+        """Test that the shared watch service restarts watched processes only"""
+        src = Path(self.temp_dir) / "src"
+        src.mkdir()
+        (src / "module.py").write_text("x = 1\n")
+        self.manager.start("watched", str(self.test_script), watch=[str(src)])
+        self.manager.start("other", str(self.test_script))
+        assert self.manager.watch_service.subscribers() == {"watched": [str(src.resolve())]}
+        
+        watched = self.manager.get_process("watched")
+        first_pid = watched.pid
+        other_pid = self.manager.get_process("other").pid
+        time.sleep(0.8)
+        (src / "module.py").write_text("x = 2\n")
+        
+        deadline = time.time() + 5
+        while watched.pid in (first_pid, None) or watched.status != ProcessStatus.ONLINE:
+            assert time.time() < deadline
+            time.sleep(0.05)
+        assert self.manager.get_process("other").pid == other_pid
+        
+        assert self.manager.watch("watched", enabled=False)
+        assert self.manager.watch_service.subscribers() == {}
+    
+    def test_failed_validation_keeps_process(self):
+        """Test that a change that does not compile leaves the running process alone"""
+        module = Path(self.temp_dir) / "module.py"
+        module.write_text("def broken(:\n")
+        self.manager.start("validated", str(self.test_script), watch_validate=True)
+        process = self.manager.get_process("validated")
+        first_pid = process.pid
+        
+        self.manager._on_watched_change("validated", [str(module)])
+        assert process.pid == first_pid and process.status == ProcessStatus.ONLINE
+        assert self.manager.supervisor_log.flush()
+        assert "validation failed" in Path(process.error_file).read_text()
+        
+        module.write_text("def fixed():\n    pass\n")
+        self.manager._on_watched_change("validated", [str(module)])
+        assert process.pid != first_pid
+    
+    def test_rejected_changes_are_validated_again(self):
+        """Test that a valid change does not restart into a file rejected before"""
+        models = Path(self.temp_dir) / "models.py"
+        views = Path(self.temp_dir) / "views.py"
+        models.write_text("def broken(:\n")
+        views.write_text("VIEWS = []\n")
+        self.manager.start("validated", str(self.test_script), watch_validate=True)
+        process = self.manager.get_process("validated")
+        first_pid = process.pid
+        
+        self.manager._on_watched_change("validated", [str(models)])
+        self.manager._on_watched_change("validated", [str(views)])
+        assert process.pid == first_pid and process.status == ProcessStatus.ONLINE
+        
+        models.write_text("MODELS = []\n")
+        self.manager._on_watched_change("validated", [str(models)])
+        assert process.pid != first_pid
+        assert process.held_changes == set()
@@ -69,6 +69,33 @@ print("Process finished")
         assert process.status == ProcessStatus.ONLINE
         assert process.pid != old_pid  # Should have a new PID
     
+    def test_restart_waits_only_for_held_ports(self):
+        """Test that the one-second port wait only applies to processes that bound a port"""
+        plain = Process("plain", str(self.test_script), self.config, restart_delay=0)
+        server_script = Path(self.temp_dir) / "server.py"
+        server_script.write_text("""
+import socket, time
+sock = socket.socket()
+sock.bind(("127.0.0.1", 0))
+sock.listen()
+time.sleep(30)
+""")
+        server = Process("server", str(server_script), self.config, restart_delay=0)
+        try:
+            assert plain.start() and server.start()
+            time.sleep(0.5)
+            
+            started = time.monotonic()
+            assert plain.restart()
+            assert time.monotonic() - started < 0.8
+            
+            started = time.monotonic()
+            assert server.restart()
+            assert time.monotonic() - started >= 1.0
+        finally:
+            plain.stop(force=True)
+            server.stop(force=True)
+    
     def test_process_with_args(self):
         """Test process with arguments"""
         # Create a script that uses arguments
@@ -95,3 +122,23 @@ print(f"Arguments: {sys.argv[1:]}")
         assert data['script'] == str(self.test_script)
         assert data['status'] == ProcessStatus.ONLINE.value
         assert data['pid'] is not None
+    
+    def test_exit_detected_without_polling(self):
+        """Test that the exit watcher reports a crash promptly"""
+        from pypm2.reaper import ExitWatcher
+        
+        crash_script = Path(self.temp_dir) / "crash_script.py"
+        crash_script.write_text("import sys\nsys.exit(3)\n")
+        
+        watcher = ExitWatcher()
+        process = Process("test", str(crash_script), self.config, autorestart=False)
+        process.exit_watcher = watcher
+        process.start()
+        
+        deadline = time.time() + 5
+        while process.status == ProcessStatus.ONLINE and time.time() < deadline:
+            time.sleep(0.01)
+        watcher.close()
+        
+        assert process.status == ProcessStatus.ERRORED
+        assert process.exit_code == 3
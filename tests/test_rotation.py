@@ -0,0 +1,112 @@
+import gzip
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+from pypm2.manager import ProcessManager
+from pypm2.rotation import LogRotator, RotationPolicy, parse_size, segments
+
+class TestRotationPolicy:
+    def test_parse_size(self):
+        """Test size parsing"""
+        assert parse_size("10M") == 10 * 1024 * 1024
+        assert parse_size("512k") == 512 * 1024
+        assert parse_size(2048) == 2048
+        assert parse_size(None) is None
+
+    def test_due(self):
+        """Test size and interval triggers"""
+        policy = RotationPolicy(max_size="1K")
+        assert policy.due(2048, time.time(), time.time()) == True
+        assert policy.due(100, time.time(), time.time()) == False
+
+        daily = RotationPolicy(interval='daily')
+        yesterday = time.time() - 86400
+        assert daily.due(10, yesterday, time.time()) == True
+        assert daily.due(10, time.time(), time.time()) == False
+        assert daily.due(0, yesterday, time.time()) == False
+
+class TestLogRotator:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "app.log"
+        self.rotator = LogRotator()
+
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.rotator.close()
+
+    def test_copytruncate_keeps_descriptor_valid(self):
+        """Test that rotation truncates in place for a child's O_APPEND fd"""
+        policy = RotationPolicy(max_size=10)
+        with open(self.log_path, 'a') as child:
+            child.write("x" * 100 + "\n")
+            child.flush()
+
+            assert self.rotator.check(self.log_path, policy, copytruncate=True) is not None
+            self.rotator.flush()
+            child.write("after\n")
+            child.flush()
+
+        self.rotator.close()
+        assert self.log_path.read_text() == "after\n"
+        rotated = segments(self.log_path)
+        assert len(rotated) == 1
+        assert rotated[0].name.endswith(".gz")
+        assert gzip.decompress(rotated[0].read_bytes()) == b"x" * 100 + b"\n"
+
+    def test_copy_runs_in_the_background(self):
+        """Test that a copytruncate rotation leaves the copy to the rotator's thread"""
+        self.log_path.write_text("x" * 100 + "\n")
+        threads = []
+        copy = shutil.copyfile
+        with patch('pypm2.rotation.shutil.copyfile',
+                   side_effect=lambda *args: threads.append(threading.current_thread()) or copy(*args)):
+            segment = self.rotator.rotate(self.log_path, RotationPolicy(compress=False), True)
+            # Not rotated twice while the copy is pending
+            assert self.rotator.rotate(self.log_path, RotationPolicy(), True) is None
+            self.rotator.flush()
+        assert threads and threads[0] is not threading.current_thread()
+        assert segment.read_text() == "x" * 100 + "\n"
+        assert self.log_path.read_text() == ""
+
+    def test_retention(self):
+        """Test that only the newest segments are kept"""
+        policy = RotationPolicy(max_size=1, retain=2, compress=False)
+        for i in range(4):
+            self.log_path.write_text(f"run {i}\n")
+            self.rotator.rotate(self.log_path, policy, copytruncate=False)
+
+        self.rotator.close()
+        rotated = segments(self.log_path)
+        assert [p.read_text() for p in rotated] == ["run 2\n", "run 3\n"]
+
+class TestManagerRotation:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = ProcessManager(self.temp_dir)
+        self.test_script = Path(self.temp_dir) / "app.py"
+        self.test_script.write_text("print('hello', flush=True)\nimport time\ntime.sleep(60)\n")
+
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.manager.delete_all()
+        self.manager.stop_monitoring()
+
+    def test_rotate_logs(self):
+        """Test on-demand rotation through the manager"""
+        self.manager.start("app", str(self.test_script), log_mode='pipe', log_compress=False)
+        process = self.manager.get_process("app")
+
+        deadline = time.time() + 5
+        while "hello" not in (process.log_file.read_text() if process.log_file.exists() else "") \
+                and time.time() < deadline:
+            time.sleep(0.05)
+
+        rotated = self.manager.rotate_logs("app")
+        assert len(rotated["app"]) == 1
+        assert "hello" in Path(rotated["app"][0]).read_text()
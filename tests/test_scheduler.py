@@ -0,0 +1,44 @@
+import threading
+import time
+from pypm2.scheduler import Scheduler
+
+class TestScheduler:
+    def setup_method(self):
+        """Setup test environment"""
+        self.scheduler = Scheduler()
+    
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.scheduler.close()
+    
+    def test_calls_run_in_due_order(self):
+        """Test that callbacks fire by due time, not booking order"""
+        fired = []
+        done = threading.Event()
+        
+        self.scheduler.call_later(0.2, lambda: (fired.append('late'), done.set()))
+        self.scheduler.call_later(0.05, fired.append, 'early')
+        
+        assert done.wait(2)
+        assert fired == ['early', 'late']
+    
+    def test_cancel(self):
+        """Test that cancelled calls never run"""
+        fired = []
+        call = self.scheduler.call_later(0.05, fired.append, 'cancelled')
+        call.cancel()
+        
+        time.sleep(0.2)
+        assert fired == []
+        assert self.scheduler.pending() == 0
+    
+    def test_slow_callback_does_not_delay_others(self):
+        """Test that a blocking callback does not hold back later events"""
+        fired = threading.Event()
+        
+        self.scheduler.call_later(0, time.sleep, 1.0)
+        start = time.monotonic()
+        self.scheduler.call_later(0.05, fired.set)
+        
+        assert fired.wait(2)
+        assert time.monotonic() - start < 0.5
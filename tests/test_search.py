@@ -0,0 +1,83 @@
+import gzip
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from pypm2.logindex import LogIndex
+from pypm2.rotation import LogRotator, RotationPolicy
+from pypm2.search import grep_file, search_logs
+
+# Two hours ago, so rotations done by the tests happen after the logged lines
+BASE = float(int(time.time()) - 7200)
+
+def stamp(offset: float) -> str:
+    return datetime.fromtimestamp(BASE + offset).strftime("[%Y-%m-%d %H:%M:%S]")
+
+class TestSearch:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.api = self.temp_dir / "api.log"
+        self.worker = self.temp_dir / "worker.log"
+        with open(self.api, 'w') as f:
+            for i in range(0, 1000, 2):
+                f.write(f"{stamp(i)} api request {i}{' ERROR timeout' if i % 100 == 0 else ''}\n")
+        with open(self.worker, 'w') as f:
+            for i in range(1, 1000, 2):
+                f.write(f"{stamp(i)} worker job {i}{' error retry' if i % 250 == 1 else ''}\n")
+        self.files = [("api", self.api), ("worker", self.worker)]
+
+    def test_grep_file_offsets(self):
+        """Test that each matching line is reported once with its byte offset"""
+        data = self.api.read_bytes()
+        matches = grep_file("api", str(self.api), r"ERROR|timeout")
+        assert len(matches) == 10
+        for match in matches:
+            assert match['name'] == "api"
+            assert match['offset'] == 0 or data[match['offset'] - 1:match['offset']] == b"\n"
+            assert data[match['offset']:].startswith(match['line'].encode())
+            assert match['line'].endswith("ERROR timeout")
+
+    def test_anchored_patterns_match_lines(self):
+        """Test that ^ and $ anchor at line ends in plain and compressed logs"""
+        log = self.temp_dir / "crash.log"
+        log.write_text("Traceback (most recent call last):\n  x\nValueError: bad\n"
+                       "caught error\nno Traceback here\n")
+        for path in (log, self._compressed(log)):
+            assert [m['line'] for m in grep_file("app", str(path), r"^Traceback")] == \
+                ["Traceback (most recent call last):"]
+            assert [m['line'] for m in grep_file("app", str(path), r"error$")] == ["caught error"]
+            # Matches never span lines
+            assert grep_file("app", str(path), r"bad\scaught") == []
+            assert [m['line'] for m in grep_file("app", str(path), r"x\s*$")] == ["  x"]
+
+    def _compressed(self, path: Path) -> Path:
+        target = path.with_name(path.name + ".1.gz")
+        with gzip.open(target, 'wb') as f:
+            f.write(path.read_bytes())
+        return target
+
+    def test_search_across_processes_and_segments(self):
+        """Test parallel search over plain logs and compressed rotated segments"""
+        rotator = LogRotator()
+        segment = rotator.rotate(self.api, RotationPolicy(), copytruncate=False)
+        rotator.close()
+        with open(self.api, 'a') as f:
+            f.write(f"{stamp(5000)} api ERROR after rotation\n")
+
+        matches = search_logs(self.files, "error", ignore_case=True)
+        files = [Path(m['file']).name for m in matches]
+        assert files[:10] == [segment.name + ".gz"] * 10
+        assert files[10] == "api.log"
+        assert matches[10]['offset'] == 0
+        assert [m['name'] for m in matches].count("worker") == 4
+        assert len(matches) == 15
+
+    def test_window_and_limit(self):
+        """Test --since/--until windows and early exit on a match limit"""
+        LogIndex(self.api, every_lines=50).update()
+        matches = search_logs(self.files, "ERROR|error", since=BASE + 250, until=BASE + 599)
+        assert [m['line'].split()[4] for m in matches] == ["300", "400", "500", "251", "501"]
+
+        assert len(search_logs(self.files, "job", limit=7)) == 7
+        assert search_logs(self.files, "no such line") == []
@@ -0,0 +1,61 @@
+import json
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from pypm2.statestore import StateStore
+
+class TestStateStore:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "state.db"
+
+    def record(self, i, status='online'):
+        return {'script': f"app{i}.py", 'pid': 1000 + i, 'status': status, 'options': {'args': []}}
+
+    def test_per_record_writes(self):
+        """Test that saving one process writes only its row, in WAL mode"""
+        store = StateStore(self.path)
+        store.replace({f"app{i}": self.record(i) for i in range(1000)})
+        assert store._db.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+        statements = []
+        store._db.set_trace_callback(statements.append)
+        store.put("app500", self.record(500, 'stopped'))
+        store.put("app501", self.record(501))  # unchanged: not written
+        store.delete("app2")
+        writes = [s for s in statements if s.startswith(("INSERT", "DELETE"))]
+        assert len(writes) == 2
+
+        store.replace({name: record for name, record in store.load().items()})
+        store._db.set_trace_callback(None)
+        loaded = StateStore(self.path).load()
+        assert len(loaded) == 999 and "app2" not in loaded
+        assert loaded["app500"]['status'] == 'stopped'
+        assert list(loaded)[:3] == ["app0", "app1", "app3"]
+
+    def test_migrates_processes_json(self):
+        """Test that an old processes.json is imported once"""
+        legacy = self.temp_dir / "processes.json"
+        legacy.write_text(json.dumps({"api": self.record(1), "worker": self.record(2)}))
+        store = StateStore(self.path, legacy_file=legacy)
+        assert store.load() == {"api": self.record(1), "worker": self.record(2)}
+        assert not legacy.exists()
+        assert (self.temp_dir / "processes.json.migrated").exists()
+
+    def test_concurrent_writers(self):
+        """Test that separate stores (CLIs) updating different processes lose nothing"""
+        stores = [StateStore(self.path) for _ in range(4)]
+
+        def writer(n):
+            for i in range(50):
+                stores[n].put(f"w{n}-{i}", self.record(i))
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(StateStore(self.path).load()) == 200
+        assert sqlite3.connect(str(self.path)).execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+from pypm2.logindex import parse_timestamp
+from pypm2.logpump import LogPump
+from pypm2.supervisorlog import SupervisorLog, format_message
+
+class TestSupervisorLog:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.log_path = self.temp_dir / "app.log"
+        self.error_path = self.temp_dir / "app.error.log"
+
+    def test_format(self):
+        """Test that messages are tagged and start with an indexable timestamp"""
+        line = format_message('INFO', "Restarting process...", now=1706702400)
+        assert line.endswith(b" [pypm2] INFO: Restarting process...\n")
+        assert parse_timestamp(line) == 1706702400
+
+    def test_batches_in_order_through_one_handle(self):
+        """Test that queued messages are written in order once the flush policy says so"""
+        log = SupervisorLog(flush_interval=60, flush_lines=1000)
+        try:
+            for i in range(50):
+                log.write(self.log_path, 'INFO', f"message {i}")
+            time.sleep(0.1)
+            assert not self.log_path.exists()
+
+            # An error flushes everything queued so far
+            log.write(self.error_path, 'ERROR', "crashed")
+            assert log.flush()
+            lines = self.log_path.read_text().splitlines()
+            assert [line.rsplit(" ", 1)[1] for line in lines] == [str(i) for i in range(50)]
+            assert self.error_path.read_text().endswith("[pypm2] ERROR: crashed\n")
+            assert len(log._handles) == 2
+        finally:
+            log.close()
+
+    def test_full_queue_drops_and_reopen(self):
+        """Test the queue bound and reopening a removed log"""
+        log = SupervisorLog(queue_size=5, flush_interval=60, flush_lines=1000)
+        try:
+            results = [log.write(self.log_path, 'INFO', f"m{i}") for i in range(8)]
+            assert results.count(False) == 3
+            assert log.flush()
+            assert "dropped 3 supervisor messages" in self.log_path.read_text()
+
+            self.log_path.unlink()
+            log.reopen(self.log_path)
+            log.write(self.log_path, 'INFO', "after flush")
+            assert log.flush()
+            assert "after flush" in self.log_path.read_text()
+        finally:
+            log.close()
+
+    def test_release_closes_after_writing(self):
+        """Test that releasing a log writes what is queued for it, then closes its handle"""
+        log = SupervisorLog(flush_interval=60, flush_lines=1000)
+        try:
+            log.write(self.log_path, 'INFO', "stopping")
+            log.release(self.log_path)
+            assert log.flush()
+            assert self.log_path.read_text().endswith("[pypm2] INFO: stopping\n")
+            assert log._handles == {}
+        finally:
+            log.close()
+
+    def test_pipe_mode_keeps_lines_whole(self):
+        """Test that a supervisor line never lands inside a partial output line"""
+        pump = LogPump()
+        try:
+            fd = pump.pipe(self.log_path)
+            os.write(fd, b"partial")
+            deadline = time.time() + 5
+            while pump.stats()[str(self.log_path)]['buffered'] == 0 and \
+                    not self.log_path.exists() and time.time() < deadline:
+                time.sleep(0.01)
+            assert pump.write_line(self.log_path, format_message('INFO', "restarting"))
+            os.close(fd)
+            assert pump.flush()
+            lines = self.log_path.read_text().splitlines()
+            assert lines[0] == "partial"
+            assert lines[1].endswith("[pypm2] INFO: restarting")
+            assert pump.write_line(self.temp_dir / "other.log", b"x\n") == False
+        finally:
+            pump.close()
@@ -0,0 +1,50 @@
+import sys
+import tempfile
+from pathlib import Path
+from pypm2.validate import compile_files, run_check, validate_changes
+
+class TestValidate:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.good = self.temp_dir / "good.py"
+        self.good.write_text("def handler():\n    return 1\n")
+        self.bad = self.temp_dir / "bad.py"
+        self.bad.write_text("def handler(:\n    return 1\n")
+
+    def test_compile_in_parallel(self):
+        """Test that every changed file is compiled and only failures are reported"""
+        others = []
+        for i in range(4):
+            path = self.temp_dir / f"mod{i}.py"
+            path.write_text(f"x = {i}\n")
+            others.append(str(path))
+        errors = compile_files([str(self.good), str(self.bad), str(self.temp_dir / "gone.py"),
+                                str(self.temp_dir / "config.json")] + others)
+        assert len(errors) == 1
+        assert "bad.py" in errors[0]
+        # The bytecode cache is warm for the new instance
+        assert len(list((self.temp_dir / "__pycache__").glob("*.pyc"))) == 5
+
+    def test_uses_process_interpreter(self):
+        """Test that files are compiled by the process's interpreter, not the supervisor's"""
+        fake = self.temp_dir / "python2.7"
+        fake.write_text('#!/bin/sh\necho "compiled by fake: $*"\nexit 1\n')
+        fake.chmod(0o755)
+        errors = compile_files([str(self.good)], interpreter=str(fake))
+        assert len(errors) == 1
+        assert errors[0].startswith("compiled by fake: -c") and errors[0].endswith(str(self.good))
+        assert not (self.temp_dir / "__pycache__").exists()
+
+        missing = compile_files([str(self.good)], interpreter=str(self.temp_dir / "nope"))
+        assert len(missing) == 1 and "could not run" in missing[0]
+
+    def test_check_command(self):
+        """Test that the check command runs after compiling and reports its output"""
+        assert validate_changes([str(self.good)], check=f"{sys.executable} -c 'pass'") == []
+        error = run_check(f"{sys.executable} -c 'print(\"2 tests failed\"); exit(3)'")
+        assert "exited with 3" in error and "2 tests failed" in error
+        assert "timed out" in run_check("sleep 5", timeout=0.2)
+        errors = validate_changes([str(self.bad)], check="touch ran", cwd=str(self.temp_dir))
+        assert len(errors) == 1
+        assert not (self.temp_dir / "ran").exists()
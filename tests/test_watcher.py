@@ -15,7 +15,11 @@ from unittest.mock import Mock, patch
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from pypm2.watcher import ProcessWatcher, SimpleFileWatcher, setup_default_watch_paths
+from pypm2 import inotify
+from pypm2.watcher import (PRIME_MAX_SIZE, UNKNOWN, ChangeBatcher, ContentHasher,
+                          InotifyFileWatcher, ProcessWatcher, SimpleFileWatcher, TreePoller,
+                          WatchService, collapse_roots, content_digest, create_file_watcher,
+                          setup_default_watch_paths)
 
 class TestSimpleFileWatcher(unittest.TestCase):
     """Test the simple file watcher functionality"""
@@ -88,6 +92,194 @@ class TestSimpleFileWatcher(unittest.TestCase):
         
         # Should detect change
         self.assertTrue(self.watcher.check_file_changes([test_file]))
+    
+    def test_wait_for_changes(self):
+        """Test the polling backend interface"""
+        test_file = os.path.join(self.temp_dir, 'test.py')
+        with open(test_file, 'w') as f:
+            f.write("initial content")
+        self.watcher.poll_interval = 0.05
+        self.watcher.watch([self.temp_dir])
+        self.assertEqual(self.watcher.wait_for_changes(timeout=0.05), [])
+        
+        time.sleep(0.1)
+        with open(test_file, 'w') as f:
+            f.write("modified content")
+        self.assertEqual(self.watcher.wait_for_changes(timeout=0.05), [test_file])
+
+class TestTreePoller(unittest.TestCase):
+    """Test the incremental polling backend"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        for i in range(5):
+            os.makedirs(os.path.join(self.temp_dir, f'pkg{i}', '__pycache__'))
+            for j in range(4):
+                with open(os.path.join(self.temp_dir, f'pkg{i}', f'mod{j}.py'), 'w') as f:
+                    f.write("x = 1")
+        watcher = SimpleFileWatcher(Mock())
+        self.poller = TreePoller(watcher.is_relevant, watcher.should_ignore_dir)
+        self.poller.add(self.temp_dir)
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def path(self, *parts):
+        return os.path.join(self.temp_dir, *parts)
+    
+    def test_only_changed_directories_are_listed(self):
+        """Test that a poll lists nothing when no directory changed"""
+        self.assertEqual(len(self.poller._files), 20)
+        self.assertNotIn(self.path('pkg0', '__pycache__'), self.poller._dirs)
+        with patch('pypm2.watcher.os.scandir', wraps=os.scandir) as scandir:
+            self.assertEqual(self.poller.poll(), [])
+            self.assertEqual(scandir.call_count, 0)
+            
+            with open(self.path('pkg3', 'new.py'), 'w') as f:
+                f.write("y = 2")
+            self.assertEqual(self.poller.poll(), [self.path('pkg3', 'new.py')])
+            self.assertEqual(scandir.call_count, 1)
+    
+    def test_create_delete_rename_and_in_place_writes(self):
+        """Test every kind of change, compared on mtime_ns, size and inode"""
+        os.rename(self.path('pkg1', 'mod0.py'), self.path('pkg1', 'renamed.py'))
+        os.unlink(self.path('pkg2', 'mod1.py'))
+        self.assertEqual(sorted(self.poller.poll()), sorted([
+            self.path('pkg1', 'mod0.py'), self.path('pkg1', 'renamed.py'),
+            self.path('pkg2', 'mod1.py')]))
+        
+        # Same size, mtime restored: the new inode still gives it away
+        target = self.path('pkg4', 'mod2.py')
+        st = os.stat(target)
+        with open(target + '.tmp', 'w') as f:
+            f.write("x = 9")
+        os.replace(target + '.tmp', target)
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(self.poller.poll(), [target])
+        
+        with open(self.path('pkg0', 'mod3.py'), 'a') as f:
+            f.write("\n")
+        self.assertEqual(self.poller.poll(), [self.path('pkg0', 'mod3.py')])
+    
+    def test_new_and_removed_subtrees(self):
+        """Test that directories appearing or disappearing are diffed as a whole"""
+        os.makedirs(self.path('pkg9', 'sub'))
+        with open(self.path('pkg9', 'sub', 'deep.py'), 'w') as f:
+            f.write("z = 3")
+        self.assertEqual(self.poller.poll(), [self.path('pkg9', 'sub', 'deep.py')])
+        
+        import shutil
+        shutil.rmtree(self.path('pkg9'))
+        self.assertEqual(self.poller.poll(), [self.path('pkg9', 'sub', 'deep.py')])
+        self.assertNotIn(self.path('pkg9', 'sub'), self.poller._dirs)
+    
+    def test_stat_budget_rotates(self):
+        """Test that in-place writes are found within len(files) / budget polls"""
+        self.poller.max_stats_per_tick = 6
+        self.poller.poll()
+        with open(self.path('pkg0', 'mod0.py'), 'a') as f:
+            f.write("\n")
+        found = []
+        for _ in range(4):
+            found.extend(self.poller.poll())
+        self.assertEqual(found, [self.path('pkg0', 'mod0.py')])
+
+    def test_remove_keeps_covered_trees(self):
+        """Test that removing a path keeps the parts another watched path still covers"""
+        poller = TreePoller(self.poller.is_relevant, self.poller.should_ignore_dir)
+        self.assertEqual(len(poller.add(self.path('pkg1'))), 4)
+        self.assertEqual(len(poller.add(self.temp_dir)), 16)
+        poller.remove(self.path('pkg1'), [self.temp_dir])
+        self.assertEqual(len(poller._files), 20)
+        
+        poller.remove(self.temp_dir, [self.path('pkg2')])
+        self.assertEqual(sorted(poller._files),
+                         sorted(self.path('pkg2', f'mod{j}.py') for j in range(4)))
+        with open(self.path('pkg1', 'mod0.py'), 'a') as f:
+            f.write("\n")
+        self.assertEqual(poller.poll(), [])
+
+@unittest.skipUnless(inotify.available(), "inotify not available")
+class TestInotifyFileWatcher(unittest.TestCase):
+    """Test the inotify backend"""
+    
+    def setUp(self):
+        self.watcher = InotifyFileWatcher(Mock())
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.temp_dir, 'app.py')
+        with open(self.test_file, 'w') as f:
+            f.write("initial content")
+        self.watcher.watch([self.temp_dir])
+    
+    def tearDown(self):
+        self.watcher.close()
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_change_is_reported_quickly(self):
+        """Test that a write wakes the watcher without waiting for a poll"""
+        start = time.time()
+        with open(self.test_file, 'w') as f:
+            f.write("modified content")
+        self.assertEqual(self.watcher.wait_for_changes(timeout=2), [self.test_file])
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(self.watcher.wait_for_changes(timeout=0.1), [])
+    
+    def test_burst_is_coalesced_and_filtered(self):
+        """Test that many events become one change list without ignored files"""
+        for i in range(20):
+            with open(os.path.join(self.temp_dir, f'mod{i % 3}.py'), 'w') as f:
+                f.write(str(i))
+        with open(os.path.join(self.temp_dir, 'debug.log'), 'w') as f:
+            f.write("ignored")
+        changed = self.watcher.wait_for_changes(timeout=2)
+        self.assertEqual(sorted(os.path.basename(p) for p in changed),
+                         ['mod0.py', 'mod1.py', 'mod2.py'])
+    
+    def test_new_directories_are_watched(self):
+        """Test that directories created after watch() are followed"""
+        subdir = os.path.join(self.temp_dir, 'pkg', 'sub')
+        os.makedirs(subdir)
+        self.watcher.wait_for_changes(timeout=0.5)
+        
+        module = os.path.join(subdir, 'module.py')
+        with open(module, 'w') as f:
+            f.write("x = 1")
+        self.assertIn(module, self.watcher.wait_for_changes(timeout=2))
+        
+        os.makedirs(os.path.join(self.temp_dir, '__pycache__'))
+        self.watcher.wait_for_changes(timeout=0.2)
+        self.assertNotIn(os.path.join(self.temp_dir, '__pycache__'),
+                         self.watcher._watched_dirs)
+    
+    def test_paths_added_and_removed_live(self):
+        """Test that watches follow add_paths and remove_paths without a restart"""
+        other = tempfile.mkdtemp()
+        module = os.path.join(other, 'other.py')
+        with open(module, 'w') as f:
+            f.write("y = 1")
+        try:
+            self.assertEqual(self.watcher.add_paths([other]), [module])
+            with open(module, 'a') as f:
+                f.write("\n")
+            self.assertEqual(self.watcher.wait_for_changes(timeout=2), [module])
+            
+            self.watcher.remove_paths([self.temp_dir])
+            self.assertEqual(list(self.watcher._watched_dirs), [other])
+            with open(self.test_file, 'w') as f:
+                f.write("modified content")
+            self.assertEqual(self.watcher.wait_for_changes(timeout=0.3), [])
+        finally:
+            import shutil
+            shutil.rmtree(other, ignore_errors=True)
+    
+    def test_backend_selection(self):
+        """Test the backend factory"""
+        self.assertIsInstance(create_file_watcher(Mock(), 'auto'), InotifyFileWatcher)
+        self.assertNotIsInstance(create_file_watcher(Mock(), 'poll'), InotifyFileWatcher)
+        with self.assertRaises(ValueError):
+            create_file_watcher(Mock(), 'fsevents')
 
 class TestProcessWatcher(unittest.TestCase):
     """Test the process watcher functionality"""
@@ -145,6 +337,226 @@ class TestProcessWatcher(unittest.TestCase):
         # Should have called restart callback
         self.restart_callback.assert_called_with("test-process")
 
+class TestWatchService(unittest.TestCase):
+    """Test the watch service shared by all processes"""
+    
+    def setUp(self):
+        self.temp_dir = os.path.realpath(tempfile.mkdtemp())
+        self.src = os.path.join(self.temp_dir, 'src')
+        for package in ('api', 'worker', 'common'):
+            os.makedirs(os.path.join(self.src, package))
+            with open(os.path.join(self.src, package, 'main.py'), 'w') as f:
+                f.write("x = 1")
+            # Old enough to get a content baseline when watching starts
+            os.utime(os.path.join(self.src, package, 'main.py'), (time.time() - 60,) * 2)
+        self.service = WatchService(debounce=0.1)
+        self.calls = []
+        self.called = threading.Event()
+    
+    def tearDown(self):
+        self.service.close()
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def callback(self, key, paths):
+        self.calls.append((key, sorted(os.path.relpath(p, self.src) for p in paths)))
+        self.called.set()
+    
+    def touch(self, *parts):
+        with open(os.path.join(self.src, *parts), 'a') as f:
+            f.write("\n")
+    
+    def write(self, text, *parts):
+        with open(os.path.join(self.src, *parts), 'w') as f:
+            f.write(text)
+    
+    def wait_calls(self, count, timeout=5):
+        deadline = time.time() + timeout
+        while len(self.calls) < count and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.3)
+        return sorted(self.calls)
+    
+    def test_collapse_roots(self):
+        """Test that nested and duplicate roots are merged"""
+        self.assertEqual(collapse_roots(['/a/src/api', '/a/src', '/a/src', '/a/srcs', '/b']),
+                         ['/a/src', '/a/srcs', '/b'])
+    
+    def test_fan_out_with_one_watch(self):
+        """Test that overlapping subscriptions share one root and each get their changes"""
+        self.service.subscribe('api', [os.path.join(self.src, 'api'),
+                                       os.path.join(self.src, 'common')], self.callback)
+        self.service.subscribe('worker', [self.src], self.callback,
+                               filter=lambda path: '/api/' not in path)
+        self.assertEqual(self.service.roots(), [self.src])
+        time.sleep(0.8)
+        
+        self.touch('common', 'main.py')
+        self.assertEqual(self.wait_calls(2), [('api', ['common/main.py']),
+                                              ('worker', ['common/main.py'])])
+        
+        self.calls.clear()
+        self.touch('api', 'main.py')
+        self.assertEqual(self.wait_calls(1), [('api', ['api/main.py'])])
+    
+    def test_unsubscribe(self):
+        """Test that removed subscribers stop getting events and roots shrink"""
+        self.service.subscribe('api', [os.path.join(self.src, 'api')], self.callback)
+        self.service.subscribe('worker', [os.path.join(self.src, 'worker')], self.callback)
+        self.assertTrue(self.service.unsubscribe('worker'))
+        self.assertFalse(self.service.unsubscribe('worker'))
+        self.assertEqual(self.service.roots(), [os.path.join(self.src, 'api')])
+        time.sleep(0.8)
+        
+        self.touch('worker', 'main.py')
+        self.touch('api', 'main.py')
+        self.assertEqual(self.wait_calls(1), [('api', ['api/main.py'])])
+    
+    def test_unchanged_content_is_ignored(self):
+        """Test that touch, identical rewrites and reverted edits restart nothing"""
+        self.service.subscribe('api', [os.path.join(self.src, 'api')], self.callback)
+        time.sleep(0.8)
+        
+        os.utime(os.path.join(self.src, 'api', 'main.py'))
+        self.write("x = 1", 'api', 'main.py')
+        self.write("x = 2", 'api', 'main.py')
+        self.write("x = 1", 'api', 'main.py')
+        self.assertEqual(self.wait_calls(1, timeout=1.5), [])
+    
+    def test_burst_gives_one_callback(self):
+        """Test that a burst of saves is one restart that sees the last edit"""
+        contents = []
+        
+        def callback(key, paths):
+            with open(paths[0]) as f:
+                contents.append(f.read())
+            self.callback(key, paths)
+        
+        self.service.subscribe('api', [os.path.join(self.src, 'api')], callback)
+        time.sleep(0.8)
+        for i in range(10):
+            self.write(f"x = {i + 2}", 'api', 'main.py')
+            time.sleep(0.02)
+        self.assertEqual(self.wait_calls(1), [('api', ['api/main.py'])])
+        time.sleep(0.5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(contents, ["x = 11"])
+
+    def test_subscriptions_change_the_live_backend(self):
+        """Test that subscribing and unsubscribing add and drop roots without a new backend"""
+        backends = []
+        
+        def create(*args, **kwargs):
+            backends.append(create_file_watcher(*args, **kwargs))
+            return backends[-1]
+        
+        with patch('pypm2.watcher.create_file_watcher', side_effect=create):
+            self.service.subscribe('api', [os.path.join(self.src, 'api')], self.callback)
+            time.sleep(0.8)
+            self.service.subscribe('worker', [os.path.join(self.src, 'worker')], self.callback)
+            self.touch('api', 'main.py')
+            self.assertEqual(self.wait_calls(1), [('api', ['api/main.py'])])
+            
+            self.calls.clear()
+            self.service.unsubscribe('api')
+            self.touch('worker', 'main.py')
+            self.assertEqual(self.wait_calls(1), [('worker', ['worker/main.py'])])
+        self.assertEqual(len(backends), 1)
+        self.assertEqual(backends[0].watched_paths, [os.path.join(self.src, 'worker')])
+    
+    def test_priming_follows_filters(self):
+        """Test that only files a subscriber accepts, up to the size cap, are hashed up front"""
+        large = os.path.join(self.src, 'api', 'large.py')
+        with open(large, 'w') as f:
+            f.write("#" * (PRIME_MAX_SIZE + 1))
+        data = os.path.join(self.src, 'api', 'data.json')
+        with open(data, 'w') as f:
+            f.write("{}")
+        for path in (large, data):
+            os.utime(path, (time.time() - 60,) * 2)
+        
+        hashed = []
+        with patch('pypm2.watcher.content_digest',
+                   side_effect=lambda path: hashed.append(path) or content_digest(path)):
+            self.service.subscribe('api', [os.path.join(self.src, 'api')], self.callback,
+                                   filter=lambda path: path.endswith('.py'))
+            time.sleep(0.8)
+        self.assertEqual(hashed, [os.path.join(self.src, 'api', 'main.py')])
+
+    def test_directories_every_subscriber_excludes_are_pruned(self):
+        """Test that excluded directories are not walked until a subscriber wants them"""
+        os.makedirs(os.path.join(self.src, 'data'))
+        for i in range(5):
+            self.write("{}", 'data', f'f{i}.json')
+        backends = []
+        
+        def create(*args, **kwargs):
+            backends.append(create_file_watcher(*args, **kwargs))
+            return backends[-1]
+        
+        self.service.backend = 'poll'
+        data = os.path.join(self.src, 'data')
+        with patch('pypm2.watcher.create_file_watcher', side_effect=create):
+            self.service.subscribe('api', [self.src], self.callback,
+                                   filter=lambda path: not path.startswith(data + os.sep),
+                                   prune=lambda path: path == data)
+            time.sleep(0.8)
+            self.assertFalse([path for path in backends[0]._poller._files if path.startswith(data)])
+            self.assertIn(os.path.join(self.src, 'api', 'main.py'), backends[0]._poller._files)
+            
+            self.service.subscribe('worker', [data], self.callback)
+            time.sleep(0.8)
+            self.assertEqual(len([path for path in backends[0]._poller._files
+                                  if path.startswith(data)]), 5)
+            self.write("[]", 'data', 'f1.json')
+            self.assertEqual(self.wait_calls(1), [('worker', ['data/f1.json'])])
+
+class TestChangeConfirmation(unittest.TestCase):
+    """Test content digests and trailing-edge batching"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'app.py')
+        with open(self.path, 'w') as f:
+            f.write("x = 1")
+        os.utime(self.path, (time.time() - 60,) * 2)
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_hasher(self):
+        """Test that only content changes are confirmed, and unknown files always are"""
+        hasher = ContentHasher()
+        other = os.path.join(self.temp_dir, 'new.py')
+        with open(other, 'w') as f:
+            f.write("y = 1")
+        hasher.prime([self.path, other], time.time())
+        self.assertEqual(hasher.confirm([other]), [(other, UNKNOWN)])
+        self.assertEqual(hasher.confirm([self.path]), [])
+        
+        before = hasher.digest(self.path)
+        with open(self.path, 'w') as f:
+            f.write("x = 2")
+        self.assertEqual(hasher.confirm([self.path]), [(self.path, before)])
+        os.unlink(self.path)
+        self.assertEqual(len(hasher.confirm([self.path])), 1)
+        self.assertIsNone(hasher.digest(self.path))
+    
+    def test_batcher(self):
+        """Test trailing-edge release, the max delay and first-baseline wins"""
+        batcher = ChangeBatcher(delay=0.3, max_delay=1.0)
+        batcher.add([('a', 1)], now=0)
+        batcher.add([('a', 2), ('b', 3)], now=0.2)
+        self.assertAlmostEqual(batcher.timeout(0.5, now=0.2), 0.3)
+        self.assertEqual(batcher.release(now=0.4), [])
+        self.assertEqual(sorted(batcher.release(now=0.5)), [('a', 1), ('b', 3)])
+        self.assertEqual(batcher.release(now=0.6), [])
+        
+        for i in range(5):
+            batcher.add([('a', i)], now=i * 0.2)
+        self.assertEqual(batcher.release(now=1.0), [('a', 0)])
+
 class TestWatcherUtils(unittest.TestCase):
     """Test watcher utility functions"""
     
@@ -194,7 +606,11 @@ def run_tests():
     
     # Add test classes
     suite.addTests(loader.loadTestsFromTestCase(TestSimpleFileWatcher))
+    suite.addTests(loader.loadTestsFromTestCase(TestTreePoller))
+    suite.addTests(loader.loadTestsFromTestCase(TestInotifyFileWatcher))
     suite.addTests(loader.loadTestsFromTestCase(TestProcessWatcher))
+    suite.addTests(loader.loadTestsFromTestCase(TestWatchService))
+    suite.addTests(loader.loadTestsFromTestCase(TestChangeConfirmation))
     suite.addTests(loader.loadTestsFromTestCase(TestWatcherUtils))
     
     # Run tests
@@ -0,0 +1,89 @@
+import tempfile
+import time
+from pathlib import Path
+from pypm2.manager import ProcessManager
+from pypm2.process import ProcessStatus
+from pypm2.forkserver import ZygoteChild
+
+class TestZygoteMode:
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = ProcessManager(self.temp_dir)
+        self.imports_file = Path(self.temp_dir) / "imports.txt"
+
+        # Module recording every time it is imported
+        (Path(self.temp_dir) / "heavy.py").write_text(f"""
+with open({str(self.imports_file)!r}, 'a') as f:
+    f.write('imported\\n')
+""")
+
+        self.test_script = Path(self.temp_dir) / "app.py"
+        self.test_script.write_text("""
+import sys
+import time
+print('preloaded' if 'heavy' in sys.modules else 'cold', flush=True)
+time.sleep(60)
+""")
+
+    def teardown_method(self):
+        """Cleanup after test"""
+        self.manager.delete_all()
+        self.manager.stop_monitoring()
+
+    def test_instances_fork_from_zygote(self):
+        """Test that instances share one preloaded zygote"""
+        assert self.manager.start("app", str(self.test_script), instances=2,
+                                  cwd=self.temp_dir, zygote=True, preload=["heavy"]) == True
+
+        for name in ("app:0", "app:1"):
+            process = self.manager.get_process(name)
+            assert isinstance(process.process, ZygoteChild)
+            assert process.status == ProcessStatus.ONLINE
+
+        time.sleep(1)
+        assert self.imports_file.read_text().count('imported') == 1
+        for name in ("app:0", "app:1"):
+            assert "preloaded" in Path(self.manager.get_process(name).log_file).read_text()
+
+    def test_exit_code_reported(self):
+        """Test that the zygote reports the exit code of its children"""
+        self.test_script.write_text("import sys\nsys.exit(3)\n")
+        self.manager.start("app", str(self.test_script), cwd=self.temp_dir,
+                           zygote=True, autorestart=False)
+        process = self.manager.get_process("app")
+
+        deadline = time.time() + 5
+        while process.status == ProcessStatus.ONLINE and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert process.status == ProcessStatus.ERRORED
+        assert process.exit_code == 3
+
+    def test_watch_restart_recycles_only_for_preloaded_changes(self):
+        """Test that the zygote is replaced only when a module it preloaded is edited"""
+        heavy = Path(self.temp_dir) / "heavy.py"
+        heavy.write_text("VERSION = 1\n")
+        self.test_script.write_text("""
+import time
+import heavy
+print('version', heavy.VERSION, flush=True)
+time.sleep(60)
+""")
+        self.manager.start("app", str(self.test_script), cwd=self.temp_dir,
+                           zygote=True, preload=["heavy"])
+        log_file = Path(self.manager.get_process("app").log_file)
+        zygotes = list(self.manager.zygotes._zygotes.values())
+
+        self.test_script.write_text(self.test_script.read_text() + "# edited\n")
+        self.manager._on_watched_change("app", [str(self.test_script)])
+        assert list(self.manager.zygotes._zygotes.values()) == zygotes
+
+        heavy.write_text("VERSION = 22\n")
+        self.manager._on_watched_change("app", [str(heavy)])
+        assert list(self.manager.zygotes._zygotes.values()) != zygotes
+
+        deadline = time.time() + 5
+        while "version 22" not in log_file.read_text() and time.time() < deadline:
+            time.sleep(0.05)
+        assert "version 22" in log_file.read_text()